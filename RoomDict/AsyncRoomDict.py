@@ -0,0 +1,373 @@
+import asyncio
+from concurrent.futures import Executor
+from contextlib import asynccontextmanager
+from typing import Dict, List, Optional, Tuple
+
+from RoomDict.RoomDict import (
+    MEMBERSHIP_TEST_MAPPING,
+    STORAGE_BACKEND_MAPPING,
+    RoomDict,
+)
+from RoomDict.caches import AsyncInfCache
+from RoomDict.storage_backends import ExecutorStorage
+from RoomDict.storage_backends.AsyncGenericStorage import AsyncGenericStorage
+
+
+class _PendingWrite:
+    """A write to the lower tiers that has not been applied yet."""
+
+    __slots__ = ["key", "value", "is_delete"]
+
+    def __init__(self, key: str, value: object, is_delete: bool):
+        self.key = key
+        self.value = value
+        self.is_delete = is_delete
+
+
+class AsyncRoomDict:
+    def __init__(
+        self,
+        cache_policies: List[str],
+        membership_tests: List[str],
+        storage_backends: List[str],
+        cache_policies_kwargs: Optional[List[dict]] = None,
+        membership_tests_kwargs: Optional[List[dict]] = None,
+        storage_backends_kwargs: Optional[List[dict]] = None,
+        executor: Optional[Executor] = None,
+        max_pending_writes: int = 1024,
+        batch_size: int = 64,
+    ):
+        """Initialize an asyncio front end for a RoomDict hierarchy.
+
+        Leading tiers whose storage backend does not block are served inline
+        on the event loop. The remaining tiers must use the "none" cache policy
+        and are accessed through AsyncGenericStorage; synchronous backends are
+        adapted with ExecutorStorage. Reads of those tiers run concurrently,
+        while writes are applied in order by a background task.
+
+        Parameters
+        ----------
+        cache_policies : List[str]
+            List of cache policy strings.
+        membership_tests : List[str]
+            List of membership test strings.
+        storage_backends : List[str]
+            List of storage backend strings.
+            Order implies the storage hierarchy.
+        cache_policies_kwargs: Optional[List[dict]]
+            Dictionary of cache policies initialization kwargs.
+        membership_tests_kwargs: Optional[List[dict]]
+            Dictionary of membership tests initialization kwargs.
+        storage_backends_kwargs : Optional[List[dict]]
+            Dictionary of storage backend initialization kwargs.
+        executor : Optional[Executor]
+            Executor for blocking storage backends. Uses the event loop's
+            default executor if None.
+        max_pending_writes : int
+            Maximum number of queued writes to the blocking tiers before
+            writers wait.
+        batch_size : int
+            Maximum number of queued writes applied at once.
+
+        Returns
+        -------
+        AsyncRoomDict
+            AsyncRoomDict with chosen parameters.
+        """
+        assert len(storage_backends) == len(
+            cache_policies
+        ), "Must have equal numbers of storage backends and cache policies."
+
+        num_tiers = len(storage_backends)
+        cache_policies_kwargs = self._pad(cache_policies_kwargs, num_tiers)
+        membership_tests_kwargs = self._pad(membership_tests_kwargs, num_tiers)
+        storage_backends_kwargs = self._pad(storage_backends_kwargs, num_tiers)
+
+        num_inline = 0
+        while num_inline < num_tiers and not self._is_blocking(
+            storage_backends[num_inline]
+        ):
+            num_inline += 1
+
+        assert num_inline > 0, "The first storage backend must not block."
+        for i in range(num_inline, num_tiers):
+            assert self._is_blocking(
+                storage_backends[i]
+            ), "Non-blocking storage backends must come before blocking ones."
+            assert (
+                cache_policies[i] == "none"
+            ), "Blocking storage backends only support the 'none' cache policy."
+
+        self.room_dict = RoomDict(
+            cache_policies[:num_inline],
+            membership_tests[:num_inline],
+            storage_backends[:num_inline],
+            cache_policies_kwargs[:num_inline],
+            membership_tests_kwargs[:num_inline],
+            storage_backends_kwargs[:num_inline],
+        )
+
+        self.executor = executor
+
+        self.storage_backends: List[AsyncGenericStorage] = []
+        self.caches: List[AsyncInfCache] = []
+        for i in range(num_inline, num_tiers):
+            membership_test = MEMBERSHIP_TEST_MAPPING[membership_tests[i]]
+            membership_test = membership_test(**membership_tests_kwargs[i])
+
+            storage_backend = STORAGE_BACKEND_MAPPING[storage_backends[i]]
+            storage_backend = storage_backend(**storage_backends_kwargs[i])
+            if not isinstance(storage_backend, AsyncGenericStorage):
+                storage_backend = ExecutorStorage(storage_backend, self.executor)
+
+            self.caches.append(AsyncInfCache(membership_test, storage_backend))
+            self.storage_backends.append(storage_backend)
+
+        self.max_pending_writes = max_pending_writes
+        self.batch_size = batch_size
+
+        # Latest unapplied write to the blocking tiers for each key.
+        self.pending: Dict[str, _PendingWrite] = {}
+        self.write_queue: Optional[asyncio.Queue] = None
+        self.writer: Optional[asyncio.Task] = None
+        self.writer_error: Optional[BaseException] = None
+
+        self.key_locks: Dict[str, Tuple[asyncio.Lock, int]] = {}
+
+    @staticmethod
+    def _pad(kwargs: Optional[List[dict]], length: int) -> List[dict]:
+        kwargs = [] if kwargs is None else list(kwargs)
+        return kwargs + [{}] * (length - len(kwargs))
+
+    @staticmethod
+    def _is_blocking(storage_backend: str) -> bool:
+        storage_backend = STORAGE_BACKEND_MAPPING[storage_backend]
+        return issubclass(storage_backend, AsyncGenericStorage) or (
+            storage_backend.blocking
+        )
+
+    async def __aenter__(self):
+        self.room_dict.__enter__()
+        for storage_backend in self.storage_backends:
+            await storage_backend.open()
+
+        self.write_queue = asyncio.Queue(self.max_pending_writes)
+        self.writer_error = None
+        self.writer = asyncio.get_running_loop().create_task(self._apply_writes())
+
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        try:
+            if self.writer_error is None:
+                await self.flush()
+        finally:
+            self.writer.cancel()
+            try:
+                await self.writer
+            except asyncio.CancelledError:
+                pass
+
+            for storage_backend in self.storage_backends:
+                await storage_backend.close(exc_type, exc_value, traceback)
+            self.room_dict.__exit__(exc_type, exc_value, traceback)
+
+    async def flush(self):
+        """Waits until every queued write to the blocking tiers is applied."""
+        self._raise_writer_error()
+
+        await self.write_queue.join()
+
+        self._raise_writer_error()
+
+    def _raise_writer_error(self):
+        if self.writer_error is not None:
+            raise RuntimeError("Writing to the lower tiers failed.") from (
+                self.writer_error
+            )
+
+    @asynccontextmanager
+    async def _key_lock(self, key: str):
+        # Operations on the same key are serialized; different keys overlap.
+        lock, users = self.key_locks.get(key, (None, 0))
+        if lock is None:
+            lock = asyncio.Lock()
+        self.key_locks[key] = (lock, users + 1)
+
+        try:
+            async with lock:
+                yield
+        finally:
+            lock, users = self.key_locks[key]
+            if users == 1:
+                del self.key_locks[key]
+            else:
+                self.key_locks[key] = (lock, users - 1)
+
+    async def get(self, key: str) -> Optional[object]:
+        """Gets the value of key, moving it to the highest level cache.
+
+        Records in the inline tiers are promoted as with RoomDict, and those
+        in the blocking tiers always are.
+
+        Parameters
+        ----------
+        key : str
+            Key to get.
+
+        Returns
+        -------
+        Value of key if it exists, else None.
+        """
+        async with self._key_lock(key):
+            # Inline tiers are read as by RoomDict, following its promotion
+            # policy. Hits in the highest level cache only update its recency.
+            value, evicted = self.room_dict._get(key)
+            if value is not None:
+                await self._queue_evicted(evicted)
+                return value
+
+            pending = self.pending.get(key)
+            if pending is not None:
+                if pending.is_delete:
+                    return None
+                value = pending.value
+            else:
+                for cache in self.caches:
+                    value = await cache.get(key)
+                    if value is not None:
+                        break
+
+            if value is None:
+                return None
+
+            await self._delete_lower(key)
+            await self._set_inline(key, value)
+            return value
+
+    async def set(self, key: str, value: object):
+        """Puts key and value into the highest level cache.
+
+        Parameters
+        ----------
+        key : str
+            Key to put.
+        value : object
+            Value to put.
+        """
+        async with self._key_lock(key):
+            await self._delete_lower(key)
+            await self._set_inline(key, value)
+
+    async def delete(self, key: str):
+        """Deletes key from every tier. Missing keys are ignored.
+
+        Parameters
+        ----------
+        key : str
+            Key to delete.
+        """
+        async with self._key_lock(key):
+            del self.room_dict[key]
+            await self._delete_lower(key)
+
+    async def contains(self, key: str) -> bool:
+        """Checks whether key is in any tier.
+
+        Parameters
+        ----------
+        key : str
+            Key to check.
+
+        Returns
+        -------
+        bool
+            Whether key is in the AsyncRoomDict.
+        """
+        async with self._key_lock(key):
+            if key in self.room_dict:
+                return True
+
+            pending = self.pending.get(key)
+            if pending is not None:
+                return not pending.is_delete
+
+            for cache in self.caches:
+                if await cache.contains(key):
+                    return True
+
+            return False
+
+    async def _set_inline(self, key: str, value: object):
+        await self._queue_evicted(self.room_dict._set(key, value))
+
+    async def _queue_evicted(self, evicted: List[Tuple[str, object]]):
+        # Records evicted from the inline tiers move on to the blocking ones.
+        if self.caches:
+            for evicted_key, evicted_value in evicted:
+                await self._queue_write(
+                    _PendingWrite(evicted_key, evicted_value, False)
+                )
+
+    async def _delete_lower(self, key: str):
+        # Only queue a delete if some blocking tier may hold the key.
+        if key in self.pending or any(
+            key in cache.membership_test for cache in self.caches
+        ):
+            await self._queue_write(_PendingWrite(key, None, True))
+
+    async def _queue_write(self, pending: _PendingWrite):
+        self._raise_writer_error()
+
+        # Visible to readers right away, even while waiting for queue space.
+        self.pending[pending.key] = pending
+        await self.write_queue.put(pending)
+
+    async def _apply_writes(self):
+        while True:
+            batch = [await self.write_queue.get()]
+            while len(batch) < self.batch_size and not self.write_queue.empty():
+                batch.append(self.write_queue.get_nowait())
+
+            try:
+                # Apply runs of puts and deletes in queue order.
+                start = 0
+                while start < len(batch):
+                    end = start
+                    while (
+                        end < len(batch)
+                        and batch[end].is_delete == batch[start].is_delete
+                    ):
+                        end += 1
+
+                    await self._apply_run(batch[start:end])
+                    start = end
+            except Exception as e:
+                self.writer_error = e
+                self.pending.clear()
+            finally:
+                for _ in batch:
+                    self.write_queue.task_done()
+
+            if self.writer_error is not None:
+                # Keep releasing writers so nobody waits on a dead queue.
+                while True:
+                    await self.write_queue.get()
+                    self.write_queue.task_done()
+
+    async def _apply_run(self, run: List[_PendingWrite]):
+        if run[0].is_delete:
+            keys = [pending.key for pending in run]
+            for cache in self.caches:
+                await cache.delete_many(keys)
+        else:
+            records = dict((pending.key, pending.value) for pending in run)
+            evicted = list(records.items())
+            for cache in self.caches:
+                evicted = await cache.put_many(evicted)
+                if not evicted:
+                    break
+
+        for pending in run:
+            if self.pending.get(pending.key) is pending:
+                del self.pending[pending.key]
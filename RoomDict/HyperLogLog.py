@@ -0,0 +1,89 @@
+import math
+from typing import Iterable
+
+from RoomDict.membership_tests.hashing import hash_pair
+
+
+class HyperLogLog:
+    def __init__(self, precision: int = 14):
+        """Initialize a HyperLogLog sketch of the number of distinct keys.
+
+        The first precision bits of the hash of a key pick one of
+        2 ** precision registers, which keeps the longest run of leading
+        zeros seen in the rest of the hash. The estimate has a relative
+        standard error of about 1.04 / sqrt(2 ** precision), 0.8% by default,
+        in 2 ** precision bytes. The sum the estimate needs is kept up to
+        date on every add, so estimating is O(1).
+
+        Parameters
+        ----------
+        precision : int
+            Number of hash bits that pick a register, between 4 and 18.
+        """
+        assert (
+            4 <= precision <= 18
+        ), "Precision should be between 4 and 18. Precision is {}".format(precision)
+
+        self.precision = precision
+        self.num_registers = 1 << precision
+        self.shift = 64 - precision
+        self.rest_mask = (1 << self.shift) - 1
+
+        if self.num_registers >= 128:
+            self.alpha = 0.7213 / (1 + 1.079 / self.num_registers)
+        else:
+            self.alpha = {16: 0.673, 32: 0.697, 64: 0.709}[self.num_registers]
+
+        self.clear()
+
+    def clear(self):
+        """Forgets every key."""
+        self.registers = bytearray(self.num_registers)
+        self.num_zeros = self.num_registers
+        # Sum of 2 ** -register over every register.
+        self.inverse_sum = float(self.num_registers)
+
+    def add(self, key: str):
+        """Adds key to the sketch."""
+        hash_value = hash_pair(key)[0]
+        index = hash_value >> self.shift
+        rank = self.shift - (hash_value & self.rest_mask).bit_length() + 1
+
+        register = self.registers[index]
+        if rank > register:
+            if not register:
+                self.num_zeros -= 1
+            self.inverse_sum += 2.0**-rank - 2.0**-register
+            self.registers[index] = rank
+
+    def add_many(self, keys: Iterable[str]):
+        """Adds every key in keys to the sketch."""
+        for key in keys:
+            self.add(key)
+
+    def merge(self, other: "HyperLogLog"):
+        """Adds every key added to other, which has the same precision."""
+        assert (
+            self.precision == other.precision
+        ), "Only sketches of the same precision can be merged."
+
+        for index, rank in enumerate(other.registers):
+            register = self.registers[index]
+            if rank > register:
+                if not register:
+                    self.num_zeros -= 1
+                self.inverse_sum += 2.0**-rank - 2.0**-register
+                self.registers[index] = rank
+
+    def estimate(self) -> float:
+        """Returns the estimated number of distinct keys added."""
+        raw_estimate = self.alpha * self.num_registers**2 / self.inverse_sum
+
+        # Linear counting is more accurate while many registers are empty.
+        if raw_estimate <= 2.5 * self.num_registers and self.num_zeros:
+            return self.num_registers * math.log(self.num_registers / self.num_zeros)
+
+        return raw_estimate
+
+    def __len__(self) -> int:
+        return round(self.estimate())
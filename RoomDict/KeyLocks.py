@@ -0,0 +1,66 @@
+import threading
+from contextlib import contextmanager
+from collections.abc import Iterable
+from typing import Dict, List
+
+
+class KeyLocks:
+    """Per-key locks that only exist while some thread uses them."""
+
+    def __init__(self):
+        self.mutex = threading.Lock()
+        self.locks: Dict[str, List] = {}
+
+    @contextmanager
+    def lock(self, key: str):
+        """Holds the lock of key.
+
+        Parameters
+        ----------
+        key : str
+            Key to lock.
+        """
+        with self.lock_many([key]):
+            yield
+
+    @contextmanager
+    def lock_many(self, keys: Iterable[str]):
+        """Holds the locks of every key in keys.
+
+        Locks are always taken in sorted key order so that threads locking
+        overlapping batches cannot deadlock.
+
+        Parameters
+        ----------
+        keys : Iterable[str]
+            Keys to lock.
+        """
+        keys = sorted(set(keys))
+
+        with self.mutex:
+            key_locks = []
+            for key in keys:
+                entry = self.locks.get(key)
+                if entry is None:
+                    entry = [threading.RLock(), 0]
+                    self.locks[key] = entry
+                entry[1] += 1
+                key_locks.append(entry[0])
+
+        acquired = 0
+        try:
+            for key_lock in key_locks:
+                key_lock.acquire()
+                acquired += 1
+
+            yield
+        finally:
+            for key_lock in key_locks[:acquired]:
+                key_lock.release()
+
+            with self.mutex:
+                for key in keys:
+                    entry = self.locks[key]
+                    entry[1] -= 1
+                    if entry[1] == 0:
+                        del self.locks[key]
@@ -1,22 +1,83 @@
+import heapq
+import itertools
+import os
+import pickle
+import threading
 from collections.abc import Iterable, MutableMapping
-from typing import List, Optional
+from contextlib import nullcontext
+from typing import Dict, Iterator, List, Optional, Tuple
 
-from RoomDict.caches import LRUCache, InfCache
-from RoomDict.membership_tests import BloomMembership, NaiveMembership
-from RoomDict.storage_backends import ArbitraryStorage, DiskStorage, MemoryStorage
+from RoomDict.HyperLogLog import HyperLogLog
+from RoomDict.KeyLocks import KeyLocks
+from RoomDict.SortedKeys import SortedKeys
+from RoomDict.Stats import Stats
+from RoomDict.TierResizer import TierResizer
+from RoomDict.TimerWheel import TimerWheel
+from RoomDict.WriteBehindBuffer import WriteBehindBuffer
+from RoomDict.caches import (
+    ARCCache,
+    ArrayLRUCache,
+    ClockCache,
+    InfCache,
+    LRUCache,
+    S3FIFOCache,
+    TwoQCache,
+)
+from RoomDict.caches.GenericCache import GenericCache
+from RoomDict.membership_tests import (
+    BloomMembership,
+    CountingBloomMembership,
+    CuckooMembership,
+    NaiveMembership,
+    NumpyBloomMembership,
+)
+from RoomDict.promotion_policies import (
+    AlwaysPromotion,
+    NeverPromotion,
+    NthAccessPromotion,
+    ProbabilisticPromotion,
+)
+from RoomDict.storage_backends import (
+    ArbitraryStorage,
+    BitcaskStorage,
+    CompressedMemoryStorage,
+    DiskStorage,
+    LSMStorage,
+    MemoryStorage,
+    SQLiteStorage,
+)
 
 CACHE_POLICY_MAPPING = {
     "lru": LRUCache,
+    "array_lru": ArrayLRUCache,
+    "clock": ClockCache,
+    "arc": ARCCache,
+    "2q": TwoQCache,
+    "s3fifo": S3FIFOCache,
     "none": InfCache,
 }
 MEMBERSHIP_TEST_MAPPING = {
     "bloom": BloomMembership,
+    "counting_bloom": CountingBloomMembership,
+    "cuckoo": CuckooMembership,
+    "numpy_bloom": NumpyBloomMembership,
     "none": NaiveMembership,
 }
 STORAGE_BACKEND_MAPPING = {
     "arbitrary": ArbitraryStorage,
     "memory": MemoryStorage,
+    "compressed_memory": CompressedMemoryStorage,
     "disk": DiskStorage,
+    "lsm": LSMStorage,
+    "bitcask": BitcaskStorage,
+    "sqlite": SQLiteStorage,
+}
+
+PROMOTION_POLICY_MAPPING = {
+    "always": AlwaysPromotion,
+    "nth_access": NthAccessPromotion,
+    "probabilistic": ProbabilisticPromotion,
+    "never": NeverPromotion,
 }
 
 
@@ -29,6 +90,22 @@ class RoomDict(MutableMapping):
         cache_policies_kwargs: Optional[List[dict]] = None,
         membership_tests_kwargs: Optional[List[dict]] = None,
         storage_backends_kwargs: Optional[List[dict]] = None,
+        write_behind: bool = False,
+        write_behind_kwargs: Optional[dict] = None,
+        thread_safe: bool = False,
+        ttls: Optional[List[Optional[float]]] = None,
+        ttl_kwargs: Optional[dict] = None,
+        snapshot_path: Optional[str] = None,
+        promotion_policy: str = "always",
+        promotion_policy_kwargs: Optional[dict] = None,
+        inclusive: bool = False,
+        collect_stats: bool = False,
+        stats_kwargs: Optional[dict] = None,
+        adaptive_sizes: bool = False,
+        adaptive_sizes_kwargs: Optional[dict] = None,
+        sorted_keys: bool = False,
+        approximate_len: bool = False,
+        approximate_len_kwargs: Optional[dict] = None,
     ):
         """Initialize a RoomDict with the given storage_backends and cache_policies.
 
@@ -47,6 +124,67 @@ class RoomDict(MutableMapping):
             Dictionary of membership tests initialization kwargs.
         storage_backends_kwargs : Optional[List[dict]]
             Dictionary of storage backend initialization kwargs.
+        write_behind : bool
+            Whether records evicted from the highest level cache are staged in
+            a buffer and written to the lower tiers by a background worker.
+            Records the worker evicts from the lowest tier are dropped, so
+            puts do not return them.
+        write_behind_kwargs : Optional[dict]
+            WriteBehindBuffer initialization kwargs.
+        thread_safe : bool
+            Whether the RoomDict may be used from several threads at once.
+            The highest level cache and the lower tiers are guarded by
+            separate locks, so hits in the highest level cache never wait on
+            another thread's lower tier access.
+        ttls : Optional[List[Optional[float]]]
+            Default time to live in seconds of records entering each tier.
+            A record set without its own ttl expires ttls[0] seconds later,
+            and a record demoted to tier i expires at the latest ttls[i]
+            seconds later. None means no default for that tier.
+        ttl_kwargs : Optional[dict]
+            TimerWheel initialization kwargs.
+        snapshot_path : Optional[str]
+            File to save the state of every tier to on exit and to restore
+            it from on enter, for a warm restart. The records of memory
+            tiers are saved with it, while persistent storage backends keep
+            their own. Tiers whose storage does neither start cold.
+        promotion_policy : str
+            Promotion policy string. Decides whether a hit in a lower tier
+            moves the record to the highest level cache. Records that are
+            not promoted are read in place. Hits in the highest level cache
+            only update its recency.
+        promotion_policy_kwargs : Optional[dict]
+            Promotion policy initialization kwargs.
+        inclusive : bool
+            Whether promoted records are copied to the highest level cache
+            instead of moved. A record then stays in the lower tiers until
+            it is overwritten or deleted, and is not written to a lower tier
+            again when it is evicted from the one above.
+        collect_stats : bool
+            Whether to count the hits, misses, puts, evictions, promotions
+            and membership test outcomes of every tier and to measure the
+            latency of every operation, see `stats`. Nothing is measured if
+            False.
+        stats_kwargs : Optional[dict]
+            Stats initialization kwargs, such as an exporter.
+        adaptive_sizes : bool
+            Whether to resize the tiers with a max size as the workload
+            changes, see `TierResizer`. Tiers grow while records they evicted
+            are missed, and shrink, demoting their surplus to the next tier,
+            while they are not. Implies collect_stats.
+        adaptive_sizes_kwargs : Optional[dict]
+            TierResizer initialization kwargs. limits defaults to between 1
+            and its initial max size for every tier with a max size.
+        sorted_keys : bool
+            Whether every tier keeps a sorted index of its keys, updated on
+            every put, eviction and delete, for `range` and `prefix`.
+        approximate_len : bool
+            Whether every tier below the highest level cache keeps a
+            HyperLogLog sketch of its keys, see `approx_len`.
+        approximate_len_kwargs : Optional[dict]
+            HyperLogLog initialization kwargs, and rebuild_ratio, the share
+            of keys that left a tier at which its sketch is rebuilt.
+            Defaults to 0.1.
 
         Returns
         -------
@@ -86,6 +224,75 @@ class RoomDict(MutableMapping):
             storage_backends_kwargs,
         )
 
+        # Records evicted from the highest level cache pass through the
+        # demotion buffer, so they stay visible while they are being written
+        # to the lower tiers by a worker or by another thread.
+        self.write_behind = write_behind and len(self.caches) > 1
+        self.demotion_buffer = None
+        if (write_behind or thread_safe) and len(self.caches) > 1:
+            if write_behind_kwargs is None:
+                write_behind_kwargs = {}
+
+            self.demotion_buffer = WriteBehindBuffer(
+                self._write_lower_tiers, **write_behind_kwargs
+            )
+
+        self.thread_safe = thread_safe
+        self.hot_lock = threading.RLock() if thread_safe else nullcontext()
+        self.key_locks = KeyLocks() if thread_safe else None
+
+        if ttls is None:
+            ttls = []
+        self.ttls = list(ttls) + [None] * (len(self.caches) - len(ttls))
+        self.timer_wheel = TimerWheel(**(ttl_kwargs or {}))
+
+        self.snapshot_path = snapshot_path
+
+        self.promotion_policy = PROMOTION_POLICY_MAPPING[promotion_policy](
+            **(promotion_policy_kwargs or {})
+        )
+        self.inclusive = inclusive
+
+        self.metrics = None
+        if collect_stats or adaptive_sizes:
+            self.metrics = Stats(len(self.caches), **(stats_kwargs or {}))
+
+        self.resizer = None
+        self.resize_lock = threading.Lock()
+        if adaptive_sizes:
+            self.resizer = self._initialize_resizer(adaptive_sizes_kwargs or {})
+
+        self.sorted_keys = sorted_keys
+        if sorted_keys:
+            for cache in self.caches:
+                cache.key_index = SortedKeys()
+
+        # Keys are counted as they are added and removed, so len is O(1).
+        # Records that may have left the RoomDict on another thread, or while
+        # another tier held a copy, are checked later, see `_settle_lost`.
+        self.num_keys = 0
+        self.maybe_lost: set = set()
+        self.len_lock = (
+            threading.Lock() if self.demotion_buffer is not None else nullcontext()
+        )
+
+        # The lower tiers keep sketches of their keys, see `approx_len`.
+        self.sketch_kwargs = None
+        if approximate_len:
+            self.sketch_kwargs = dict(approximate_len_kwargs or {})
+            self.rebuild_ratio = self.sketch_kwargs.pop("rebuild_ratio", 0.1)
+            assert (
+                self.rebuild_ratio > 0
+            ), "Rebuild ratio should be greater than 0. Rebuild ratio is {}".format(
+                self.rebuild_ratio
+            )
+            for cache in self.caches[1:]:
+                cache.sketch = HyperLogLog(**self.sketch_kwargs)
+
+        # Snapshots are only restored into tiers configured the same, whatever
+        # sizes they adapted to since.
+        self.initial_configuration = self._configuration()
+
     def _initialize_cache_and_storage(
         self,
         cache_policies: List[str],
@@ -125,56 +332,1268 @@ class RoomDict(MutableMapping):
             )
             self.storage_backends.append(storage_backend)
 
+    def _initialize_resizer(self, adaptive_sizes_kwargs: dict) -> TierResizer:
+        adaptive_sizes_kwargs = dict(adaptive_sizes_kwargs)
+
+        limits = list(adaptive_sizes_kwargs.pop("limits", []))
+        limits += [None] * (len(self.caches) - len(limits))
+        for tier, cache in enumerate(self.caches):
+            max_size = getattr(cache, "max_size", None)
+            if max_size is None:
+                # Tiers bounded by bytes alone, or not at all, keep their size.
+                limits[tier] = None
+            elif limits[tier] is None:
+                limits[tier] = (1, max_size)
+
+        in_memory = [
+            isinstance(storage_backend, MemoryStorage)
+            for storage_backend in self.storage_backends
+        ]
+
+        return TierResizer(limits, in_memory, **adaptive_sizes_kwargs)
+
     def __enter__(self):
         for storage_backend in self.storage_backends:
             storage_backend.open()
 
+        if self.snapshot_path is None or not self._load_snapshot():
+            # Persistent tiers may still hold records, for instance after a
+            # crash. Their membership tests must not hide them, unless they
+            # were loaded with the keys from their own file.
+            for cache, storage_backend in zip(self.caches, self.storage_backends):
+                if (
+                    storage_backend.persistent
+                    and not cache.membership_test.is_loaded
+                    and len(storage_backend)
+                ):
+                    cache.membership_test.add_many(iter(storage_backend))
+
+        if self.sorted_keys:
+            # Tiers may have been restored or kept records across restarts.
+            for cache in self.caches:
+                cache.key_index.clear()
+                cache.key_index.update(cache.iter_keys())
+
+        self.num_keys = 0
+        if self.sketch_kwargs is not None:
+            for cache in self.caches[1:]:
+                cache.sketch.clear()
+                cache.num_forgotten = 0
+        if any(len(storage_backend) for storage_backend in self.storage_backends):
+            self._count_keys()
+
+        if self.write_behind:
+            self.demotion_buffer.start()
+
         return self
 
     def __exit__(self, exc_type, exc_value, traceback):
-        for storage_backend in self.storage_backends:
-            storage_backend.close(exc_type, exc_value, traceback)
+        try:
+            if self.demotion_buffer is not None:
+                self.demotion_buffer.stop()
+
+            if self.snapshot_path is not None:
+                self._save_snapshot()
+
+            if self.metrics is not None:
+                self.metrics.export()
+        finally:
+            for cache, storage_backend in zip(self.caches, self.storage_backends):
+                cache.membership_test.close()
+                storage_backend.close(exc_type, exc_value, traceback)
+
+    def _configuration(self) -> List[Tuple[str, Optional[int], Optional[int], str]]:
+        return [
+            (
+                type(cache).__name__,
+                getattr(cache, "max_size", None),
+                cache.max_bytes,
+                type(storage_backend).__name__,
+            )
+            for cache, storage_backend in zip(self.caches, self.storage_backends)
+        ]
+
+    def _save_snapshot(self):
+        tiers = []
+        for cache, storage_backend in zip(self.caches, self.storage_backends):
+            records = storage_backend.snapshot()
+            if records is None and not storage_backend.persistent:
+                # The records are lost on close.
+                tiers.append(None)
+            else:
+                tiers.append(
+                    {
+                        "policy": cache.snapshot(),
+                        "membership_test": cache.membership_test,
+                        "records": records,
+                    }
+                )
+
+        # Deadlines are saved as time left, since the clock may restart.
+        now = self.timer_wheel.now()
+        ttls = {
+            key: deadline - now
+            for key, deadline in self.timer_wheel.deadlines.items()
+        }
+
+        snapshot = {
+            "configuration": self.initial_configuration,
+            "tiers": tiers,
+            "ttls": ttls,
+        }
+
+        # Written under a temporary name, so a snapshot is always complete.
+        temporary_path = self.snapshot_path + ".tmp"
+        with open(temporary_path, "wb") as snapshot_file:
+            pickle.dump(snapshot, snapshot_file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporary_path, self.snapshot_path)
+
+    def _load_snapshot(self) -> bool:
+        # Returns whether there was a snapshot to restore.
+        if not os.path.exists(self.snapshot_path):
+            return False
+
+        with open(self.snapshot_path, "rb") as snapshot_file:
+            snapshot = pickle.load(snapshot_file)
+
+        assert (
+            snapshot["configuration"] == self.initial_configuration
+        ), "{} was saved by RoomDict with different tiers. Saved tiers are {}".format(
+            self.snapshot_path, snapshot["configuration"]
+        )
+
+        # A snapshot is only valid until the tiers change again.
+        os.remove(self.snapshot_path)
+
+        for cache, storage_backend, tier in zip(
+            self.caches, self.storage_backends, snapshot["tiers"]
+        ):
+            if tier is None:
+                continue
+
+            if tier["records"] is not None:
+                storage_backend.restore(tier["records"])
+            cache.restore(tier["policy"])
+            cache.membership_test = tier["membership_test"]
+
+        now = self.timer_wheel.now()
+        for key, ttl in snapshot["ttls"].items():
+            self.timer_wheel.schedule(key, now + ttl)
+
+        return True
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Waits until every record staged for the lower tiers has been written.
+
+        Parameters
+        ----------
+        timeout : Optional[float]
+            Maximum number of seconds to wait. Waits forever if None.
+
+        Returns
+        -------
+        bool
+            True if nothing is left to write, False if the timeout expired.
+        """
+        if self.demotion_buffer is None:
+            return True
+
+        return self.demotion_buffer.flush(timeout)
+
+    def stats(self) -> dict:
+        """Returns the counters of every tier and the latency of every operation.
+
+        Records staged for the lower tiers count as hits in the second tier.
+        Membership test false positives are misses the membership test let
+        through to the storage.
+
+        Returns
+        -------
+        dict
+            "tiers" holds the hits, misses, puts, evictions, promotions,
+            filter_true_positives and filter_false_positives of every tier.
+            "latencies" holds the count, mean, min, max, p50, p90, p99 and
+            p99.9 in seconds of every operation.
+        """
+        assert self.metrics is not None, "Stats are only kept with collect_stats."
+
+        return self.metrics.snapshot()
+
+    def _count_hits(self, tier: int, num_hits: int):
+        # A hit means the membership test of the tier let the key through.
+        counters = self.metrics.counters(tier)
+        counters["hits"] += num_hits
+        counters["filter_true_positives"] += num_hits
+
+    def _count_misses(self, tier: int, keys: List[str]):
+        # Misses the membership test let through are its false positives.
+        counters = self.metrics.counters(tier)
+        counters["misses"] += len(keys)
+        counters["filter_false_positives"] += sum(
+            self.caches[tier].membership_test.contains_many(keys)
+        )
+
+        if self.resizer is not None:
+            self.resizer.missed(tier, keys)
+
+    def _evicted(self, tier: int, records: List[Tuple[str, object]]):
+        if self.metrics is not None:
+            self.metrics.count(tier, "evictions", len(records))
+
+        if self.resizer is not None and records:
+            self.resizer.evicted(tier, (key for key, _ in records))
+
+    def _added(self, keys: List[str]):
+        with self.len_lock:
+            self.num_keys += len(keys)
+
+    def _removed(self, num_keys: int):
+        with self.len_lock:
+            self.num_keys -= num_keys
+
+    def _lost(self, keys: List[str]):
+        # Records evicted from the lowest tier or dropped as expired leave the
+        # RoomDict, unless another tier holds a copy or another thread brought
+        # them back meanwhile. Only then is it checked, holding the key locks.
+        if not keys:
+            return
+
+        if not self.inclusive and self.demotion_buffer is None:
+            self._removed(len(keys))
+            return
+
+        with self.len_lock:
+            self.maybe_lost.update(keys)
+
+    def _settle(self, keys: List[str], found: set):
+        # Called holding the key locks of keys, with found holding those of
+        # them that were still in a tier. Lost keys that were not are removed.
+        with self.len_lock:
+            if not self.maybe_lost:
+                return
+
+            for key in keys:
+                if key in self.maybe_lost:
+                    self.maybe_lost.discard(key)
+                    if key not in found:
+                        self.num_keys -= 1
+
+    def _settle_lost(self):
+        with self.len_lock:
+            keys = list(self.maybe_lost)
+
+        with self._key_locks(keys):
+            self._settle(keys, self._existing(keys))
+
+    def _existing(self, keys: List[str]) -> set:
+        # Called holding the key locks of keys. Returns those held by any tier.
+        found = set()
+
+        with self.hot_lock:
+            remaining = self._contains_many(self.caches[0], keys, found)
+
+            if remaining and self.demotion_buffer is not None:
+                found.update(key for key in remaining if key in self.demotion_buffer)
+                remaining = [key for key in remaining if key not in found]
+
+        with self._lower_tiers_lock():
+            for cache in self.caches[1:]:
+                remaining = self._contains_many(cache, remaining, found)
+
+        return found
+
+    def _count_keys(self, chunk_size: int = 1000):
+        # Counts every stored key once, expired or not, as deletes do.
+        for tier, storage_backend in enumerate(self.storage_backends):
+            keys = iter(storage_backend)
+            while True:
+                chunk = list(itertools.islice(keys, chunk_size))
+                if not chunk:
+                    break
+
+                if self.caches[tier].sketch is not None:
+                    self.caches[tier].sketch.add_many(chunk)
+
+                for cache in self.caches[:tier]:
+                    chunk = [
+                        key
+                        for key, is_shadowed in zip(chunk, cache.contains_many(chunk))
+                        if not is_shadowed
+                    ]
+
+                self._added(chunk)
+
+    def _key_lock(self, key: str):
+        if self.key_locks is None:
+            return nullcontext()
+
+        return self.key_locks.lock(key)
+
+    def _key_locks(self, keys: Iterable[str]):
+        if self.key_locks is None:
+            return nullcontext()
 
-    def __len__(self):
-        size = 0
-        for cache in self.caches:
-            size += len(cache)
+        return self.key_locks.lock_many(keys)
+
+    def _lower_tiers_lock(self):
+        # The demotion buffer writes to the lower tiers from other threads.
+        if self.demotion_buffer is None:
+            return nullcontext()
+
+        return self.demotion_buffer.write_lock
+
+    def _write_lower_tiers(
+        self, records: List[Tuple[str, object]], first_tier: int = 1
+    ) -> List[Tuple[str, object]]:
+        evicted = records
+        for tier, cache in enumerate(self.caches[first_tier:], first_tier):
+            evicted = self._drop_expired(evicted)
+            if self.inclusive and evicted:
+                # Copies in this tier are current, since a set deletes a key
+                # from every tier first.
+                is_contained = cache.contains_many(key for key, _ in evicted)
+                evicted = [
+                    record
+                    for record, is_copy in zip(evicted, is_contained)
+                    if not is_copy
+                ]
+            if not evicted:
+                return []
+
+            self._limit_ttl(evicted, self.ttls[tier])
+            num_puts = len(evicted)
+            evicted = cache.put_many(evicted)
+
+            if self.metrics is not None:
+                self.metrics.count(tier, "puts", num_puts)
+            self._evicted(tier, evicted)
+
+        evicted = self._drop_expired(evicted)
+        self._lost([key for key, _ in evicted])
+
+        self._maybe_rebuild_sketches()
+
+        return evicted
+
+    def _drop_expired(
+        self, records: List[Tuple[str, object]]
+    ) -> List[Tuple[str, object]]:
+        # Expired records are reclaimed instead of demoted.
+        if not len(self.timer_wheel):
+            return records
+
+        now = self.timer_wheel.now()
+
+        live_records = []
+        expired_keys = []
+        for key, value in records:
+            if self.timer_wheel.is_expired(key, now):
+                self.timer_wheel.cancel(key)
+                expired_keys.append(key)
+            else:
+                live_records.append((key, value))
+
+        self._lost(expired_keys)
+
+        return live_records
+
+    def _limit_ttl(self, records: List[Tuple[str, object]], ttl: Optional[float]):
+        if ttl is None:
+            return
+
+        deadline = self.timer_wheel.now() + ttl
+        for key, _ in records:
+            current_deadline = self.timer_wheel.deadline(key)
+            if current_deadline is None or deadline < current_deadline:
+                self.timer_wheel.schedule(key, deadline)
+
+    def _schedule(self, key: str, ttl: Optional[float]):
+        if ttl is None:
+            ttl = self.ttls[0]
+
+        if ttl is not None:
+            self.timer_wheel.schedule(key, self.timer_wheel.now() + ttl)
+
+    def _is_expired(self, key: str) -> bool:
+        # Expired records are reclaimed on access, so they are never returned.
+        if not self.timer_wheel.is_expired(key):
+            return False
+
+        self._reclaim([key])
+        return True
+
+    def _unexpired(self, keys: List[str]) -> List[str]:
+        if not len(self.timer_wheel):
+            return keys
+
+        now = self.timer_wheel.now()
+        expired = [key for key in keys if self.timer_wheel.is_expired(key, now)]
+        if not expired:
+            return keys
+
+        self._reclaim(expired)
+        expired = set(expired)
+
+        return [key for key in keys if key not in expired]
+
+    def _reclaim(self, keys: List[str]):
+        with self._key_locks(keys):
+            now = self.timer_wheel.now()
+            expired = [key for key in keys if self.timer_wheel.is_expired(key, now)]
+            if expired:
+                self._removed(len(self._delete_many(expired)))
+
+    def expire(self) -> int:
+        """Reclaims a bounded number of records whose ttl has passed.
+
+        Called on every set, so expired records that are never accessed again
+        are reclaimed without scanning the storage backends.
+
+        Returns
+        -------
+        int
+            Number of candidate records reclaimed.
+        """
+        if not len(self.timer_wheel):
+            return 0
+
+        fired = self.timer_wheel.advance()
+        if fired:
+            self._reclaim(fired)
+
+        return len(fired)
+
+    def __len__(self) -> int:
+        # Exact and O(1), once expired records are reclaimed and records that
+        # may have left are checked.
+        if len(self.timer_wheel):
+            self._reclaim_due()
+        if self.maybe_lost:
+            self._settle_lost()
+
+        return self.num_keys
+
+    def _reclaim_due(self):
+        # Reclaims every record whose ttl has passed, fired or not, so len
+        # never counts a record that keys would skip.
+        while True:
+            fired = self.timer_wheel.advance()
+            if not fired:
+                break
+            self._reclaim(fired)
+
+        due = self.timer_wheel.due()
+        if due:
+            self._reclaim(due)
+
+    def approx_len(self) -> int:
+        """Returns the estimated number of keys, without waiting on any tier.
+
+        The highest level cache and the demotion buffer are counted exactly.
+        Every lower tier keeps a HyperLogLog sketch of the keys that entered
+        it, so its records are estimated without scanning its storage, with
+        a relative standard error of 0.8% at the default precision. Sketches
+        cannot forget keys, so a sketch is rebuilt from the keys of its tier
+        once the keys that left the tier reach rebuild_ratio of its
+        estimate, and overestimates by up to rebuild_ratio until then. With
+        inclusive, copies in several tiers are counted once per tier. Needs
+        approximate_len.
+
+        Returns
+        -------
+        int
+            Estimated number of keys.
+        """
+        assert (
+            self.sketch_kwargs is not None
+        ), "Sketches are only kept with approximate_len."
+
+        num_keys = len(self.caches[0])
+        if self.demotion_buffer is not None:
+            num_keys += len(self.demotion_buffer)
+
+        return num_keys + sum(len(cache.sketch) for cache in self.caches[1:])
+
+    def _maybe_rebuild_sketches(self):
+        # Only called from the lower tier paths, never by hits or puts that
+        # stay in the highest level cache. Holding the lower tiers lock, no
+        # other thread changes the keys of a tier while it is scanned, and
+        # rebuilding once rebuild_ratio of the keys left keeps the cost O(1)
+        # per removed key.
+        if self.sketch_kwargs is None:
+            return
+
+        with self._lower_tiers_lock():
+            for cache in self.caches[1:]:
+                if cache.num_forgotten <= self.rebuild_ratio * len(cache.sketch):
+                    continue
+
+                sketch = HyperLogLog(**self.sketch_kwargs)
+                keys = cache.iter_keys()
+                while True:
+                    chunk = list(itertools.islice(keys, 1000))
+                    if not chunk:
+                        break
+                    sketch.add_many(chunk)
+
+                cache.sketch = sketch
+                cache.num_forgotten = 0
 
     def __setitem__(self, key: str, value: object):
-        del self[key]
+        return GenericCache._first_eviction(self._set(key, value))
+
+    def set(self, key: str, value: object, ttl: Optional[float] = None):
+        """Puts key and value into the highest level cache.
+
+        Parameters
+        ----------
+        key : str
+            Key to put.
+        value : object
+            Value to put.
+        ttl : Optional[float]
+            Seconds after which key expires. Uses the default ttl of the
+            highest level cache if None.
+
+        Returns
+        -------
+        Returns the record evicted from the lowest tier, as with
+        `__setitem__`, or None. If the put evicted several records, for
+        instance to fit a byte budget, only the first is returned, while
+        set_many returns every one of them.
+        """
+        return GenericCache._first_eviction(self._set(key, value, ttl))
+
+    def _set(
+        self, key: str, value: object, ttl: Optional[float] = None
+    ) -> List[Tuple[str, object]]:
+        start = None if self.metrics is None else self.metrics.now()
+
+        self.expire()
+
+        with self._key_lock(key):
+            if not self._delete(key):
+                self._added([key])
+
+            # Scheduled before the put so an eviction never sees a stale ttl.
+            self._schedule(key, ttl)
+            evicted = self._put_many([(key, value)])
 
-        evicted = (key, value)
-        for cache in self.caches:
-            evicted = cache.put(*evicted)
-            if evicted is None:
-                return None
+        if start is not None:
+            self.metrics.record("set", start)
+
+        if self.resizer is not None:
+            self._maybe_adapt()
 
         return evicted
 
     def __getitem__(self, key: str):
-        value = None
-        for cache in self.caches:
-            if key in cache:
-                value = cache.pop(key)
+        if self.metrics is not None:
+            return self._measured_get(key)
 
-        # Move retrieved value to highest level cache.
-        if value is None:
+        if self._is_expired(key):
             return None
-        else:
-            self.__setitem__(key, value)
+
+        # Hits in the highest level cache only update its recency.
+        with self.hot_lock:
+            value = self.caches[0].get(key)
+        if value is not None:
             return value
 
+        return self._get_lower(key)[0]
+
+    def _get(self, key: str) -> Tuple[Optional[object], List[Tuple[str, object]]]:
+        # Gets key as __getitem__ does, and also returns the records that
+        # promoting it evicted from the lowest tier, for callers that keep
+        # tiers of their own below this RoomDict.
+        if self._is_expired(key):
+            return None, []
+
+        with self.hot_lock:
+            value = self.caches[0].get(key)
+        if value is not None:
+            return value, []
+
+        return self._get_lower(key)
+
+    def _measured_get(self, key: str) -> Optional[object]:
+        start = self.metrics.now()
+
+        value = None
+        if not self._is_expired(key):
+            with self.hot_lock:
+                value = self.caches[0].get(key)
+
+            if value is not None:
+                self._count_hits(0, 1)
+            else:
+                value = self._get_lower(key)[0]
+
+        self.metrics.record("get", start)
+
+        if self.resizer is not None:
+            self._maybe_adapt()
+
+        return value
+
+    def _get_lower(
+        self, key: str
+    ) -> Tuple[Optional[object], List[Tuple[str, object]]]:
+        # Looks key up again in every tier and promotes a lower tier hit.
+        # Returns its value and the records evicted from the lowest tier.
+        with self._key_lock(key):
+            tier, value = self._find(key)
+
+            evicted = []
+            if tier and self.promotion_policy.should_promote(key, tier):
+                evicted = self._promote({key: value}, {key: tier})
+
+            return value, evicted
+
+    def _find(self, key: str) -> Tuple[Optional[int], Optional[object]]:
+        # Returns the tier holding key and its value. Records staged for the
+        # lower tiers count as being in the second tier.
+        with self.hot_lock:
+            value = self.caches[0].get(key)
+            if value is not None:
+                if self.metrics is not None:
+                    self._count_hits(0, 1)
+                return 0, value
+            if self.metrics is not None:
+                self._count_misses(0, [key])
+
+            if self.demotion_buffer is not None:
+                value = self.demotion_buffer.get(key)
+                if value is not None:
+                    if self.metrics is not None:
+                        self.metrics.count(1, "hits")
+                    return 1, value
+
+        with self._lower_tiers_lock():
+            for tier, cache in enumerate(self.caches[1:], 1):
+                value = cache.get(key)
+                if value is not None:
+                    if self.metrics is not None:
+                        self._count_hits(tier, 1)
+                    return tier, value
+                if self.metrics is not None:
+                    self._count_misses(tier, [key])
+
+        return None, None
+
+    def _promote(
+        self, records: Dict[str, object], tiers: Dict[str, int]
+    ) -> List[Tuple[str, object]]:
+        # Moves or copies records found in the lower tiers to the highest
+        # level cache, keeping their ttls. Returns the records evicted from
+        # the lowest tier.
+        if self.metrics is not None:
+            for key in records:
+                self.metrics.count(tiers[key], "promotions")
+
+        if not self.inclusive:
+            with self.hot_lock:
+                if self.demotion_buffer is not None:
+                    self.demotion_buffer.discard_many(records)
+
+            keys_by_tier: Dict[int, List[str]] = {}
+            for key in records:
+                keys_by_tier.setdefault(tiers[key], []).append(key)
+
+            with self._lower_tiers_lock():
+                for tier, keys in keys_by_tier.items():
+                    self.caches[tier].delete_many(keys)
+
+        return self._put_many(list(records.items()))
+
     def __delitem__(self, key: str):
-        for cache in self.caches:
-            if key in cache:
-                del cache[key]
+        start = None if self.metrics is None else self.metrics.now()
 
-    def __iter__(self) -> Iterable:
-        raise NotImplementedError
+        if self._delete(key):
+            self._removed(1)
+
+        if start is not None:
+            self.metrics.record("delete", start)
+
+    def _delete(self, key: str) -> bool:
+        # Returns whether any tier held key.
+        with self._key_lock(key):
+            self.promotion_policy.forget(key)
+
+            found = False
+            with self.hot_lock:
+                if key in self.caches[0]:
+                    del self.caches[0][key]
+                    found = True
+
+                if self.demotion_buffer is not None and key in self.demotion_buffer:
+                    self.demotion_buffer.discard(key)
+                    found = True
+
+            with self._lower_tiers_lock():
+                for cache in self.caches[1:]:
+                    if key in cache:
+                        del cache[key]
+                        found = True
+
+                self._maybe_rebuild_sketches()
+
+            self.timer_wheel.cancel(key)
+
+            self._settle([key], {key} if found else set())
+
+            return found
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, object]:
+        """Gets the values of every key in keys.
+
+        Keys are resolved tier by tier: each tier is only asked once, for
+        the keys that no faster tier had. Records found in the lower tiers
+        are promoted as with `__getitem__`.
+
+        Parameters
+        ----------
+        keys : Iterable[str]
+            Keys to get.
+
+        Returns
+        -------
+        Dict[str, object]
+            Mapping of every found key to its value. Missing keys are left out.
+        """
+        start = None if self.metrics is None else self.metrics.now()
+
+        remaining = self._unexpired(list(dict.fromkeys(keys)))
+        num_keys = len(remaining)
+
+        # Hits in the highest level cache only update its recency.
+        with self.hot_lock:
+            found = self.caches[0].get_many(remaining)
+        remaining = [key for key in remaining if key not in found]
+
+        if start is not None and found:
+            self._count_hits(0, len(found))
+
+        if remaining:
+            with self._key_locks(remaining):
+                hits, tiers = self._find_many(remaining)
+
+                promoted = {
+                    key: value
+                    for key, value in hits.items()
+                    if tiers[key]
+                    and self.promotion_policy.should_promote(key, tiers[key])
+                }
+                if promoted:
+                    self._promote(promoted, tiers)
+
+            found.update(hits)
+
+        if start is not None:
+            self.metrics.record("get_many", start)
+
+        if self.resizer is not None:
+            self._maybe_adapt(num_keys)
+
+        return found
+
+    def _find_many(
+        self, keys: List[str]
+    ) -> Tuple[Dict[str, object], Dict[str, int]]:
+        # Returns the values of the found keys and the tiers holding them.
+        tiers = {}
+
+        with self.hot_lock:
+            found = self.caches[0].get_many(keys)
+            tiers.update(dict.fromkeys(found, 0))
+            remaining = [key for key in keys if key not in found]
+            if self.metrics is not None:
+                self._count_hits(0, len(found))
+                self._count_misses(0, remaining)
+
+            if remaining and self.demotion_buffer is not None:
+                hits = self.demotion_buffer.get_many(remaining)
+                found.update(hits)
+                tiers.update(dict.fromkeys(hits, 1))
+                remaining = [key for key in remaining if key not in hits]
+                if self.metrics is not None:
+                    self.metrics.count(1, "hits", len(hits))
+
+        with self._lower_tiers_lock():
+            for tier, cache in enumerate(self.caches[1:], 1):
+                if not remaining:
+                    break
+
+                hits = cache.get_many(remaining)
+                found.update(hits)
+                tiers.update(dict.fromkeys(hits, tier))
+                remaining = [key for key in remaining if key not in hits]
+                if self.metrics is not None:
+                    self._count_hits(tier, len(hits))
+                    self._count_misses(tier, remaining)
+
+        return found, tiers
+
+    def set_many(
+        self, records: Iterable[Tuple[str, object]], ttl: Optional[float] = None
+    ) -> List[Tuple[str, object]]:
+        """Puts every key and value in records.
+
+        Records evicted from a tier are written to the next tier as one batch.
+
+        Parameters
+        ----------
+        records : Iterable[Tuple[str, object]]
+            Keys and values to put. Later values win for repeated keys.
+        ttl : Optional[float]
+            Seconds after which the records expire. Uses the default ttl of
+            the highest level cache if None.
+
+        Returns
+        -------
+        List[Tuple[str, object]]
+            Records evicted from the lowest tier.
+        """
+        start = None if self.metrics is None else self.metrics.now()
+
+        records = dict(records)
+
+        self.expire()
+
+        with self._key_locks(records):
+            found = self._delete_many(records)
+            self._added([key for key in records if key not in found])
+
+            for key in records:
+                self._schedule(key, ttl)
+
+            evicted = self._put_many(list(records.items()))
+
+        if start is not None:
+            self.metrics.record("set_many", start)
+
+        if self.resizer is not None:
+            self._maybe_adapt(len(records))
+
+        return evicted
+
+    def _put_many(
+        self, records: List[Tuple[str, object]]
+    ) -> List[Tuple[str, object]]:
+        # A put may evict several records when a tier has a byte budget.
+        with self.hot_lock:
+            evicted = self.caches[0].put_many(records)
+            if self.metrics is not None:
+                self.metrics.count(0, "puts", len(records))
+            self._evicted(0, evicted)
+
+            evicted = self._stage(evicted)
+
+        return self._demote(evicted)
+
+    def _stage(self, evicted: List[Tuple[str, object]]) -> List[Tuple[str, object]]:
+        # Called holding hot_lock, so records evicted from the highest level
+        # cache are in the demotion buffer before another thread misses them.
+        evicted = self._drop_expired(evicted)
+        if evicted and self.demotion_buffer is not None:
+            self.demotion_buffer.stage_many(evicted)
+
+        return evicted
+
+    def _demote(self, evicted: List[Tuple[str, object]]) -> List[Tuple[str, object]]:
+        if not evicted:
+            return []
+
+        if self.demotion_buffer is not None:
+            # Without write_behind the buffer is written on this thread, so
+            # lowest tier evictions are returned as without a buffer.
+            return self.demotion_buffer.settle()
+
+        return self._write_lower_tiers(evicted)
+
+    def resize(self, tier: int, max_size: int) -> List[Tuple[str, object]]:
+        """Changes the max size of a tier.
+
+        Records over the new max size are demoted to the next tier as one
+        batch, as evictions are.
+
+        Parameters
+        ----------
+        tier : int
+            Index of the tier, whose cache policy must have a max size.
+        max_size : int
+            New maximum number of records of the tier.
+
+        Returns
+        -------
+        List[Tuple[str, object]]
+            Records evicted from the lowest tier.
+        """
+        assert (
+            getattr(self.caches[tier], "max_size", None) is not None
+        ), "Tier {} has no max size to change.".format(tier)
+
+        if tier == 0:
+            with self.hot_lock:
+                evicted = self.caches[0].resize(max_size)
+                self._evicted(0, evicted)
+
+                evicted = self._stage(evicted)
+
+            return self._demote(evicted)
+
+        with self._lower_tiers_lock():
+            evicted = self.caches[tier].resize(max_size)
+            self._evicted(tier, evicted)
+
+            return self._write_lower_tiers(evicted, tier + 1)
+
+    def _maybe_adapt(self, num_operations: int = 1):
+        # Resizes the tiers once every interval operations, in the thread
+        # that finishes the interval. Other threads never wait for it.
+        if not self.resizer.tick(num_operations):
+            return
+
+        if not self.resize_lock.acquire(blocking=False):
+            return
+
+        try:
+            max_sizes = [getattr(cache, "max_size", None) for cache in self.caches]
+            sizes = [cache.size for cache in self.caches]
+            new_sizes = self.resizer.adapt(max_sizes, sizes, self.metrics.counts())
+            for tier, (max_size, new_size) in enumerate(zip(max_sizes, new_sizes)):
+                if new_size is not None and new_size != max_size:
+                    self.resize(tier, new_size)
+        finally:
+            self.resize_lock.release()
+
+    def delete_many(self, keys: Iterable[str]):
+        """Deletes every key in keys from every tier. Missing keys are ignored.
+
+        Parameters
+        ----------
+        keys : Iterable[str]
+            Keys to delete.
+        """
+        start = None if self.metrics is None else self.metrics.now()
+
+        self._removed(len(self._delete_many(keys)))
+
+        if start is not None:
+            self.metrics.record("delete_many", start)
+
+    def _delete_many(self, keys: Iterable[str]) -> set:
+        # Returns the keys any tier held.
+        keys = list(dict.fromkeys(keys))
+
+        with self._key_locks(keys):
+            found = self._existing(keys)
+
+            for key in keys:
+                self.promotion_policy.forget(key)
+
+            with self.hot_lock:
+                self.caches[0].delete_many(keys)
+
+                if self.demotion_buffer is not None:
+                    self.demotion_buffer.discard_many(keys)
+
+            with self._lower_tiers_lock():
+                for cache in self.caches[1:]:
+                    cache.delete_many(keys)
+
+                self._maybe_rebuild_sketches()
+
+            for key in keys:
+                self.timer_wheel.cancel(key)
+
+            self._settle(keys, found)
+
+            return found
+
+    def contains_many(self, keys: Iterable[str]) -> List[bool]:
+        """Checks whether each key in keys is in any tier.
+
+        Parameters
+        ----------
+        keys : Iterable[str]
+            Keys to check.
+
+        Returns
+        -------
+        List[bool]
+            Whether each key is in the RoomDict, in the order of keys.
+        """
+        start = None if self.metrics is None else self.metrics.now()
+
+        keys = list(keys)
+
+        found = set()
+        remaining = self._unexpired(list(dict.fromkeys(keys)))
+
+        with self.hot_lock:
+            remaining = self._contains_many(self.caches[0], remaining, found)
+
+        if remaining:
+            with self._key_locks(remaining):
+                with self.hot_lock:
+                    remaining = self._contains_many(self.caches[0], remaining, found)
+
+                    if remaining and self.demotion_buffer is not None:
+                        found.update(
+                            key for key in remaining if key in self.demotion_buffer
+                        )
+                        remaining = [key for key in remaining if key not in found]
+
+                with self._lower_tiers_lock():
+                    for cache in self.caches[1:]:
+                        remaining = self._contains_many(cache, remaining, found)
+
+        if start is not None:
+            self.metrics.record("contains_many", start)
+
+        return [key in found for key in keys]
+
+    def _contains_many(self, cache, keys: List[str], found: set) -> List[str]:
+        if not keys:
+            return keys
+
+        is_contained = cache.contains_many(keys)
+        found.update(key for key, hit in zip(keys, is_contained) if hit)
+
+        return [key for key, hit in zip(keys, is_contained) if not hit]
+
+    def __iter__(self) -> Iterator[str]:
+        return self.keys()
+
+    def keys(self, chunk_size: int = 1000) -> Iterator[str]:
+        """Yields every key in the RoomDict once, streaming through every tier.
+
+        See `items`.
+
+        Parameters
+        ----------
+        chunk_size : int
+            Number of keys read from a tier at a time.
+        """
+        for records in self._chunks(chunk_size, read_values=False):
+            for key, _ in records:
+                yield key
+
+    def values(self, chunk_size: int = 1000) -> Iterator[object]:
+        """Yields the value of every key in the RoomDict. See `items`.
+
+        Parameters
+        ----------
+        chunk_size : int
+            Number of records read from a tier at a time.
+        """
+        for records in self._chunks(chunk_size, read_values=True):
+            for _, value in records:
+                yield value
+
+    def items(self, chunk_size: int = 1000) -> Iterator[Tuple[str, object]]:
+        """Yields every key and value in the RoomDict, streaming through every tier.
+
+        Tiers are read from the highest level cache down, chunk_size records
+        at a time, so memory use does not grow with the number of records.
+        Records are not promoted and their recency is left as it is. A key
+        held by several tiers is yielded once, with the value of the highest.
+        Expired records are skipped. As with dict, the RoomDict must not
+        change while iterating.
+
+        Parameters
+        ----------
+        chunk_size : int
+            Number of records read from a tier at a time. Values of a chunk
+            are read from the storage in one batch.
+        """
+        for records in self._chunks(chunk_size, read_values=True):
+            yield from records
+
+    def _chunks(
+        self, chunk_size: int, read_values: bool
+    ) -> Iterator[List[Tuple[str, object]]]:
+        assert (
+            chunk_size > 0
+        ), "Chunk size should be greater than 0. Chunk size is {}".format(chunk_size)
+
+        # Staged records are written to the lower tiers first, so every record
+        # is in exactly one tier's storage.
+        self.flush()
+
+        for tier, cache in enumerate(self.caches):
+            lock = self.hot_lock if tier == 0 else self._lower_tiers_lock()
+
+            # Locks are only held while reading a chunk, never while yielding.
+            with lock:
+                keys = cache.iter_keys()
+            while True:
+                with lock:
+                    chunk = list(itertools.islice(keys, chunk_size))
+                    if not chunk:
+                        break
+
+                    chunk = self._visible(tier, chunk)
+                    if read_values and chunk:
+                        values = cache.peek_many(chunk)
+                        records = [(key, values[key]) for key in chunk]
+                    else:
+                        records = [(key, None) for key in chunk]
+
+                if records:
+                    yield records
+
+    def range(
+        self, lo: Optional[str] = None, hi: Optional[str] = None, chunk_size: int = 1000
+    ) -> Iterator[Tuple[str, object]]:
+        """Yields every key from lo, included, to hi, excluded, and its value.
+
+        Records are yielded in key order, merged from the sorted index of
+        every tier, so the cost is O(log n) to start and O(1) per record.
+        Otherwise as `items`, whose caveats apply. Needs sorted_keys.
+
+        Parameters
+        ----------
+        lo : Optional[str]
+            Smallest key to yield. Starts from the smallest key if None.
+        hi : Optional[str]
+            Key to stop before. Goes on to the largest key if None.
+        chunk_size : int
+            Number of records whose values are read at a time.
+        """
+        return self._ordered(lo, hi, None, chunk_size)
+
+    def prefix(
+        self, prefix: str, chunk_size: int = 1000
+    ) -> Iterator[Tuple[str, object]]:
+        """Yields every key starting with prefix and its value, in key order.
+
+        See `range`. Needs sorted_keys.
+
+        Parameters
+        ----------
+        prefix : str
+            Start of the keys to yield.
+        chunk_size : int
+            Number of records whose values are read at a time.
+        """
+        return self._ordered(prefix, None, prefix, chunk_size)
+
+    def _ordered(
+        self,
+        lo: Optional[str],
+        hi: Optional[str],
+        prefix: Optional[str],
+        chunk_size: int,
+    ) -> Iterator[Tuple[str, object]]:
+        assert self.sorted_keys, "Ordered queries are only kept with sorted_keys."
+        assert (
+            chunk_size > 0
+        ), "Chunk size should be greater than 0. Chunk size is {}".format(chunk_size)
+
+        self.flush()
+
+        # Copies of a key are merged in tier order, so the highest comes first.
+        merged = heapq.merge(
+            *(
+                zip(cache.key_index.irange(lo, hi), itertools.repeat(tier))
+                for tier, cache in enumerate(self.caches)
+            )
+        )
+        if prefix is not None:
+            merged = itertools.takewhile(
+                lambda found: found[0].startswith(prefix), merged
+            )
+
+        previous_key = None
+        while True:
+            with self.hot_lock, self._lower_tiers_lock():
+                chunk = []
+                for key, tier in merged:
+                    if key == previous_key:
+                        continue
+                    previous_key = key
+
+                    chunk.append((key, tier))
+                    if len(chunk) == chunk_size:
+                        break
+                if not chunk:
+                    return
+
+                records = self._peek(chunk)
+
+            yield from records
+
+    def _peek(self, found: List[Tuple[str, int]]) -> List[Tuple[str, object]]:
+        # Reads the values of keys from the tiers holding them, one batch per
+        # tier, leaving out expired records and keys a tier no longer holds.
+        if len(self.timer_wheel):
+            now = self.timer_wheel.now()
+            found = [
+                (key, tier)
+                for key, tier in found
+                if not self.timer_wheel.is_expired(key, now)
+            ]
+
+        keys_by_tier: Dict[int, List[str]] = {}
+        for key, tier in found:
+            keys_by_tier.setdefault(tier, []).append(key)
+
+        values = {}
+        for tier, keys in keys_by_tier.items():
+            values.update(self.caches[tier].peek_many(keys))
+
+        return [(key, values[key]) for key, _ in found if key in values]
+
+    def _visible(self, tier: int, keys: List[str]) -> List[str]:
+        # Returns the keys of tier that are neither expired nor held by a
+        # higher tier, whose copy is the current one.
+        if len(self.timer_wheel):
+            now = self.timer_wheel.now()
+            keys = [key for key in keys if not self.timer_wheel.is_expired(key, now)]
+
+        for cache in self.caches[:tier]:
+            if not keys:
+                break
+
+            keys = [
+                key
+                for key, is_shadowed in zip(keys, cache.contains_many(keys))
+                if not is_shadowed
+            ]
+
+        return keys
 
     def __contains__(self, key: str) -> bool:
-        for cache in self.caches:
-            if key in cache:
+        if self.metrics is None:
+            return self._contains(key)
+
+        start = self.metrics.now()
+        is_contained = self._contains(key)
+        self.metrics.record("contains", start)
+
+        return is_contained
+
+    def _contains(self, key: str) -> bool:
+        if self._is_expired(key):
+            return False
+
+        with self.hot_lock:
+            if key in self.caches[0]:
                 return True
 
+        with self._key_lock(key):
+            with self.hot_lock:
+                if key in self.caches[0]:
+                    return True
+
+                if self.demotion_buffer is not None and key in self.demotion_buffer:
+                    return True
+
+            with self._lower_tiers_lock():
+                for cache in self.caches[1:]:
+                    if key in cache:
+                        return True
+
         return False
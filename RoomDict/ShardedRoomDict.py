@@ -0,0 +1,303 @@
+import heapq
+import os
+import zlib
+from collections.abc import Iterable, MutableMapping
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from RoomDict.RoomDict import STORAGE_BACKEND_MAPPING, RoomDict
+from RoomDict.Stats import Stats
+
+
+class ShardedRoomDict(MutableMapping):
+    def __init__(
+        self,
+        num_shards: int,
+        cache_policies: List[str],
+        membership_tests: List[str],
+        storage_backends: List[str],
+        cache_policies_kwargs: Optional[List[dict]] = None,
+        membership_tests_kwargs: Optional[List[dict]] = None,
+        storage_backends_kwargs: Optional[List[dict]] = None,
+        write_behind: bool = False,
+        write_behind_kwargs: Optional[dict] = None,
+        ttls: Optional[List[Optional[float]]] = None,
+        ttl_kwargs: Optional[dict] = None,
+        snapshot_path: Optional[str] = None,
+        promotion_policy: str = "always",
+        promotion_policy_kwargs: Optional[dict] = None,
+        inclusive: bool = False,
+        collect_stats: bool = False,
+        stats_kwargs: Optional[dict] = None,
+        adaptive_sizes: bool = False,
+        adaptive_sizes_kwargs: Optional[dict] = None,
+        sorted_keys: bool = False,
+        approximate_len: bool = False,
+        approximate_len_kwargs: Optional[dict] = None,
+    ):
+        """Initialize a thread safe RoomDict that splits its keys over shards.
+
+        Every shard is an independent, thread safe RoomDict with its own cache
+        hierarchy and locks, so threads working on different shards never
+        contend. Cache sizes in cache_policies_kwargs are per shard.
+
+        Parameters
+        ----------
+        num_shards : int
+            Number of shards.
+        cache_policies : List[str]
+            List of cache policy strings.
+        membership_tests : List[str]
+            List of membership test strings.
+        storage_backends : List[str]
+            List of storage backend strings.
+            Order implies the storage hierarchy.
+        cache_policies_kwargs: Optional[List[dict]]
+            Dictionary of cache policies initialization kwargs.
+        membership_tests_kwargs: Optional[List[dict]]
+            Dictionary of membership tests initialization kwargs.
+        storage_backends_kwargs : Optional[List[dict]]
+            Dictionary of storage backend initialization kwargs.
+        write_behind : bool
+            Whether each shard writes evictions to its lower tiers in the
+            background.
+        write_behind_kwargs : Optional[dict]
+            WriteBehindBuffer initialization kwargs.
+        ttls : Optional[List[Optional[float]]]
+            Default time to live in seconds of records entering each tier.
+        ttl_kwargs : Optional[dict]
+            TimerWheel initialization kwargs.
+        snapshot_path : Optional[str]
+            File to save the state of every tier to on exit, for a warm
+            restart. Each shard uses its own file next to it.
+        promotion_policy : str
+            Promotion policy string of lower tier hits.
+        promotion_policy_kwargs : Optional[dict]
+            Promotion policy initialization kwargs.
+        inclusive : bool
+            Whether promoted records are copied instead of moved.
+        collect_stats : bool
+            Whether every shard keeps stats, see `stats`.
+        stats_kwargs : Optional[dict]
+            Stats initialization kwargs. An exporter is called with the
+            stats of each shard separately.
+        adaptive_sizes : bool
+            Whether every shard resizes its tiers as the workload changes.
+        adaptive_sizes_kwargs : Optional[dict]
+            TierResizer initialization kwargs. Limits are per shard, while a
+            memory_limit is on the whole process, so every shard shrinks
+            when it is passed.
+        sorted_keys : bool
+            Whether every shard keeps sorted indexes, for `range` and
+            `prefix`.
+        approximate_len : bool
+            Whether the lower tiers of every shard keep HyperLogLog sketches
+            of their keys, for `approx_len`.
+        approximate_len_kwargs : Optional[dict]
+            HyperLogLog initialization kwargs and rebuild_ratio, per shard.
+
+        Returns
+        -------
+        ShardedRoomDict
+            ShardedRoomDict with chosen parameters.
+        """
+        assert (
+            num_shards > 0
+        ), "Number of shards should be greater than 0. Number of shards is {}".format(  # noqa: E501
+            num_shards
+        )
+
+        if storage_backends_kwargs is None:
+            storage_backends_kwargs = []
+        storage_backends_kwargs = list(storage_backends_kwargs) + [{}] * (
+            len(storage_backends) - len(storage_backends_kwargs)
+        )
+
+        self.shards: List[RoomDict] = []
+        for shard in range(num_shards):
+            shard_storage_kwargs = [
+                STORAGE_BACKEND_MAPPING[storage_backend].shard_kwargs(
+                    storage_kwargs, shard
+                )
+                for storage_backend, storage_kwargs in zip(
+                    storage_backends, storage_backends_kwargs
+                )
+            ]
+
+            shard_snapshot_path = None
+            if snapshot_path is not None:
+                directory, fname = os.path.split(snapshot_path)
+                shard_snapshot_path = os.path.join(
+                    directory, "shard{}_{}".format(shard, fname)
+                )
+
+            self.shards.append(
+                RoomDict(
+                    cache_policies,
+                    membership_tests,
+                    storage_backends,
+                    [dict(kwargs) for kwargs in cache_policies_kwargs or []],
+                    [dict(kwargs) for kwargs in membership_tests_kwargs or []],
+                    shard_storage_kwargs,
+                    write_behind=write_behind,
+                    write_behind_kwargs=write_behind_kwargs,
+                    thread_safe=True,
+                    ttls=ttls,
+                    ttl_kwargs=ttl_kwargs,
+                    snapshot_path=shard_snapshot_path,
+                    promotion_policy=promotion_policy,
+                    promotion_policy_kwargs=promotion_policy_kwargs,
+                    inclusive=inclusive,
+                    collect_stats=collect_stats,
+                    stats_kwargs=stats_kwargs,
+                    adaptive_sizes=adaptive_sizes,
+                    adaptive_sizes_kwargs=adaptive_sizes_kwargs,
+                    sorted_keys=sorted_keys,
+                    approximate_len=approximate_len,
+                    approximate_len_kwargs=approximate_len_kwargs,
+                )
+            )
+
+    def _shard(self, key: str) -> RoomDict:
+        # crc32 is stable across processes, unlike hash() of a str.
+        return self.shards[zlib.crc32(key.encode()) % len(self.shards)]
+
+    def _group(self, keys: Iterable[str]) -> Dict[int, List[str]]:
+        groups: Dict[int, List[str]] = {}
+        for key in keys:
+            shard = zlib.crc32(key.encode()) % len(self.shards)
+            groups.setdefault(shard, []).append(key)
+
+        return groups
+
+    def __enter__(self):
+        opened = []
+        try:
+            for shard in self.shards:
+                shard.__enter__()
+                opened.append(shard)
+        except BaseException:
+            for shard in opened:
+                shard.__exit__(None, None, None)
+            raise
+
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        for shard in self.shards:
+            shard.__exit__(exc_type, exc_value, traceback)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Waits until every shard has written its staged records.
+
+        Parameters
+        ----------
+        timeout : Optional[float]
+            Maximum number of seconds to wait for each shard.
+
+        Returns
+        -------
+        bool
+            True if nothing is left to write, False if a timeout expired.
+        """
+        return all([shard.flush(timeout) for shard in self.shards])
+
+    def stats(self) -> dict:
+        """Returns the stats of every shard added together, see RoomDict.stats."""
+        assert (
+            self.shards[0].metrics is not None
+        ), "Stats are only kept with collect_stats."
+
+        return Stats.combine(shard.metrics for shard in self.shards)
+
+    def __setitem__(self, key: str, value: object):
+        return self._shard(key).__setitem__(key, value)
+
+    def set(self, key: str, value: object, ttl: Optional[float] = None):
+        return self._shard(key).set(key, value, ttl)
+
+    def __getitem__(self, key: str):
+        return self._shard(key)[key]
+
+    def __delitem__(self, key: str):
+        del self._shard(key)[key]
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._shard(key)
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, object]:
+        found = {}
+        for shard, shard_keys in self._group(keys).items():
+            found.update(self.shards[shard].get_many(shard_keys))
+
+        return found
+
+    def set_many(
+        self, records: Iterable[Tuple[str, object]], ttl: Optional[float] = None
+    ) -> List[Tuple[str, object]]:
+        records = dict(records)
+
+        evicted = []
+        for shard, shard_keys in self._group(records).items():
+            evicted += self.shards[shard].set_many(
+                ((key, records[key]) for key in shard_keys), ttl
+            )
+
+        return evicted
+
+    def delete_many(self, keys: Iterable[str]):
+        for shard, shard_keys in self._group(keys).items():
+            self.shards[shard].delete_many(shard_keys)
+
+    def contains_many(self, keys: Iterable[str]) -> List[bool]:
+        keys = list(keys)
+
+        found = set()
+        for shard, shard_keys in self._group(keys).items():
+            is_contained = self.shards[shard].contains_many(shard_keys)
+            found.update(key for key, hit in zip(shard_keys, is_contained) if hit)
+
+        return [key in found for key in keys]
+
+    def __len__(self):
+        return sum(len(shard) for shard in self.shards)
+
+    def approx_len(self) -> int:
+        """Returns the estimated number of keys. See RoomDict.approx_len."""
+        # Shards hold disjoint keys, so their estimates add up.
+        return sum(shard.approx_len() for shard in self.shards)
+
+    def __iter__(self) -> Iterator[str]:
+        return self.keys()
+
+    def keys(self, chunk_size: int = 1000) -> Iterator[str]:
+        """Yields every key, shard by shard. See RoomDict.items."""
+        for shard in self.shards:
+            yield from shard.keys(chunk_size)
+
+    def values(self, chunk_size: int = 1000) -> Iterator[object]:
+        """Yields every value, shard by shard. See RoomDict.items."""
+        for shard in self.shards:
+            yield from shard.values(chunk_size)
+
+    def items(self, chunk_size: int = 1000) -> Iterator[Tuple[str, object]]:
+        """Yields every key and value, shard by shard. See RoomDict.items."""
+        for shard in self.shards:
+            yield from shard.items(chunk_size)
+
+    def range(
+        self, lo: Optional[str] = None, hi: Optional[str] = None, chunk_size: int = 1000
+    ) -> Iterator[Tuple[str, object]]:
+        """Yields the records from lo to hi of every shard, in key order."""
+        return heapq.merge(
+            *(shard.range(lo, hi, chunk_size) for shard in self.shards),
+            key=lambda record: record[0],
+        )
+
+    def prefix(
+        self, prefix: str, chunk_size: int = 1000
+    ) -> Iterator[Tuple[str, object]]:
+        """Yields the records under prefix of every shard, in key order."""
+        return heapq.merge(
+            *(shard.prefix(prefix, chunk_size) for shard in self.shards),
+            key=lambda record: record[0],
+        )
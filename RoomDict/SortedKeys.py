@@ -0,0 +1,136 @@
+import bisect
+from typing import Iterable, Iterator, List, Optional
+
+
+class SortedKeys:
+    def __init__(self, load: int = 512):
+        """Initialize an empty sorted set of keys.
+
+        Keys are kept in sorted blocks of at most 2 * load keys, and the
+        largest key of every block in a separate list. Finding a key bisects
+        the block maxima, then the block, so it is O(log n), and adding or
+        removing one only shifts a block. Iterating from any key costs
+        O(log n) to start and O(1) per key.
+
+        Parameters
+        ----------
+        load : int
+            Number of keys a block is split into halves of when it reaches
+            twice as many.
+        """
+        assert load > 0, "Load should be greater than 0. Load is {}".format(load)
+
+        self.load = load
+        self.blocks: List[List[str]] = []
+        self.maxes: List[str] = []
+        self.size = 0
+
+    def _locate(self, key: str) -> int:
+        # Returns the index of the first block whose largest key is not below
+        # key, or the number of blocks if there is none.
+        return bisect.bisect_left(self.maxes, key)
+
+    def add(self, key: str):
+        """Adds key if it is not already in the set."""
+        if not self.blocks:
+            self.blocks.append([key])
+            self.maxes.append(key)
+            self.size += 1
+            return
+
+        block_index = self._locate(key)
+        if block_index == len(self.blocks):
+            # Larger than every key, so it goes at the end of the last block.
+            block_index -= 1
+            self.blocks[block_index].append(key)
+            self.maxes[block_index] = key
+        else:
+            block = self.blocks[block_index]
+            index = bisect.bisect_left(block, key)
+            if index < len(block) and block[index] == key:
+                return
+            block.insert(index, key)
+
+        self.size += 1
+
+        block = self.blocks[block_index]
+        if len(block) >= 2 * self.load:
+            self.blocks.insert(block_index + 1, block[self.load :])
+            del block[self.load :]
+            self.maxes.insert(block_index, block[-1])
+
+    def update(self, keys: Iterable[str]):
+        """Adds every key in keys."""
+        for key in keys:
+            self.add(key)
+
+    def discard(self, key: str):
+        """Removes key if it is in the set."""
+        block_index = self._locate(key)
+        if block_index == len(self.blocks):
+            return
+
+        block = self.blocks[block_index]
+        index = bisect.bisect_left(block, key)
+        if index == len(block) or block[index] != key:
+            return
+
+        del block[index]
+        self.size -= 1
+
+        if not block:
+            del self.blocks[block_index]
+            del self.maxes[block_index]
+        elif index == len(block):
+            self.maxes[block_index] = block[-1]
+
+    def clear(self):
+        """Removes every key."""
+        self.blocks = []
+        self.maxes = []
+        self.size = 0
+
+    def irange(
+        self, lo: Optional[str] = None, hi: Optional[str] = None
+    ) -> Iterator[str]:
+        """Yields the keys from lo, included, to hi, excluded, in order.
+
+        Parameters
+        ----------
+        lo : Optional[str]
+            Smallest key to yield. Starts from the smallest key if None.
+        hi : Optional[str]
+            Key to stop before. Goes on to the largest key if None.
+        """
+        if lo is None:
+            block_index, index = 0, 0
+        else:
+            block_index = self._locate(lo)
+            index = 0
+            if block_index < len(self.blocks):
+                index = bisect.bisect_left(self.blocks[block_index], lo)
+
+        while block_index < len(self.blocks):
+            block = self.blocks[block_index]
+            for key in block[index:] if index else block:
+                if hi is not None and key >= hi:
+                    return
+                yield key
+
+            block_index += 1
+            index = 0
+
+    def __iter__(self) -> Iterator[str]:
+        return self.irange()
+
+    def __contains__(self, key: str) -> bool:
+        block_index = self._locate(key)
+        if block_index == len(self.blocks):
+            return False
+
+        block = self.blocks[block_index]
+        index = bisect.bisect_left(block, key)
+        return index < len(block) and block[index] == key
+
+    def __len__(self) -> int:
+        return self.size
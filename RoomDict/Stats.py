@@ -0,0 +1,309 @@
+import math
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional
+
+COUNTERS = [
+    "hits",
+    "misses",
+    "puts",
+    "evictions",
+    "promotions",
+    "filter_true_positives",
+    "filter_false_positives",
+]
+PERCENTILES = [50, 90, 99, 99.9]
+
+
+class Histogram:
+    def __init__(self, significant_bits: int = 7):
+        """Initialize a log-linear histogram of non-negative integers.
+
+        As in HdrHistogram, values below 2 ** significant_bits get a bucket
+        each, and every further power of two is split into
+        2 ** significant_bits buckets, so a recorded value is off by at most
+        a factor of 2 ** -significant_bits and recording is O(1).
+
+        Parameters
+        ----------
+        significant_bits : int
+            Number of bits of every value kept exactly.
+        """
+        assert (
+            significant_bits > 0
+        ), "Significant bits should be greater than 0. Significant bits is {}".format(  # noqa: E501
+            significant_bits
+        )
+
+        self.significant_bits = significant_bits
+        self.sub_buckets = 1 << significant_bits
+        self.reset()
+
+    def reset(self):
+        self.counts: List[int] = [0] * (2 * self.sub_buckets)
+        self.count = 0
+        self.total = 0
+        self.min: Optional[int] = None
+        self.max: Optional[int] = None
+
+    def _index(self, value: int) -> int:
+        if value < self.sub_buckets:
+            return value
+
+        # Keeps the leading significant_bits + 1 bits of value.
+        shift = value.bit_length() - self.significant_bits - 1
+        return (shift << self.significant_bits) + (value >> shift)
+
+    def _highest_value(self, index: int) -> int:
+        # Returns the largest value counted in the bucket at index.
+        if index < self.sub_buckets:
+            return index
+
+        shift = (index >> self.significant_bits) - 1
+        top = index - (shift << self.significant_bits)
+        return ((top + 1) << shift) - 1
+
+    def record(self, value: int):
+        if value < self.sub_buckets:
+            index = value
+        else:
+            index = self._index(value)
+        if index >= len(self.counts):
+            self.counts += [0] * (index + 1 - len(self.counts))
+
+        self.counts[index] += 1
+        self.count += 1
+        self.total += value
+        if self.max is None or value > self.max:
+            self.max = value
+        if self.min is None or value < self.min:
+            self.min = value
+
+    def merge(self, other: "Histogram"):
+        """Adds the values recorded by other, which has the same precision."""
+        assert (
+            other.significant_bits == self.significant_bits
+        ), "Histograms should have the same significant bits."
+
+        if len(other.counts) > len(self.counts):
+            self.counts += [0] * (len(other.counts) - len(self.counts))
+        for index, count in enumerate(other.counts):
+            self.counts[index] += count
+
+        self.count += other.count
+        self.total += other.total
+        for value in [other.min, other.max]:
+            if value is None:
+                continue
+            if self.min is None or value < self.min:
+                self.min = value
+            if self.max is None or value > self.max:
+                self.max = value
+
+    def percentile(self, percentile: float) -> Optional[int]:
+        """Returns the value below which percentile percent of values fall.
+
+        The value is the highest of its bucket, capped by the maximum, and
+        None if nothing was recorded.
+        """
+        if not self.count:
+            return None
+
+        rank = max(1, math.ceil(self.count * percentile / 100))
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return min(self._highest_value(index), self.max)
+
+        return self.max
+
+
+class _Recorder:
+    # Counters and histograms written by a single thread.
+    def __init__(self, num_tiers: int, significant_bits: int):
+        self.num_tiers = num_tiers
+        self.significant_bits = significant_bits
+        self.reset()
+
+    def reset(self):
+        self.counters: List[Dict[str, int]] = [
+            dict.fromkeys(COUNTERS, 0) for _ in range(self.num_tiers)
+        ]
+        self.latencies: Dict[str, Histogram] = {}
+
+    def merge(self, other: "_Recorder"):
+        for counters, other_counters in zip(self.counters, other.counters):
+            for name, count in other_counters.items():
+                counters[name] += count
+
+        for operation, histogram in list(other.latencies.items()):
+            if operation not in self.latencies:
+                self.latencies[operation] = Histogram(self.significant_bits)
+            self.latencies[operation].merge(histogram)
+
+
+class Stats:
+    def __init__(
+        self,
+        num_tiers: int,
+        exporter: Optional[Callable[[dict], None]] = None,
+        export_interval: Optional[float] = None,
+        significant_bits: int = 7,
+        clock: Callable[[], int] = time.perf_counter_ns,
+    ):
+        """Initialize per tier counters and per operation latency histograms.
+
+        Every thread records into its own counters and histograms, which are
+        only merged when they are read, so recording never takes a lock.
+
+        Parameters
+        ----------
+        num_tiers : int
+            Number of tiers to count for.
+        exporter : Optional[Callable[[dict], None]]
+            Function called with the snapshot every export_interval seconds
+            and on close.
+        export_interval : Optional[float]
+            Seconds between exports. Only exports on close if None.
+        significant_bits : int
+            Precision of the latency histograms, see Histogram.
+        clock : Callable[[], int]
+            Function returning the current time in nanoseconds.
+        """
+        assert (
+            export_interval is None or export_interval > 0
+        ), "Export interval should be greater than 0. Export interval is {}".format(  # noqa: E501
+            export_interval
+        )
+
+        self.num_tiers = num_tiers
+        self.exporter = exporter
+        self.export_interval = export_interval
+        self.significant_bits = significant_bits
+        self.now = clock
+
+        self.local = threading.local()
+        self.recorders: List[_Recorder] = []
+        self.recorders_lock = threading.Lock()
+
+        self.export_lock = threading.Lock()
+        self.next_export = None
+        if exporter is not None and export_interval is not None:
+            self.next_export = clock() + int(export_interval * 1e9)
+
+    def _recorder(self) -> _Recorder:
+        try:
+            return self.local.recorder
+        except AttributeError:
+            recorder = _Recorder(self.num_tiers, self.significant_bits)
+            with self.recorders_lock:
+                self.recorders.append(recorder)
+            self.local.recorder = recorder
+
+            return recorder
+
+    def counters(self, tier: int) -> Dict[str, int]:
+        """Returns the counters of tier of the calling thread, to add to."""
+        return self._recorder().counters[tier]
+
+    def count(self, tier: int, name: str, count: int = 1):
+        """Adds count to the counter called name of tier."""
+        self._recorder().counters[tier][name] += count
+
+    def record(self, operation: str, start: int):
+        """Records the latency of operation, which started at start."""
+        end = self.now()
+
+        latencies = self._recorder().latencies
+        histogram = latencies.get(operation)
+        if histogram is None:
+            histogram = latencies[operation] = Histogram(self.significant_bits)
+        histogram.record(end - start)
+
+        if self.next_export is not None and end >= self.next_export:
+            self._export_due(end)
+
+    def _export_due(self, now: int):
+        # Another thread already exporting will move the deadline.
+        if not self.export_lock.acquire(blocking=False):
+            return
+
+        try:
+            if now >= self.next_export:
+                self.next_export = now + int(self.export_interval * 1e9)
+                self.exporter(self.snapshot())
+        finally:
+            self.export_lock.release()
+
+    def export(self):
+        """Calls the exporter with the current snapshot, if there is one."""
+        if self.exporter is not None:
+            with self.export_lock:
+                self.exporter(self.snapshot())
+
+    def _merged(self) -> _Recorder:
+        merged = _Recorder(self.num_tiers, self.significant_bits)
+        with self.recorders_lock:
+            recorders = list(self.recorders)
+        for recorder in recorders:
+            merged.merge(recorder)
+
+        return merged
+
+    def counts(self) -> List[Dict[str, int]]:
+        """Returns the counters of every tier, summed over every thread."""
+        return [dict(counters) for counters in self._merged().counters]
+
+    def snapshot(self) -> dict:
+        """Returns the counters of every tier and the latency of every operation.
+
+        Returns
+        -------
+        dict
+            "tiers" holds a dict of counters per tier and "latencies" a dict
+            of count, mean, min, max and percentiles in seconds per
+            operation.
+        """
+        return self._summarize(self._merged())
+
+    @staticmethod
+    def _summarize(recorder: _Recorder) -> dict:
+        latencies = {}
+        for operation, histogram in sorted(recorder.latencies.items()):
+            if not histogram.count:
+                continue
+
+            latency = {
+                "count": histogram.count,
+                "mean": histogram.total / histogram.count / 1e9,
+                "min": histogram.min / 1e9,
+                "max": histogram.max / 1e9,
+            }
+            for percentile in PERCENTILES:
+                latency["p{:g}".format(percentile)] = (
+                    histogram.percentile(percentile) / 1e9
+                )
+            latencies[operation] = latency
+
+        return {
+            "tiers": [dict(counters) for counters in recorder.counters],
+            "latencies": latencies,
+        }
+
+    @classmethod
+    def combine(cls, stats: Iterable["Stats"]) -> dict:
+        """Returns the snapshot of the sum of stats, which count the same tiers."""
+        stats = list(stats)
+
+        combined = _Recorder(stats[0].num_tiers, stats[0].significant_bits)
+        for stat in stats:
+            combined.merge(stat._merged())
+
+        return cls._summarize(combined)
+
+    def reset(self):
+        """Zeroes every counter and histogram."""
+        with self.recorders_lock:
+            for recorder in self.recorders:
+                recorder.reset()
@@ -0,0 +1,263 @@
+import os
+import sys
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+
+def current_rss() -> Optional[int]:
+    """Returns the resident set size of the process in bytes, if known.
+
+    Falls back to the peak resident set size where the current one cannot
+    be read.
+    """
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        pass
+
+    if resource is None:
+        return None
+
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == "darwin":
+        return peak_rss
+    return peak_rss * 1024
+
+
+class TierResizer:
+    def __init__(
+        self,
+        limits: List[Optional[Tuple[int, int]]],
+        in_memory: List[bool],
+        interval: int = 10000,
+        step: float = 0.1,
+        grow_threshold: float = 0.02,
+        shrink_threshold: float = 0.002,
+        max_shrink_wait: int = 64,
+        memory_limit: Optional[int] = None,
+        rss: Callable[[], Optional[int]] = current_rss,
+    ):
+        """Initialize a controller of the max size of every tier.
+
+        Every tier remembers the keys it evicted last, as many as it could
+        still grow by. A miss on one of those ghost keys would have been a
+        hit in a larger tier. Every interval operations, a tier grows by a
+        step if such ghost hits were at least grow_threshold of its lookups,
+        and shrinks by a step if they were at most shrink_threshold. A tier
+        that has to grow right after shrinking waits twice as many intervals
+        as before, up to max_shrink_wait, before shrinking again, so a tier
+        just large enough seldom shrinks below what it needs. Tiers that are
+        not full do not shrink, since they hold no more than they need.
+
+        Parameters
+        ----------
+        limits : List[Optional[Tuple[int, int]]]
+            Smallest and largest max size of every tier. Tiers with None
+            keep their size.
+        in_memory : List[bool]
+            Whether every tier keeps its records in memory.
+        interval : int
+            Number of operations between resizes.
+        step : float
+            Fraction of its max size that a tier grows or shrinks by.
+        grow_threshold : float
+            Ghost hits per lookup at or above which a tier grows.
+        shrink_threshold : float
+            Ghost hits per lookup at or below which a tier shrinks.
+        max_shrink_wait : int
+            Largest number of intervals a tier waits before shrinking again.
+        memory_limit : Optional[int]
+            Resident set size in bytes over which in-memory tiers shrink by a
+            step per interval, whatever their ghost hits, and within a step
+            of which they do not grow.
+        rss : Callable[[], Optional[int]]
+            Function returning the resident set size of the process.
+        """
+        assert len(limits) == len(
+            in_memory
+        ), "Must have equal numbers of limits and in memory flags."
+        assert interval > 0, "Interval should be greater than 0. Interval is {}".format(
+            interval
+        )
+        assert 0 < step < 1, "Step should be in (0, 1). Step is {}".format(step)
+        assert (
+            shrink_threshold < grow_threshold
+        ), "Shrink threshold should be less than grow threshold."
+
+        self.limits = limits
+        self.in_memory = in_memory
+        self.interval = interval
+        self.step = step
+        self.grow_threshold = grow_threshold
+        self.shrink_threshold = shrink_threshold
+        self.max_shrink_wait = max_shrink_wait
+        self.memory_limit = memory_limit
+        self.rss = rss
+
+        self.num_operations = 0
+        self.lock = threading.Lock()
+
+        # Ghosts are bounded by how much their tier can grow, which is at
+        # most its largest max size until the first resize.
+        self.ghosts: List[OrderedDict] = [OrderedDict() for _ in limits]
+        self.ghost_sizes = [0 if limit is None else limit[1] for limit in limits]
+        self.ghost_hits = [0] * len(limits)
+
+        self.shrink_backoffs = [1] * len(limits)
+        self.shrink_waits = [0] * len(limits)
+        self.has_shrunk = [False] * len(limits)
+
+        self.previous_counts: Optional[List[Dict[str, int]]] = None
+        self.hit_ratios: List[Optional[float]] = [None] * len(limits)
+        self.ghost_hit_ratios: List[Optional[float]] = [None] * len(limits)
+
+    def tick(self, num_operations: int = 1) -> bool:
+        """Counts operations and returns whether an interval has passed."""
+        self.num_operations += num_operations
+        if self.num_operations < self.interval:
+            return False
+
+        self.num_operations = 0
+        return True
+
+    def evicted(self, tier: int, keys: Iterable[str]):
+        """Remembers keys evicted from tier."""
+        if self.limits[tier] is None:
+            return
+
+        ghost = self.ghosts[tier]
+        for key in keys:
+            ghost[key] = None
+            ghost.move_to_end(key)
+        while len(ghost) > self.ghost_sizes[tier]:
+            ghost.popitem(last=False)
+
+    def missed(self, tier: int, keys: Iterable[str]):
+        """Counts the keys missed by tier that it evicted recently."""
+        ghost = self.ghosts[tier]
+        if not ghost:
+            return
+
+        for key in keys:
+            # The key is read back into a tier, so it is counted once.
+            if ghost.pop(key, False) is None:
+                self.ghost_hits[tier] += 1
+
+    def _next_size(
+        self,
+        tier: int,
+        max_size: int,
+        size: int,
+        lookups: int,
+        ghost_hits: int,
+        is_over_memory: bool,
+        is_near_memory: bool,
+    ) -> int:
+        step = max(1, int(max_size * self.step))
+        has_shrunk = self.has_shrunk[tier]
+        self.has_shrunk[tier] = False
+
+        if is_over_memory and self.in_memory[tier]:
+            self.has_shrunk[tier] = True
+            return max_size - step
+
+        if lookups and ghost_hits >= self.grow_threshold * lookups:
+            if is_near_memory and self.in_memory[tier]:
+                return max_size
+
+            if has_shrunk:
+                self.shrink_backoffs[tier] = min(
+                    2 * self.shrink_backoffs[tier], self.max_shrink_wait
+                )
+                self.shrink_waits[tier] = self.shrink_backoffs[tier]
+            return max_size + step
+
+        if size < max_size:
+            return max_size
+
+        if lookups and ghost_hits <= self.shrink_threshold * lookups:
+            if self.shrink_waits[tier]:
+                self.shrink_waits[tier] -= 1
+                return max_size
+
+            self.has_shrunk[tier] = True
+            return max_size - step
+
+        return max_size
+
+    def adapt(
+        self,
+        max_sizes: List[Optional[int]],
+        sizes: List[int],
+        counts: List[Dict[str, int]],
+    ) -> List[Optional[int]]:
+        """Returns the next max size of every tier.
+
+        Parameters
+        ----------
+        max_sizes : List[Optional[int]]
+            Current max size of every tier.
+        sizes : List[int]
+            Current number of records of every tier.
+        counts : List[Dict[str, int]]
+            Total hits and misses of every tier so far, as kept by Stats.
+
+        Returns
+        -------
+        List[Optional[int]]
+            New max size of every tier, or None for tiers that keep theirs.
+        """
+        with self.lock:
+            rss = None if self.memory_limit is None else self.rss()
+            is_over_memory = rss is not None and rss > self.memory_limit
+            is_near_memory = rss is not None and rss > self.memory_limit * (
+                1 - self.step
+            )
+
+            new_sizes = []
+            for tier, (max_size, size, limit) in enumerate(
+                zip(max_sizes, sizes, self.limits)
+            ):
+                hits = counts[tier]["hits"]
+                lookups = hits + counts[tier]["misses"]
+                if self.previous_counts is not None:
+                    hits -= self.previous_counts[tier]["hits"]
+                    lookups -= (
+                        self.previous_counts[tier]["hits"]
+                        + self.previous_counts[tier]["misses"]
+                    )
+
+                ghost_hits = self.ghost_hits[tier]
+                self.ghost_hits[tier] = 0
+                self.hit_ratios[tier] = hits / lookups if lookups else None
+                self.ghost_hit_ratios[tier] = ghost_hits / lookups if lookups else None
+
+                if limit is None or max_size is None:
+                    new_sizes.append(None)
+                    continue
+
+                new_size = self._next_size(
+                    tier,
+                    max_size,
+                    size,
+                    lookups,
+                    ghost_hits,
+                    is_over_memory,
+                    is_near_memory,
+                )
+                min_size, max_limit = limit
+                new_size = min(max(new_size, min_size), max_limit)
+                new_sizes.append(new_size)
+
+                self.ghost_sizes[tier] = max_limit - new_size
+
+            self.previous_counts = [dict(tier_counts) for tier_counts in counts]
+
+            return new_sizes
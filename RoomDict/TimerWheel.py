@@ -0,0 +1,278 @@
+import math
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+
+class TimerWheel:
+    def __init__(
+        self,
+        resolution: float = 0.01,
+        num_slots: int = 64,
+        num_levels: int = 4,
+        sweep_limit: int = 16,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """Initialize a hierarchical timer wheel of key deadlines.
+
+        Level 0 has one slot per tick of resolution seconds, and every slot of
+        level l spans num_slots ** l ticks. A deadline is filed in the lowest
+        level that reaches it and moved down a level each time the wheel
+        passes the slot it was filed in, so scheduling, cancelling and firing
+        a deadline are all O(1).
+
+        Parameters
+        ----------
+        resolution : float
+            Seconds per tick. Deadlines fire up to one tick late.
+        num_slots : int
+            Number of slots per level.
+        num_levels : int
+            Number of levels. Deadlines beyond the last level are refiled
+            until they come into reach.
+        sweep_limit : int
+            Maximum number of fired keys returned by one call to advance.
+        clock : Callable[[], float]
+            Function returning the current time in seconds.
+        """
+        assert (
+            resolution > 0
+        ), "Resolution should be greater than 0. Resolution is {}".format(resolution)
+        assert (
+            num_slots > 1
+        ), "Number of slots should be greater than 1. Number of slots is {}".format(
+            num_slots
+        )
+        assert (
+            num_levels > 0
+        ), "Number of levels should be greater than 0. Number of levels is {}".format(  # noqa: E501
+            num_levels
+        )
+        assert (
+            sweep_limit > 0
+        ), "Sweep limit should be greater than 0. Sweep limit is {}".format(
+            sweep_limit
+        )
+
+        self.resolution = resolution
+        self.num_slots = num_slots
+        self.num_levels = num_levels
+        self.sweep_limit = sweep_limit
+        self.clock = clock
+
+        self.mutex = threading.Lock()
+
+        self.deadlines: Dict[str, float] = {}
+        self.wheels: List[List[Set[str]]] = [
+            [set() for _ in range(num_slots)] for _ in range(num_levels)
+        ]
+        # Level and slot of every filed key, or None once it has fired.
+        self.locations: Dict[str, Optional[Tuple[int, int]]] = {}
+        self.fired: Dict[str, None] = {}
+        self.current_tick = self._tick(clock())
+
+    def _tick(self, seconds: float) -> int:
+        return math.floor(seconds / self.resolution)
+
+    def now(self) -> float:
+        return self.clock()
+
+    def schedule(self, key: str, deadline: float):
+        """Sets the deadline of key, replacing any previous one.
+
+        Parameters
+        ----------
+        key : str
+            Key to schedule.
+        deadline : float
+            Time, as given by clock, at which key expires.
+        """
+        with self.mutex:
+            self._unfile(key)
+            self.deadlines[key] = deadline
+            self._file(key, math.ceil(deadline / self.resolution))
+
+    def cancel(self, key: str):
+        """Removes the deadline of key, if it has one."""
+        if key not in self.deadlines:
+            return
+
+        with self.mutex:
+            self._unfile(key)
+            self.deadlines.pop(key, None)
+
+    def deadline(self, key: str) -> Optional[float]:
+        """Returns the deadline of key, or None if it has none."""
+        return self.deadlines.get(key)
+
+    def is_expired(self, key: str, now: Optional[float] = None) -> bool:
+        """Checks whether the deadline of key has passed.
+
+        Parameters
+        ----------
+        key : str
+            Key to check.
+        now : Optional[float]
+            Current time. Read from clock if None.
+
+        Returns
+        -------
+        bool
+            Whether key has a deadline that is not after now.
+        """
+        deadline = self.deadlines.get(key)
+        if deadline is None:
+            return False
+
+        if now is None:
+            now = self.clock()
+
+        return deadline <= now
+
+    def advance(self) -> List[str]:
+        """Moves the wheel to the current time and returns fired keys.
+
+        At most sweep_limit keys are returned; the rest are kept for the next
+        call. Fired keys keep their deadline until they are cancelled.
+
+        Returns
+        -------
+        List[str]
+            Keys whose deadline has passed.
+        """
+        with self.mutex:
+            target_tick = self._tick(self.clock())
+
+            if target_tick - self.current_tick > len(self.locations):
+                # Refiling every key costs less than stepping through the
+                # elapsed ticks, which may be many after an idle period.
+                self._rebase(target_tick)
+
+            while self.current_tick < target_tick:
+                if target_tick - self.current_tick > self.num_slots:
+                    # Far behind, so skip to the next tick that reaches a
+                    # filed slot. Ticks in between do nothing.
+                    next_tick = self._next_filed_tick(target_tick)
+                    self.current_tick = max(self.current_tick, next_tick - 1)
+
+                self.current_tick += 1
+                self._cascade()
+
+            fired = []
+            while self.fired and len(fired) < self.sweep_limit:
+                key = next(iter(self.fired))
+                del self.fired[key]
+                del self.locations[key]
+                fired.append(key)
+
+            return fired
+
+    def due(self) -> List[str]:
+        """Returns keys whose deadline has passed but that have not fired yet.
+
+        Deadlines fire up to one tick late, and only the slots the wheel
+        reaches on the next tick can hold such keys, so this is bounded by
+        the keys expiring in one tick. Call after advance.
+
+        Returns
+        -------
+        List[str]
+            Keys whose deadline is not after the current time.
+        """
+        with self.mutex:
+            now = self.clock()
+            tick = self.current_tick + 1
+
+            slots = [self.wheels[0][tick % self.num_slots]]
+            span = 1
+            for level in range(1, self.num_levels):
+                span *= self.num_slots
+                if tick % span != 0:
+                    break
+                slots.append(self.wheels[level][(tick // span) % self.num_slots])
+
+            return [key for slot in slots for key in slot if self.deadlines[key] <= now]
+
+    def _cascade(self):
+        tick = self.current_tick
+
+        # Refile the slots of higher levels that the wheel just reached.
+        span = 1
+        for level in range(1, self.num_levels):
+            span *= self.num_slots
+            if tick % span != 0:
+                break
+
+            slot = self.wheels[level][(tick // span) % self.num_slots]
+            keys = list(slot)
+            slot.clear()
+            for key in keys:
+                del self.locations[key]
+                self._file(key, math.ceil(self.deadlines[key] / self.resolution))
+
+        slot = self.wheels[0][tick % self.num_slots]
+        for key in slot:
+            self.locations[key] = None
+            self.fired[key] = None
+        slot.clear()
+
+    def _rebase(self, tick: int):
+        keys = [key for key, location in self.locations.items() if location]
+        for level_slots in self.wheels:
+            for slot in level_slots:
+                slot.clear()
+
+        self.current_tick = tick
+        for key in keys:
+            del self.locations[key]
+            self._file(key, math.ceil(self.deadlines[key] / self.resolution))
+
+    def _next_filed_tick(self, limit: int) -> int:
+        # Returns the first tick after the current one at which the wheel
+        # reaches a slot holding keys, or limit if it comes first.
+        next_tick = limit
+        span = 1
+        for level in range(self.num_levels):
+            period = span * self.num_slots
+            for slot, keys in enumerate(self.wheels[level]):
+                if keys:
+                    # Slot s of a level is reached at ticks s * span modulo
+                    # the period of the level.
+                    tick = self.current_tick + 1
+                    tick += (slot * span - tick) % period
+                    if tick < next_tick:
+                        next_tick = tick
+            span = period
+
+        return next_tick
+
+    def _file(self, key: str, tick: int):
+        delay = tick - self.current_tick
+        if delay <= 0:
+            self.locations[key] = None
+            self.fired[key] = None
+            return
+
+        span = 1
+        for level in range(self.num_levels):
+            if delay < span * self.num_slots or level == self.num_levels - 1:
+                break
+            span *= self.num_slots
+
+        # Deadlines beyond the last level wait in its furthest slot.
+        tick = min(tick, self.current_tick + span * (self.num_slots - 1))
+        slot = (tick // span) % self.num_slots
+
+        self.wheels[level][slot].add(key)
+        self.locations[key] = (level, slot)
+
+    def _unfile(self, key: str):
+        location = self.locations.pop(key, False)
+        if location is None:
+            del self.fired[key]
+        elif location:
+            level, slot = location
+            self.wheels[level][slot].discard(key)
+
+    def __len__(self) -> int:
+        return len(self.deadlines)
@@ -0,0 +1,325 @@
+import threading
+from collections import OrderedDict
+from collections.abc import Iterable
+from typing import Callable, Dict, List, Optional, Tuple
+
+
+class WriteBehindBuffer:
+    def __init__(
+        self,
+        write_batch: Callable[[List[Tuple[str, object]]], List[Tuple[str, object]]],
+        max_size: int = 1024,
+        batch_size: int = 64,
+    ):
+        """Initialize a bounded staging buffer drained by a background worker.
+
+        Parameters
+        ----------
+        write_batch : Callable[[List[Tuple[str, object]]], List[Tuple[str, object]]]
+            Function that writes a batch of records to the lower tiers and
+            returns the records evicted from the lowest one. It is always
+            called while holding write_lock.
+        max_size : int
+            Maximum number of staged records. Staging more blocks the caller
+            until the worker has made room.
+        batch_size : int
+            Maximum number of records handed to write_batch at once.
+        """
+        assert (
+            max_size > 0
+        ), "Max size should be greater than 0. Max size is {}".format(max_size)
+        assert (
+            batch_size > 0
+        ), "Batch size should be greater than 0. Batch size is {}".format(
+            batch_size
+        )
+
+        self.write_batch = write_batch
+        self.max_size = max_size
+        self.batch_size = batch_size
+
+        # Records waiting to be written and records currently being written.
+        self.records: OrderedDict = OrderedDict()
+        self.in_flight: Dict[str, object] = {}
+
+        self.condition = threading.Condition()
+        # Held by the worker while it writes to the lower tiers. Anyone else
+        # touching the lower tiers must hold it too.
+        self.write_lock = threading.RLock()
+
+        self.running = False
+        self.error: Optional[BaseException] = None
+        self.worker: Optional[threading.Thread] = None
+
+    def start(self):
+        """Starts the background worker."""
+        with self.condition:
+            if self.running:
+                return
+
+            self.running = True
+            self.error = None
+
+        self.worker = threading.Thread(target=self._drain, daemon=True)
+        self.worker.start()
+
+    def stop(self):
+        """Writes every staged record and stops the background worker."""
+        with self.condition:
+            self.running = False
+            self.condition.notify_all()
+
+        if self.worker is not None:
+            self.worker.join()
+            self.worker = None
+
+        # Write anything the worker did not get to.
+        if self.error is None:
+            while self._write_next_batch():
+                pass
+
+        self._raise_error()
+
+    def put(self, key: str, value: object) -> List[Tuple[str, object]]:
+        """Stages a record, blocking while the buffer is full.
+
+        Parameters
+        ----------
+        key : str
+            Key of the record.
+        value : object
+            Value of the record.
+
+        Returns
+        -------
+        List[Tuple[str, object]]
+            Records evicted from the lowest tier, as with `settle`.
+        """
+        return self.put_many([(key, value)])
+
+    def put_many(
+        self, records: Iterable[Tuple[str, object]]
+    ) -> List[Tuple[str, object]]:
+        """Stages every record in records, blocking while the buffer is full.
+
+        Parameters
+        ----------
+        records : Iterable[Tuple[str, object]]
+            Keys and values to stage.
+
+        Returns
+        -------
+        List[Tuple[str, object]]
+            Records evicted from the lowest tier, as with `settle`.
+        """
+        self.stage_many(records)
+        return self.settle()
+
+    def stage_many(self, records: Iterable[Tuple[str, object]]):
+        """Stages every record in records without waiting for room.
+
+        Callers must call `settle` afterwards, once they hold no locks that
+        the writer could need.
+
+        Parameters
+        ----------
+        records : Iterable[Tuple[str, object]]
+            Keys and values to stage.
+        """
+        with self.condition:
+            self._raise_error()
+
+            for key, value in records:
+                self.records[key] = value
+                self.records.move_to_end(key)
+
+            self.condition.notify_all()
+
+    def settle(self) -> List[Tuple[str, object]]:
+        """Makes room for more staged records.
+
+        Without a running worker the staged records are written on the
+        caller's thread. Otherwise this waits until the buffer is no longer
+        over max_size.
+
+        Returns
+        -------
+        List[Tuple[str, object]]
+            Records evicted from the lowest tier by the writes made on the
+            caller's thread, in eviction order. Empty with a running worker,
+            which drops the records it evicts.
+        """
+        with self.condition:
+            self.condition.wait_for(
+                lambda: not self.running
+                or self.error is not None
+                or len(self.records) <= self.max_size
+            )
+            self._raise_error()
+
+            running = self.running
+
+        evicted: List[Tuple[str, object]] = []
+        if not running:
+            while self._write_next_batch(evicted):
+                pass
+
+        return evicted
+
+    def get(self, key: str) -> Optional[object]:
+        """Gets a staged value.
+
+        Parameters
+        ----------
+        key : str
+            Key to get.
+
+        Returns
+        -------
+        Value staged for key if any, else None.
+        """
+        with self.condition:
+            value = self.records.get(key)
+            if value is None:
+                value = self.in_flight.get(key)
+
+            return value
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, object]:
+        """Gets every staged value for keys.
+
+        Parameters
+        ----------
+        keys : Iterable[str]
+            Keys to get.
+
+        Returns
+        -------
+        Dict[str, object]
+            Mapping of every staged key to its value.
+        """
+        result = {}
+        with self.condition:
+            for key in keys:
+                value = self.records.get(key)
+                if value is None:
+                    value = self.in_flight.get(key)
+                if value is not None:
+                    result[key] = value
+
+        return result
+
+    def discard(self, key: str):
+        """Removes a record from the buffer if it is staged.
+
+        Parameters
+        ----------
+        key : str
+            Key to remove.
+        """
+        self.discard_many([key])
+
+    def discard_many(self, keys: Iterable[str]):
+        """Removes every staged record for keys.
+
+        Records that are already being written still reach the lower tiers,
+        so callers must delete them there once they hold write_lock.
+
+        Parameters
+        ----------
+        keys : Iterable[str]
+            Keys to remove.
+        """
+        with self.condition:
+            for key in keys:
+                self.records.pop(key, None)
+                self.in_flight.pop(key, None)
+
+            self.condition.notify_all()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Waits until every staged record has been written.
+
+        Parameters
+        ----------
+        timeout : Optional[float]
+            Maximum number of seconds to wait. Waits forever if None.
+
+        Returns
+        -------
+        bool
+            True if the buffer was drained, False if the timeout expired.
+        """
+        with self.condition:
+            running = self.running
+
+        if not running:
+            while self._write_next_batch():
+                pass
+
+        with self.condition:
+            drained = self.condition.wait_for(
+                lambda: self.error is not None
+                or (not self.records and not self.in_flight),
+                timeout,
+            )
+            self._raise_error()
+
+            return drained
+
+    def _raise_error(self):
+        if self.error is not None:
+            raise RuntimeError("Write-behind worker failed.") from self.error
+
+    def _write_next_batch(
+        self, evicted: Optional[List[Tuple[str, object]]] = None
+    ) -> bool:
+        # Records evicted from the lowest tier are added to evicted, if given.
+        # Lock order is always write_lock, then condition.
+        with self.write_lock:
+            with self.condition:
+                while self.records and len(self.in_flight) < self.batch_size:
+                    key, value = self.records.popitem(last=False)
+                    self.in_flight[key] = value
+
+                batch = list(self.in_flight.items())
+                self.condition.notify_all()
+
+            if not batch:
+                return False
+
+            try:
+                evicted_records = self.write_batch(batch)
+                if evicted is not None and evicted_records:
+                    evicted += evicted_records
+            finally:
+                with self.condition:
+                    self.in_flight.clear()
+                    self.condition.notify_all()
+
+            return True
+
+    def _drain(self):
+        while True:
+            with self.condition:
+                while self.running and not self.records:
+                    self.condition.wait()
+
+                if not self.records:
+                    return
+
+            try:
+                self._write_next_batch()
+            except BaseException as e:
+                with self.condition:
+                    self.error = e
+                    self.condition.notify_all()
+                return
+
+    def __contains__(self, key: str) -> bool:
+        with self.condition:
+            return key in self.records or key in self.in_flight
+
+    def __len__(self) -> int:
+        with self.condition:
+            return len(self.records) + len(self.in_flight)
@@ -1,3 +1,5 @@
 from RoomDict.RoomDict import RoomDict
+from RoomDict.AsyncRoomDict import AsyncRoomDict
+from RoomDict.ShardedRoomDict import ShardedRoomDict
 
-__all__ = [RoomDict]
+__all__ = [AsyncRoomDict, RoomDict, ShardedRoomDict]
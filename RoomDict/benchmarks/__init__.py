@@ -0,0 +1,24 @@
+from RoomDict.benchmarks.compare import compare_results, format_comparisons
+from RoomDict.benchmarks.mrc import (
+    MissRatioCurve,
+    expected_latency,
+    miss_ratio_curves,
+    recommend_kwargs,
+)
+from RoomDict.benchmarks.runner import DEFAULT_SPEC, run_benchmark, run_benchmarks
+from RoomDict.benchmarks.workloads import WORKLOAD_MAPPING, trace, write_trace
+
+__all__ = [
+    DEFAULT_SPEC,
+    MissRatioCurve,
+    WORKLOAD_MAPPING,
+    compare_results,
+    expected_latency,
+    format_comparisons,
+    miss_ratio_curves,
+    recommend_kwargs,
+    run_benchmark,
+    run_benchmarks,
+    trace,
+    write_trace,
+]
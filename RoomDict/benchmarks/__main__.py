@@ -0,0 +1,127 @@
+"""Runs and compares RoomDict benchmarks.
+
+    python -m RoomDict.benchmarks run [--spec SPEC] [--output OUTPUT]
+    python -m RoomDict.benchmarks compare BASELINE CURRENT [--tolerance 0.05]
+    python -m RoomDict.benchmarks mrc TRACE --cache-policies lru,lru,none
+        [--latencies 1e-7,1e-5,1e-3 --max-sizes 10000,100000,none]
+
+compare exits with status 1 if any metric of CURRENT regressed. mrc prints
+the miss ratio curve of every cache policy and, given latencies, the
+recommended cache_policies_kwargs.
+"""
+import argparse
+import json
+import sys
+
+from RoomDict.benchmarks.compare import compare_results, format_comparisons
+from RoomDict.benchmarks.mrc import miss_ratio_curves, recommend_kwargs
+from RoomDict.benchmarks.runner import run_benchmarks
+from RoomDict.benchmarks.workloads import trace
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m RoomDict.benchmarks")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="Run benchmarks.")
+    run_parser.add_argument(
+        "--spec", help="JSON file of workloads and configs. Defaults to DEFAULT_SPEC."
+    )
+    run_parser.add_argument("--output", help="JSON file to write the results to.")
+    run_parser.add_argument(
+        "--no-isolate",
+        action="store_true",
+        help="Run every benchmark in this process. Peak RSS is then shared.",
+    )
+
+    compare_parser = commands.add_parser("compare", help="Compare two runs.")
+    compare_parser.add_argument("baseline", help="JSON results to compare against.")
+    compare_parser.add_argument("current", help="JSON results of the new run.")
+    compare_parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.05,
+        help="Largest relative change for the worse that is not a regression.",
+    )
+    compare_parser.add_argument(
+        "--only-regressions", action="store_true", help="Only print regressions."
+    )
+
+    mrc_parser = commands.add_parser(
+        "mrc", help="Compute miss ratio curves of a trace and size tiers."
+    )
+    mrc_parser.add_argument("trace", help="Trace file, as read by workloads.trace.")
+    mrc_parser.add_argument(
+        "--cache-policies", required=True, help="Comma separated policy of every tier."
+    )
+    mrc_parser.add_argument(
+        "--latencies", help="Comma separated seconds taken by a hit in every tier."
+    )
+    mrc_parser.add_argument(
+        "--max-sizes",
+        help="Comma separated largest size of every tier, none for none tiers.",
+    )
+    mrc_parser.add_argument(
+        "--miss-latency", type=float, default=0.0, help="Seconds taken by a miss."
+    )
+    mrc_parser.add_argument(
+        "--sample-rate", type=float, help="Fraction of keys to sample."
+    )
+
+    args = parser.parse_args(argv)
+
+    if args.command == "mrc":
+        return _mrc(args)
+
+    if args.command == "run":
+        spec = None
+        if args.spec is not None:
+            with open(args.spec) as spec_file:
+                spec = json.load(spec_file)
+
+        results = run_benchmarks(spec, isolate=not args.no_isolate, log=print)
+
+        if args.output is not None:
+            with open(args.output, "w") as output_file:
+                json.dump(results, output_file, indent=2)
+        return 0
+
+    with open(args.baseline) as baseline_file:
+        baseline = json.load(baseline_file)
+    with open(args.current) as current_file:
+        current = json.load(current_file)
+
+    comparisons = compare_results(baseline, current, args.tolerance)
+    print(format_comparisons(comparisons, args.only_regressions))
+
+    return int(any(comparison["regression"] for comparison in comparisons))
+
+
+def _mrc(args) -> int:
+    keys = [key for operation, key in trace(args.trace) if operation != "delete"]
+    cache_policies = args.cache_policies.split(",")
+
+    curves = miss_ratio_curves(keys, cache_policies, sample_rate=args.sample_rate)
+    for cache_policy, curve in curves.items():
+        points = " ".join(
+            "{:.0f}={:.4f}".format(size, miss_ratio)
+            for size, miss_ratio in curve.points()
+        )
+        print("{} {}".format(cache_policy, points))
+
+    if args.latencies is not None:
+        latencies = [float(latency) for latency in args.latencies.split(",")]
+        max_sizes = [
+            None if max_size == "none" else int(max_size)
+            for max_size in args.max_sizes.split(",")
+        ]
+        kwargs = recommend_kwargs(
+            curves, cache_policies, latencies, max_sizes, args.miss_latency
+        )
+        print(json.dumps(kwargs))
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,99 @@
+from typing import List
+
+# Whether a larger value of each compared metric is better.
+HIGHER_IS_BETTER = {
+    "ops_per_sec": True,
+    "hit_ratio": True,
+    "peak_rss": False,
+    "p50": False,
+    "p99": False,
+}
+
+
+def _metrics(result: dict) -> dict:
+    metrics = {
+        name: result.get(name) for name in ["ops_per_sec", "hit_ratio", "peak_rss"]
+    }
+    for operation, latency in result.get("latencies", {}).items():
+        for percentile in ["p50", "p99"]:
+            metrics["{}.{}".format(operation, percentile)] = latency.get(percentile)
+
+    return metrics
+
+
+def compare_results(
+    baseline: dict, current: dict, tolerance: float = 0.05
+) -> List[dict]:
+    """Compares the metrics of two runs of run_benchmarks.
+
+    Parameters
+    ----------
+    baseline : dict
+        Results of the run to compare against.
+    current : dict
+        Results of the new run. Only benchmarks named as in baseline are
+        compared.
+    tolerance : float
+        Largest relative change for the worse that is not a regression.
+
+    Returns
+    -------
+    List[dict]
+        Per benchmark and metric, the baseline and current values, the
+        relative change and whether it is a regression.
+    """
+    current_results = {result["name"]: result for result in current["results"]}
+
+    comparisons = []
+    for baseline_result in baseline["results"]:
+        current_result = current_results.get(baseline_result["name"])
+        if current_result is None:
+            continue
+
+        current_metrics = _metrics(current_result)
+        for metric, baseline_value in _metrics(baseline_result).items():
+            current_value = current_metrics.get(metric)
+            if not baseline_value or current_value is None:
+                continue
+
+            change = (current_value - baseline_value) / baseline_value
+            if HIGHER_IS_BETTER[metric.split(".")[-1]]:
+                is_regression = change < -tolerance
+            else:
+                is_regression = change > tolerance
+
+            comparisons.append(
+                {
+                    "name": baseline_result["name"],
+                    "metric": metric,
+                    "baseline": baseline_value,
+                    "current": current_value,
+                    "change": change,
+                    "regression": is_regression,
+                }
+            )
+
+    return comparisons
+
+
+def format_comparisons(
+    comparisons: List[dict], only_regressions: bool = False
+) -> str:
+    """Returns comparisons as a table with a line per benchmark and metric."""
+    lines = []
+    for comparison in comparisons:
+        if only_regressions and not comparison["regression"]:
+            continue
+
+        lines.append(
+            "{} {} {:.6g} -> {:.6g} ({:+.1%}){}".format(
+                comparison["name"],
+                comparison["metric"],
+                comparison["baseline"],
+                comparison["current"],
+                comparison["change"],
+                " REGRESSION" if comparison["regression"] else "",
+            )
+        )
+
+    return "\n".join(lines)
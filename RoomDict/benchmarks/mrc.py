@@ -0,0 +1,368 @@
+import itertools
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+from RoomDict.RoomDict import CACHE_POLICY_MAPPING
+from RoomDict.membership_tests import NaiveMembership
+from RoomDict.membership_tests.hashing import hash_pair
+from RoomDict.storage_backends import MemoryStorage
+
+# Policies whose miss ratio curve is computed exactly from stack distances.
+STACK_POLICIES = ["lru", "array_lru"]
+# Policy of tiers that hold every record, whose size is not chosen.
+UNBOUNDED_POLICY = "none"
+
+MAX_SAMPLES = 100000
+SAMPLE_MODULUS = 1 << 24
+
+
+class MissRatioCurve:
+    def __init__(self, sizes: np.ndarray, miss_ratios: np.ndarray):
+        """Initialize a miss ratio curve from points of it.
+
+        Parameters
+        ----------
+        sizes : np.ndarray
+            Increasing cache sizes, starting at 0.
+        miss_ratios : np.ndarray
+            Miss ratio of a cache of each size. A cache between two sizes
+            is assumed to miss as often as one of the smaller size.
+        """
+        assert len(sizes) == len(
+            miss_ratios
+        ), "Must have equal numbers of sizes and miss ratios."
+
+        self.sizes = np.asarray(sizes, dtype=float)
+        self.miss_ratios = np.asarray(miss_ratios, dtype=float)
+
+    def miss_ratio(self, size: float) -> float:
+        """Returns the miss ratio of a cache of size records."""
+        index = np.searchsorted(self.sizes, size, side="right") - 1
+        if index < 0:
+            return 1.0
+
+        return float(self.miss_ratios[index])
+
+    def points(self, num_points: int = 16) -> List[tuple]:
+        """Returns up to num_points (size, miss ratio) pairs spread over the curve."""
+        indices = np.unique(
+            np.geomspace(1, len(self.sizes), num_points).astype(int) - 1
+        )
+        return [(self.sizes[i], self.miss_ratios[i]) for i in indices]
+
+
+def sample(keys: Iterable[str], sample_rate: float) -> List[str]:
+    """Returns the accesses to a sample_rate fraction of the keys.
+
+    As in SHARDS, keys are sampled by a hash of the key rather than at
+    random, so every access to a sampled key is kept and reuse is preserved.
+    """
+    assert (
+        0 < sample_rate <= 1
+    ), "Sample rate should be in (0, 1]. Sample rate is {}".format(sample_rate)
+
+    if sample_rate == 1:
+        return list(keys)
+
+    threshold = sample_rate * SAMPLE_MODULUS
+    return [key for key in keys if hash_pair(key)[0] % SAMPLE_MODULUS < threshold]
+
+
+def _sample_rate(keys: List[str], sample_rate: Optional[float]) -> float:
+    if sample_rate is not None:
+        return sample_rate
+
+    return min(1.0, MAX_SAMPLES / max(1, len(keys)))
+
+
+def lru_curve(
+    keys: Iterable[str], sample_rate: Optional[float] = None
+) -> MissRatioCurve:
+    """Returns the miss ratio curve of LRU for every size, in one pass.
+
+    The stack distance of an access is the number of distinct keys accessed
+    since the previous access to its key, which LRU hits exactly for caches
+    at least that large. Distances are counted with a Fenwick tree over the
+    time of the last access to every key, so the pass is O(n log n).
+
+    Parameters
+    ----------
+    keys : Iterable[str]
+        Accessed keys, in order.
+    sample_rate : Optional[float]
+        Fraction of keys to sample. Distances in the sample are scaled by
+        1 / sample_rate. Samples about MAX_SAMPLES accesses if None.
+    """
+    keys = list(keys)
+    sample_rate = _sample_rate(keys, sample_rate)
+    expected_accesses = len(keys) * sample_rate
+    keys = sample(keys, sample_rate)
+
+    num_accesses = len(keys)
+    tree = [0] * (num_accesses + 1)
+
+    def add(position: int, delta: int):
+        position += 1
+        while position <= num_accesses:
+            tree[position] += delta
+            position += position & -position
+
+    def prefix(position: int) -> int:
+        # Returns the number of keys last accessed at or before position.
+        total = 0
+        position += 1
+        while position > 0:
+            total += tree[position]
+            position -= position & -position
+        return total
+
+    distances = []
+    last_access: Dict[str, int] = {}
+    for time, key in enumerate(keys):
+        previous = last_access.get(key)
+        if previous is not None:
+            distances.append(prefix(time - 1) - prefix(previous) + 1)
+            add(previous, -1)
+
+        add(time, 1)
+        last_access[key] = time
+
+    if not num_accesses:
+        return MissRatioCurve(np.array([0]), np.array([1.0]))
+
+    hits = np.cumsum(np.bincount(np.array(distances, dtype=np.int64), minlength=1))
+
+    # A few hot keys decide how many accesses are sampled. As in SHARDS-adj,
+    # the difference from the expected number is counted as hits of the
+    # smallest size, where hot keys hit.
+    hits[1:] += round(expected_accesses) - num_accesses
+    miss_ratios = np.clip(1 - hits / expected_accesses, 0, 1)
+    sizes = np.arange(len(miss_ratios)) / sample_rate
+
+    return MissRatioCurve(sizes, miss_ratios)
+
+
+def simulated_curve(
+    keys: Iterable[str],
+    cache_policy: str,
+    sizes: Iterable[int],
+    sample_rate: Optional[float] = None,
+    cache_policy_kwargs: Optional[dict] = None,
+) -> MissRatioCurve:
+    """Returns the miss ratio curve of cache_policy at sizes, by simulation.
+
+    Policies without a stack property are simulated once per size. With
+    sampling, a cache of size * sample_rate is simulated on the sampled keys,
+    as in miniature simulations.
+
+    Parameters
+    ----------
+    keys : Iterable[str]
+        Accessed keys, in order.
+    cache_policy : str
+        Cache policy string.
+    sizes : Iterable[int]
+        Cache sizes to simulate.
+    sample_rate : Optional[float]
+        Fraction of keys to sample. Samples about MAX_SAMPLES accesses if
+        None.
+    cache_policy_kwargs : Optional[dict]
+        Cache policy initialization kwargs other than max_size.
+    """
+    keys = list(keys)
+    sample_rate = _sample_rate(keys, sample_rate)
+    keys = sample(keys, sample_rate)
+    sizes = sorted(set(sizes))
+
+    miss_ratios = []
+    for size in sizes:
+        storage_backend = MemoryStorage()
+        storage_backend.open()
+        cache = CACHE_POLICY_MAPPING[cache_policy](
+            NaiveMembership(),
+            storage_backend,
+            max_size=max(1, round(size * sample_rate)),
+            **(cache_policy_kwargs or {})
+        )
+
+        misses = 0
+        for key in keys:
+            if cache.get(key) is None:
+                misses += 1
+                cache.put(key, True)
+
+        storage_backend.close()
+        miss_ratios.append(misses / len(keys) if keys else 1.0)
+
+    return MissRatioCurve(np.array([0] + sizes), np.array([1.0] + miss_ratios))
+
+
+def size_grid(max_size: int, num_sizes: int = 32) -> List[int]:
+    """Returns about num_sizes sizes spaced geometrically up to max_size."""
+    sizes = np.geomspace(1, max_size, num_sizes).round()
+    return sorted(set(int(size) for size in sizes))
+
+
+def miss_ratio_curves(
+    keys: Iterable[str],
+    cache_policies: Iterable[str],
+    sizes: Optional[Iterable[int]] = None,
+    sample_rate: Optional[float] = None,
+) -> Dict[str, MissRatioCurve]:
+    """Returns the miss ratio curve of every cache policy on keys.
+
+    Parameters
+    ----------
+    keys : Iterable[str]
+        Accessed keys, in order.
+    cache_policies : Iterable[str]
+        Cache policy strings. LRU curves are exact at every size, the other
+        policies are simulated at sizes. The curve of "none" is its miss
+        ratio, that of the first access to every key.
+    sizes : Optional[Iterable[int]]
+        Sizes to simulate. Defaults to size_grid of the number of keys.
+    sample_rate : Optional[float]
+        Fraction of keys to sample. Samples about MAX_SAMPLES accesses if
+        None.
+
+    Returns
+    -------
+    Dict[str, MissRatioCurve]
+        Curve of every cache policy.
+    """
+    keys = list(keys)
+    sample_rate = _sample_rate(keys, sample_rate)
+    if sizes is None:
+        sizes = size_grid(max(1, len(set(keys))))
+
+    curves = {}
+    for cache_policy in cache_policies:
+        if cache_policy in curves:
+            continue
+
+        if cache_policy == UNBOUNDED_POLICY:
+            sampled = sample(keys, sample_rate)
+            cold_miss_ratio = len(set(sampled)) / len(sampled) if sampled else 1.0
+            curves[cache_policy] = MissRatioCurve(
+                np.array([0]), np.array([cold_miss_ratio])
+            )
+        elif cache_policy in STACK_POLICIES:
+            curves[cache_policy] = lru_curve(keys, sample_rate)
+        else:
+            curves[cache_policy] = simulated_curve(
+                keys, cache_policy, sizes, sample_rate
+            )
+
+    return curves
+
+
+def expected_latency(
+    curves: Dict[str, MissRatioCurve],
+    cache_policies: List[str],
+    max_sizes: List[Optional[int]],
+    latencies: List[float],
+    miss_latency: float = 0.0,
+) -> float:
+    """Returns the mean latency of an access to tiers of the given sizes.
+
+    Records evicted from a tier move to the next one, so the first i tiers
+    are modelled as one cache of their total size with the policy of tier i.
+
+    Parameters
+    ----------
+    curves : Dict[str, MissRatioCurve]
+        Curve of every cache policy in cache_policies.
+    cache_policies : List[str]
+        Cache policy string of every tier.
+    max_sizes : List[Optional[int]]
+        Max size of every tier. Ignored for "none" tiers.
+    latencies : List[float]
+        Seconds taken by a hit in every tier.
+    miss_latency : float
+        Seconds taken by a miss in every tier.
+    """
+    total_size = 0
+    miss_ratio = 1.0
+    latency = 0.0
+    for cache_policy, max_size, tier_latency in zip(
+        cache_policies, max_sizes, latencies
+    ):
+        if cache_policy != UNBOUNDED_POLICY:
+            total_size += max_size
+
+        tier_miss_ratio = min(miss_ratio, curves[cache_policy].miss_ratio(total_size))
+        latency += (miss_ratio - tier_miss_ratio) * tier_latency
+        miss_ratio = tier_miss_ratio
+
+    return latency + miss_ratio * miss_latency
+
+
+def recommend_kwargs(
+    curves: Dict[str, MissRatioCurve],
+    cache_policies: List[str],
+    latencies: List[float],
+    max_sizes: List[Optional[int]],
+    miss_latency: float = 0.0,
+    tolerance: float = 0.01,
+    sizes: Optional[List[int]] = None,
+) -> List[dict]:
+    """Returns the smallest cache_policies_kwargs with close to the best latency.
+
+    Every combination of tier sizes up to max_sizes is tried, and the one of
+    smallest total size whose expected_latency is within tolerance of the
+    lowest is chosen.
+
+    Parameters
+    ----------
+    curves : Dict[str, MissRatioCurve]
+        Curve of every cache policy in cache_policies, as returned by
+        miss_ratio_curves.
+    cache_policies : List[str]
+        Cache policy string of every tier.
+    latencies : List[float]
+        Seconds taken by a hit in every tier.
+    max_sizes : List[Optional[int]]
+        Largest size allowed for every tier, such as what fits in memory.
+        None for "none" tiers.
+    miss_latency : float
+        Seconds taken by a miss in every tier.
+    tolerance : float
+        Relative latency over the lowest that is traded for smaller tiers.
+    sizes : Optional[List[int]]
+        Candidate sizes. Defaults to size_grid of every max size.
+
+    Returns
+    -------
+    List[dict]
+        cache_policies_kwargs for RoomDict.
+    """
+    assert len(cache_policies) == len(latencies) == len(
+        max_sizes
+    ), "Must have equal numbers of cache policies, latencies and max sizes."
+
+    candidates = []
+    for cache_policy, max_size in zip(cache_policies, max_sizes):
+        if cache_policy == UNBOUNDED_POLICY:
+            candidates.append([None])
+            continue
+
+        assert max_size is not None, "{} tiers need a max size.".format(cache_policy)
+        tier_sizes = size_grid(max_size) if sizes is None else sizes
+        candidates.append([size for size in tier_sizes if size <= max_size])
+
+    evaluated = []
+    for tier_sizes in itertools.product(*candidates):
+        latency = expected_latency(
+            curves, cache_policies, tier_sizes, latencies, miss_latency
+        )
+        evaluated.append((latency, tier_sizes))
+
+    lowest_latency = min(latency for latency, _ in evaluated)
+    _, _, best_sizes = min(
+        (sum(size or 0 for size in tier_sizes), latency, tier_sizes)
+        for latency, tier_sizes in evaluated
+        if latency <= lowest_latency * (1 + tolerance)
+    )
+
+    return [{} if size is None else {"max_size": int(size)} for size in best_sizes]
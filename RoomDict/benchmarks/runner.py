@@ -0,0 +1,234 @@
+import multiprocessing
+import os
+import platform
+import sys
+import tempfile
+import time
+from typing import Callable, List, Optional, Tuple
+
+from RoomDict.RoomDict import RoomDict
+from RoomDict.benchmarks.workloads import WORKLOAD_MAPPING
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+# Workloads and RoomDict configurations run by default, each workload against
+# each configuration.
+DEFAULT_SPEC = {
+    "workloads": {
+        "zipf_0.8": {
+            "workload": "zipf",
+            "num_ops": 100000,
+            "num_keys": 10000,
+            "exponent": 0.8,
+        },
+        "zipf_1.2": {
+            "workload": "zipf",
+            "num_ops": 100000,
+            "num_keys": 10000,
+            "exponent": 1.2,
+        },
+        "uniform": {"workload": "uniform", "num_ops": 100000, "num_keys": 10000},
+        "scan_loop": {
+            "workload": "scan_loop",
+            "num_ops": 100000,
+            "num_keys": 1500,
+            "scan_length": 1000,
+            "scan_interval": 5000,
+        },
+    },
+    "configs": {
+        "lru_memory": {
+            "cache_policies": ["lru", "none"],
+            "membership_tests": ["none", "none"],
+            "storage_backends": ["memory", "memory"],
+            "cache_policies_kwargs": [{"max_size": 1000}],
+        },
+        "lru_disk": {
+            "cache_policies": ["lru", "none"],
+            "membership_tests": ["none", "none"],
+            "storage_backends": ["memory", "disk"],
+            "cache_policies_kwargs": [{"max_size": 1000}],
+        },
+        "lru_bloom_disk": {
+            "cache_policies": ["lru", "none"],
+            "membership_tests": ["none", "bloom"],
+            "storage_backends": ["memory", "disk"],
+            "cache_policies_kwargs": [{"max_size": 1000}],
+            "membership_tests_kwargs": [{}, {"max_size": 10000, "error_rate": 0.01}],
+        },
+        "s3fifo_memory": {
+            "cache_policies": ["s3fifo", "none"],
+            "membership_tests": ["none", "none"],
+            "storage_backends": ["memory", "memory"],
+            "cache_policies_kwargs": [{"max_size": 1000}],
+        },
+    },
+    "value_size": 100,
+}
+
+
+def _peak_rss() -> Optional[int]:
+    # Returns the peak resident set size of the process in bytes.
+    if resource is None:
+        return None
+
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == "darwin":
+        return peak_rss
+    return peak_rss * 1024
+
+
+def _replay(
+    cache: RoomDict, operations: List[Tuple[str, str]], value: bytes
+) -> Tuple[int, int]:
+    # Returns the number of gets and of gets that hit.
+    num_gets = 0
+    num_hits = 0
+    for operation, key in operations:
+        if operation == "get":
+            num_gets += 1
+            if cache[key] is not None:
+                num_hits += 1
+            else:
+                # A miss is filled, as an application would after reading
+                # the value from its source.
+                cache[key] = value
+        elif operation == "set":
+            cache[key] = value
+        else:
+            del cache[key]
+
+    return num_gets, num_hits
+
+
+def _run(workload: dict, config: dict, value_size: int) -> dict:
+    workload = dict(workload)
+    operations = WORKLOAD_MAPPING[workload.pop("workload")](**workload)
+    value = os.urandom(value_size)
+
+    # Storage backends without a directory write to the working directory.
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+        try:
+            with RoomDict(**config, collect_stats=True) as cache:
+                start = time.perf_counter()
+                num_gets, num_hits = _replay(cache, operations, value)
+                seconds = time.perf_counter() - start
+
+                stats = cache.stats()
+        finally:
+            os.chdir(cwd)
+
+    tier_hit_ratios = []
+    for counters in stats["tiers"]:
+        num_lookups = counters["hits"] + counters["misses"]
+        tier_hit_ratios.append(
+            counters["hits"] / num_lookups if num_lookups else None
+        )
+
+    return {
+        "num_ops": len(operations),
+        "seconds": seconds,
+        "ops_per_sec": len(operations) / seconds,
+        "hit_ratio": num_hits / num_gets if num_gets else None,
+        "tier_hit_ratios": tier_hit_ratios,
+        "tiers": stats["tiers"],
+        "latencies": stats["latencies"],
+        "peak_rss": _peak_rss(),
+    }
+
+
+def run_benchmark(
+    workload: dict, config: dict, value_size: int = 100, isolate: bool = True
+) -> dict:
+    """Replays a workload against a RoomDict and measures it.
+
+    Parameters
+    ----------
+    workload : dict
+        Name of a workload in WORKLOAD_MAPPING under "workload" and its
+        kwargs.
+    config : dict
+        RoomDict initialization kwargs.
+    value_size : int
+        Size in bytes of the values set.
+    isolate : bool
+        Whether to run in a new process, so the peak RSS is that of this
+        benchmark alone.
+
+    Returns
+    -------
+    dict
+        num_ops, seconds, ops_per_sec, hit_ratio of gets, tier_hit_ratios,
+        the stats counters of every tier, the latencies of every operation
+        and the peak RSS in bytes.
+    """
+    if not isolate:
+        return _run(workload, config, value_size)
+
+    with multiprocessing.get_context("spawn").Pool(1) as pool:
+        return pool.apply(_run, (workload, config, value_size))
+
+
+def run_benchmarks(
+    spec: Optional[dict] = None,
+    isolate: bool = True,
+    log: Optional[Callable[[str], None]] = None,
+) -> dict:
+    """Runs every workload of spec against every RoomDict configuration.
+
+    Parameters
+    ----------
+    spec : Optional[dict]
+        "workloads" maps names to run_benchmark workloads, "configs" maps
+        names to RoomDict kwargs and "value_size" is the size of values.
+        Uses DEFAULT_SPEC if None.
+    isolate : bool
+        Whether to run every benchmark in a new process.
+    log : Optional[Callable[[str], None]]
+        Function called with a line per finished benchmark.
+
+    Returns
+    -------
+    dict
+        The environment and, under "results", the result of every benchmark
+        named workload/config.
+    """
+    if spec is None:
+        spec = DEFAULT_SPEC
+
+    results = []
+    for workload_name, workload in spec["workloads"].items():
+        for config_name, config in spec["configs"].items():
+            result = run_benchmark(
+                workload, config, spec.get("value_size", 100), isolate
+            )
+            result = {
+                "name": "{}/{}".format(workload_name, config_name),
+                "workload": workload,
+                "config": config,
+                **result,
+            }
+            results.append(result)
+
+            if log is not None:
+                log(
+                    "{} OPS_PER_SEC={:.0f} HIT_RATIO={:.4f}".format(
+                        result["name"], result["ops_per_sec"], result["hit_ratio"] or 0
+                    )
+                )
+
+    return {
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "processor": platform.processor(),
+            "cpu_count": os.cpu_count(),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        },
+        "results": results,
+    }
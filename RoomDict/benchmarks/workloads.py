@@ -0,0 +1,181 @@
+from typing import Iterable, List, Optional, Tuple
+
+import numpy as np
+
+# Every workload is a list of (operation, key) pairs, where operation is one
+# of OPERATIONS.
+OPERATIONS = ["get", "set", "delete"]
+
+
+def _operations(
+    keys: Iterable[int], write_ratio: float, rng: np.random.Generator
+) -> List[Tuple[str, str]]:
+    keys = list(keys)
+    is_write = rng.random(len(keys)) < write_ratio
+
+    return [
+        ("set" if write else "get", "key{}".format(key))
+        for key, write in zip(keys, is_write)
+    ]
+
+
+def zipf(
+    num_ops: int,
+    num_keys: int,
+    exponent: float = 1.1,
+    write_ratio: float = 0.0,
+    seed: int = 0,
+) -> List[Tuple[str, str]]:
+    """Returns accesses to num_keys keys with Zipfian popularity.
+
+    The key of rank k is accessed with probability proportional to
+    1 / k ** exponent. Ranks are shuffled over the keys, so popularity is not
+    ordered by key.
+
+    Parameters
+    ----------
+    num_ops : int
+        Number of accesses.
+    num_keys : int
+        Number of distinct keys.
+    exponent : float
+        Skew of the popularity. Any exponent above 0 works, since the key
+        space is bounded.
+    write_ratio : float
+        Fraction of accesses that are sets instead of gets.
+    seed : int
+        Seed of the random generator.
+    """
+    assert (
+        exponent > 0
+    ), "Exponent should be greater than 0. Exponent is {}".format(exponent)
+
+    rng = np.random.default_rng(seed)
+    weights = 1.0 / np.arange(1, num_keys + 1) ** exponent
+    ranks = rng.choice(num_keys, size=num_ops, p=weights / weights.sum())
+    keys = rng.permutation(num_keys)[ranks]
+
+    return _operations(keys, write_ratio, rng)
+
+
+def uniform(
+    num_ops: int, num_keys: int, write_ratio: float = 0.0, seed: int = 0
+) -> List[Tuple[str, str]]:
+    """Returns accesses to num_keys equally popular keys.
+
+    Parameters
+    ----------
+    num_ops : int
+        Number of accesses.
+    num_keys : int
+        Number of distinct keys.
+    write_ratio : float
+        Fraction of accesses that are sets instead of gets.
+    seed : int
+        Seed of the random generator.
+    """
+    rng = np.random.default_rng(seed)
+
+    return _operations(rng.integers(num_keys, size=num_ops), write_ratio, rng)
+
+
+def scan_loop(
+    num_ops: int,
+    num_keys: int,
+    scan_length: int = 0,
+    scan_interval: Optional[int] = None,
+) -> List[Tuple[str, str]]:
+    """Returns gets looping over num_keys keys, interrupted by one-off scans.
+
+    Looping over more keys than a cache holds is the worst case of LRU, and
+    one-off scans flush recency based caches of their working set.
+
+    Parameters
+    ----------
+    num_ops : int
+        Number of accesses, including scans.
+    num_keys : int
+        Number of keys looped over in order.
+    scan_length : int
+        Number of keys read once by every scan.
+    scan_interval : Optional[int]
+        Number of loop accesses between scans. Never scans if None.
+    """
+    assert scan_interval is None or (
+        scan_interval > 0
+    ), "Scan interval should be greater than 0. Scan interval is {}".format(
+        scan_interval
+    )
+
+    operations = []
+    num_scanned = 0
+    loop_position = 0
+    while len(operations) < num_ops:
+        operations.append(("get", "key{}".format(loop_position % num_keys)))
+        loop_position += 1
+
+        if scan_interval is not None and loop_position % scan_interval == 0:
+            operations += [
+                ("get", "scan{}".format(num_scanned + i)) for i in range(scan_length)
+            ]
+            num_scanned += scan_length
+
+    return operations[:num_ops]
+
+
+def trace(path: str, num_ops: Optional[int] = None) -> List[Tuple[str, str]]:
+    """Returns the accesses recorded in a trace file.
+
+    Every line of the trace is either a key, which is read, or an operation
+    and a key separated by whitespace. Empty lines and lines starting with #
+    are skipped.
+
+    Parameters
+    ----------
+    path : str
+        Path of the trace, as written by write_trace.
+    num_ops : Optional[int]
+        Maximum number of accesses to replay. Replays the whole trace if None.
+    """
+    operations = []
+    with open(path) as trace_file:
+        for line in trace_file:
+            fields = line.split()
+            if not fields or fields[0].startswith("#"):
+                continue
+
+            if len(fields) == 1:
+                operations.append(("get", fields[0]))
+            else:
+                assert (
+                    fields[0] in OPERATIONS
+                ), "Unknown operation {} in {}".format(fields[0], path)
+                operations.append((fields[0], fields[1]))
+
+            if num_ops is not None and len(operations) >= num_ops:
+                break
+
+    return operations
+
+
+def write_trace(path: str, operations: Iterable[Tuple[str, str]]):
+    """Writes operations to path, so trace replays them.
+
+    Parameters
+    ----------
+    path : str
+        Path of the trace.
+    operations : Iterable[Tuple[str, str]]
+        Operations and keys. Keys may not contain whitespace.
+    """
+    with open(path, "w") as trace_file:
+        for operation, key in operations:
+            trace_file.write("{} {}\n".format(operation, key))
+
+
+WORKLOAD_MAPPING = {
+    "zipf": zipf,
+    "uniform": uniform,
+    "scan_loop": scan_loop,
+    "trace": trace,
+}
@@ -0,0 +1,177 @@
+from collections import OrderedDict
+from collections.abc import Iterable
+from typing import Callable, List, Optional, Tuple, Union
+
+from RoomDict.caches.GenericCache import GenericCache
+from RoomDict.membership_tests.GenericMembership import GenericMembership
+from RoomDict.storage_backends.GenericStorage import GenericStorage
+
+
+class ARCCache(GenericCache):
+    def __init__(
+        self,
+        membership_test: GenericMembership,
+        storage_manager: GenericStorage,
+        max_size: int,
+        max_bytes: Optional[int] = None,
+        sizer: Optional[Union[str, Callable[[object], int]]] = None,
+    ):
+        """Initialize an Adaptive Replacement Cache.
+
+        Resident keys are split between t1 (seen once recently) and t2 (seen
+        at least twice). Ghost lists b1 and b2 remember keys recently evicted
+        from each, and hits on them adapt the target size of t1.
+
+        Parameters
+        ----------
+        membership_test : GenericMembership
+            Membership test of the cache.
+        storage_manager : GenericStorage
+            Storage of the cached values.
+        max_size : int
+            Maximum number of cached records.
+        max_bytes : Optional[int]
+            Maximum total size of the cached values in bytes.
+        sizer : Optional[Union[str, Callable[[object], int]]]
+            Function returning the size of a value in bytes.
+        """
+        assert (
+            max_size > 0
+        ), "Max size should be greater than 0. Max size is {}".format(max_size)
+
+        self.max_size = max_size
+        self.target_t1_size = 0.0
+
+        # Ordered from least to most recently used.
+        self.t1: OrderedDict = OrderedDict()
+        self.t2: OrderedDict = OrderedDict()
+        self.b1: OrderedDict = OrderedDict()
+        self.b2: OrderedDict = OrderedDict()
+
+        super().__init__(membership_test, storage_manager, max_bytes, sizer)
+
+    def put(self, key: str, value: object) -> Optional[Union[str, object]]:
+        return self._first_eviction(self._put(key, value))
+
+    def _put(self, key: str, value: object) -> List[Tuple[str, object]]:
+        num_bytes = self._weigh(value)
+        if self._too_large(num_bytes):
+            del self[key]
+            return [(key, value)]
+
+        if key in self.t1 or key in self.t2:
+            self.storage_manager[key] = value
+            self._touch(key)
+            self._charge(key, num_bytes)
+            return self._evict_over_budget()
+
+        evicted_record = None
+        if key in self.b1:
+            delta = max(len(self.b2) / len(self.b1), 1)
+            self.target_t1_size = min(self.target_t1_size + delta, self.max_size)
+            del self.b1[key]
+            if self.size >= self.max_size:
+                evicted_record = self._replace(False)
+            self.t2[key] = None
+        elif key in self.b2:
+            delta = max(len(self.b1) / len(self.b2), 1)
+            self.target_t1_size = max(self.target_t1_size - delta, 0)
+            del self.b2[key]
+            if self.size >= self.max_size:
+                evicted_record = self._replace(True)
+            self.t2[key] = None
+        else:
+            if len(self.t1) + len(self.b1) >= self.max_size:
+                if self.b1:
+                    self.b1.popitem(last=False)
+                    if self.size >= self.max_size:
+                        evicted_record = self._replace(False)
+                else:
+                    evicted_key, _ = self.t1.popitem(last=False)
+                    evicted_record = self._evict_key(evicted_key)
+            else:
+                total_size = self.size + len(self.b1) + len(self.b2)
+                if total_size >= 2 * self.max_size and self.b2:
+                    self.b2.popitem(last=False)
+                if self.size >= self.max_size:
+                    evicted_record = self._replace(False)
+            self.t1[key] = None
+
+        self.size += 1
+        self.storage_manager[key] = value
+        self._charge(key, num_bytes)
+        self._remember(key)
+
+        evicted_records = [] if evicted_record is None else [evicted_record]
+        return evicted_records + self._evict_over_budget()
+
+    def get(self, key: str) -> Optional[object]:
+        if key not in self.t1 and key not in self.t2:
+            return None
+
+        self._touch(key)
+
+        return self.storage_manager[key]
+
+    def _touch(self, key: str):
+        if key in self.t1:
+            del self.t1[key]
+        self.t2[key] = None
+        self.t2.move_to_end(key)
+
+    def _evict(self) -> Tuple[str, object]:
+        return self._replace(False)
+
+    def _replace(self, hit_in_b2: bool) -> Tuple[str, object]:
+        t1_size = len(self.t1)
+        if t1_size > 0 and (
+            t1_size > self.target_t1_size
+            or (hit_in_b2 and t1_size == self.target_t1_size)
+            or not self.t2
+        ):
+            evicted_key, _ = self.t1.popitem(last=False)
+            self.b1[evicted_key] = None
+        else:
+            evicted_key, _ = self.t2.popitem(last=False)
+            self.b2[evicted_key] = None
+
+        return self._evict_key(evicted_key)
+
+    def _evict_key(self, key: str) -> Tuple[str, object]:
+        self.size -= 1
+
+        value = self.storage_manager[key]
+        del self.storage_manager[key]
+        self._forget(key)
+
+        return key, value
+
+    def resize(self, max_size: int) -> List[Tuple[str, object]]:
+        evicted_records = super().resize(max_size)
+
+        # The ghost lists are bounded by the size, as in _put.
+        self.target_t1_size = min(self.target_t1_size, max_size)
+        while self.b1 and len(self.t1) + len(self.b1) > max_size:
+            self.b1.popitem(last=False)
+        while self.b2 and self.size + len(self.b1) + len(self.b2) > 2 * max_size:
+            self.b2.popitem(last=False)
+
+        return evicted_records
+
+    def __delitem__(self, key: str):
+        if key in self.t1:
+            del self.t1[key]
+        elif key in self.t2:
+            del self.t2[key]
+        else:
+            return
+
+        self.size -= 1
+        del self.storage_manager[key]
+        self._forget(key)
+
+    def __iter__(self) -> Iterable:
+        for key in reversed(self.t2):
+            yield key, self.storage_manager[key]
+        for key in reversed(self.t1):
+            yield key, self.storage_manager[key]
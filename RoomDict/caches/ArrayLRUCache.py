@@ -0,0 +1,186 @@
+from array import array
+from collections.abc import Iterable
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+from RoomDict.caches.GenericCache import GenericCache
+from RoomDict.membership_tests.GenericMembership import GenericMembership
+from RoomDict.storage_backends.GenericStorage import GenericStorage
+
+
+class ArrayLRUCache(GenericCache):
+    def __init__(
+        self,
+        membership_test: GenericMembership,
+        storage_manager: GenericStorage,
+        max_size: int,
+        max_bytes: Optional[int] = None,
+        sizer: Optional[Union[str, Callable[[object], int]]] = None,
+    ):
+        """Initialize an LRU cache that keeps its recency list in int arrays.
+
+        Every record owns a slot. The recency list is a circular doubly
+        linked list threaded through the preallocated prev and next arrays,
+        with slot max_size as its sentinel. A dict maps each key to its slot.
+        Values are kept in the storage, so backends that serialize or
+        compress them see plain values.
+
+        Besides its storage entry, a record costs a dict entry, its slot int
+        and 16 bytes of arrays, and no GC-tracked object. That is about 30%
+        less memory than LRUCache, not a several-fold saving, since both
+        keep a dict entry per key next to the storage, and hits are somewhat
+        slower, see profiling_scripts/lru_memory.py.
+
+        Parameters
+        ----------
+        membership_test : GenericMembership
+            Membership test of the cache.
+        storage_manager : GenericStorage
+            Storage of the cache.
+        max_size : int
+            Maximum number of cached records.
+        max_bytes : Optional[int]
+            Maximum total size of the cached values in bytes.
+        sizer : Optional[Union[str, Callable[[object], int]]]
+            Function returning the size of a value in bytes.
+        """
+        assert (
+            max_size > 0
+        ), "Max size should be greater than 0. Max size is {}".format(max_size)
+
+        self._allocate(max_size)
+
+        super().__init__(membership_test, storage_manager, max_bytes, sizer)
+
+    def _allocate(self, max_size: int):
+        self.max_size = max_size
+        self.sentinel = max_size
+
+        typecode = "i" if max_size < 2 ** 31 - 1 else "q"
+        self.prev = array(typecode, [self.sentinel]) * (max_size + 1)
+        self.next = array(typecode, [self.sentinel]) * (max_size + 1)
+        self.keys: List[Optional[str]] = [None] * max_size
+        self.slots: Dict[str, int] = {}
+
+        # Stack of free slots, ordered so that slot 0 is handed out first.
+        self.free_slots = array(typecode, range(max_size - 1, -1, -1))
+
+    def put(self, key: str, value: object) -> Optional[Union[str, object]]:
+        return self._first_eviction(self._put(key, value))
+
+    def _put(self, key: str, value: object) -> List[Tuple[str, object]]:
+        num_bytes = self._weigh(value)
+        if self._too_large(num_bytes):
+            del self[key]
+            return [(key, value)]
+
+        slot = self.slots.get(key)
+        if slot is not None:
+            self.storage_manager[key] = value
+            self._unlink(slot)
+            self._link_front(slot)
+            self._charge(key, num_bytes)
+            return self._evict_over_budget()
+
+        evicted_records = []
+        if not self.free_slots:
+            evicted_records.append(self._evict())
+
+        slot = self.free_slots.pop()
+        self.size += 1
+
+        self.keys[slot] = key
+        self.slots[key] = slot
+        self._link_front(slot)
+        self.storage_manager[key] = value
+        self._charge(key, num_bytes)
+        self._remember(key)
+
+        return evicted_records + self._evict_over_budget()
+
+    def get(self, key: str) -> Optional[object]:
+        slot = self.slots.get(key)
+        if slot is None:
+            return None
+
+        # Inlined _unlink and _link_front, skipped if slot is already first.
+        prev, next_ = self.prev, self.next
+        sentinel = self.sentinel
+        first_slot = next_[sentinel]
+        if first_slot != slot:
+            prev_slot = prev[slot]
+            next_slot = next_[slot]
+            next_[prev_slot] = next_slot
+            prev[next_slot] = prev_slot
+
+            prev[slot] = sentinel
+            next_[slot] = first_slot
+            prev[first_slot] = slot
+            next_[sentinel] = slot
+
+        return self.storage_manager[key]
+
+    def _unlink(self, slot: int):
+        prev_slot = self.prev[slot]
+        next_slot = self.next[slot]
+        self.next[prev_slot] = next_slot
+        self.prev[next_slot] = prev_slot
+
+    def _link_front(self, slot: int):
+        first_slot = self.next[self.sentinel]
+        self.prev[slot] = self.sentinel
+        self.next[slot] = first_slot
+        self.prev[first_slot] = slot
+        self.next[self.sentinel] = slot
+
+    def _evict(self) -> Tuple[str, object]:
+        # The least recently used record.
+        slot = self.prev[self.sentinel]
+        key = self.keys[slot]
+        evicted_record = (key, self.storage_manager[key])
+        self._free(slot)
+
+        return evicted_record
+
+    def resize(self, max_size: int) -> List[Tuple[str, object]]:
+        evicted_records = super().resize(max_size)
+
+        # Relinked from least to most recently used, keeping their order.
+        # The values stay in the storage.
+        keys = list(self._iter_slot_keys())
+        self._allocate(max_size)
+        for key in reversed(keys):
+            slot = self.free_slots.pop()
+            self.keys[slot] = key
+            self.slots[key] = slot
+            self._link_front(slot)
+
+        return evicted_records
+
+    def __delitem__(self, key: str):
+        slot = self.slots.get(key)
+        if slot is None:
+            return
+
+        self._free(slot)
+
+    def _free(self, slot: int):
+        key = self.keys[slot]
+
+        self._unlink(slot)
+        del self.slots[key]
+        del self.storage_manager[key]
+        self._forget(key)
+
+        self.keys[slot] = None
+        self.free_slots.append(slot)
+        self.size -= 1
+
+    def _iter_slot_keys(self) -> Iterable:
+        slot = self.next[self.sentinel]
+        while slot != self.sentinel:
+            yield self.keys[slot]
+            slot = self.next[slot]
+
+    def __iter__(self) -> Iterable:
+        for key in self._iter_slot_keys():
+            yield key, self.storage_manager[key]
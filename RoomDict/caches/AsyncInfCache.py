@@ -0,0 +1,85 @@
+from collections.abc import Iterable
+from typing import Dict, List, Optional, Tuple
+
+from RoomDict.membership_tests.GenericMembership import GenericMembership
+from RoomDict.storage_backends.AsyncGenericStorage import AsyncGenericStorage
+
+
+class AsyncInfCache:
+    """Awaitable counterpart of InfCache over an AsyncGenericStorage."""
+
+    def __init__(
+        self,
+        membership_test: GenericMembership,
+        storage_manager: AsyncGenericStorage,
+    ):
+        self.storage_manager = storage_manager
+        self.membership_test = membership_test
+
+    async def get(self, key: str) -> Optional[object]:
+        if key not in self.membership_test:
+            return None
+
+        return await self.storage_manager.get(key)
+
+    async def put_many(
+        self, records: Iterable[Tuple[str, object]]
+    ) -> List[Tuple[str, object]]:
+        records = list(dict(records).items())
+        new_keys = await self._new_keys([key for key, _ in records])
+
+        await self.storage_manager.set_many(records)
+
+        self.membership_test.add_many(new_keys)
+
+        return []
+
+    async def _new_keys(self, keys: List[str]) -> List[str]:
+        # Membership tests that can forget keys must see every key added once.
+        if not self.membership_test.supports_remove:
+            return keys
+
+        maybe_contained = self._filter(keys)
+        if not maybe_contained:
+            return keys
+
+        is_contained = await self.storage_manager.contains_many(maybe_contained)
+        contained = set(
+            key for key, hit in zip(maybe_contained, is_contained) if hit
+        )
+
+        return [key for key in keys if key not in contained]
+
+    def _filter(self, keys: List[str]) -> List[str]:
+        return [
+            key
+            for key, may_contain in zip(keys, self.membership_test.contains_many(keys))
+            if may_contain
+        ]
+
+    async def get_many(self, keys: Iterable[str]) -> Dict[str, object]:
+        keys = self._filter(list(keys))
+        if not keys:
+            return {}
+
+        return await self.storage_manager.get_many(keys)
+
+    async def delete_many(self, keys: Iterable[str]):
+        keys = self._filter(list(dict.fromkeys(keys)))
+        if not keys:
+            return
+
+        if self.membership_test.supports_remove:
+            is_contained = await self.storage_manager.contains_many(keys)
+            keys = [key for key, hit in zip(keys, is_contained) if hit]
+
+        await self.storage_manager.delete_many(keys)
+
+        for key in keys:
+            self.membership_test.remove(key)
+
+    async def contains(self, key: str) -> bool:
+        if key not in self.membership_test:
+            return False
+
+        return await self.storage_manager.contains(key)
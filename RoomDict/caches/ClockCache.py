@@ -0,0 +1,166 @@
+from array import array
+from collections.abc import Iterable
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+from RoomDict.caches.GenericCache import GenericCache
+from RoomDict.membership_tests.GenericMembership import GenericMembership
+from RoomDict.storage_backends.GenericStorage import GenericStorage
+
+
+class ClockCache(GenericCache):
+    def __init__(
+        self,
+        membership_test: GenericMembership,
+        storage_manager: GenericStorage,
+        max_size: int,
+        max_bytes: Optional[int] = None,
+        sizer: Optional[Union[str, Callable[[object], int]]] = None,
+    ):
+        """Initialize a CLOCK cache, an approximation of LRU.
+
+        Every record owns a slot with a reference bit that hits set. To
+        evict, the hand sweeps over the slots, clearing set bits, and evicts
+        the first record whose bit is already clear. Hits therefore only
+        write one byte. A dict maps each key to its slot. Values are kept in
+        the storage, so backends that serialize or compress them see plain
+        values. A record costs about as much memory as with ArrayLRUCache,
+        see profiling_scripts/lru_memory.py.
+
+        Parameters
+        ----------
+        membership_test : GenericMembership
+            Membership test of the cache.
+        storage_manager : GenericStorage
+            Storage of the cache.
+        max_size : int
+            Maximum number of cached records.
+        max_bytes : Optional[int]
+            Maximum total size of the cached values in bytes.
+        sizer : Optional[Union[str, Callable[[object], int]]]
+            Function returning the size of a value in bytes.
+        """
+        assert (
+            max_size > 0
+        ), "Max size should be greater than 0. Max size is {}".format(max_size)
+
+        self._allocate(max_size)
+
+        super().__init__(membership_test, storage_manager, max_bytes, sizer)
+
+    def _allocate(self, max_size: int):
+        self.max_size = max_size
+        self.hand = 0
+
+        self.referenced = bytearray(max_size)
+        self.keys: List[Optional[str]] = [None] * max_size
+        self.slots: Dict[str, int] = {}
+
+        typecode = "i" if max_size < 2 ** 31 - 1 else "q"
+        self.free_slots = array(typecode, range(max_size - 1, -1, -1))
+
+    def put(self, key: str, value: object) -> Optional[Union[str, object]]:
+        return self._first_eviction(self._put(key, value))
+
+    def _put(self, key: str, value: object) -> List[Tuple[str, object]]:
+        num_bytes = self._weigh(value)
+        if self._too_large(num_bytes):
+            del self[key]
+            return [(key, value)]
+
+        slot = self.slots.get(key)
+        if slot is not None:
+            self.storage_manager[key] = value
+            self.referenced[slot] = 1
+            self._charge(key, num_bytes)
+            return self._evict_over_budget()
+
+        evicted_records = []
+        if not self.free_slots:
+            evicted_records.append(self._evict())
+
+        slot = self.free_slots.pop()
+        self.size += 1
+
+        self.keys[slot] = key
+        self.slots[key] = slot
+        self.referenced[slot] = 0
+        self.storage_manager[key] = value
+        self._charge(key, num_bytes)
+        self._remember(key)
+
+        return evicted_records + self._evict_over_budget()
+
+    def get(self, key: str) -> Optional[object]:
+        slot = self.slots.get(key)
+        if slot is None:
+            return None
+
+        self.referenced[slot] = 1
+
+        return self.storage_manager[key]
+
+    def _evict(self) -> Tuple[str, object]:
+        slot = self._sweep()
+        key = self.keys[slot]
+        evicted_record = (key, self.storage_manager[key])
+        self._free(slot)
+
+        return evicted_record
+
+    def _sweep(self) -> int:
+        # Skips free slots, which only exist when evicting to fit max_bytes.
+        keys = self.keys
+        referenced = self.referenced
+        while referenced[self.hand] or keys[self.hand] is None:
+            referenced[self.hand] = 0
+            self.hand = (self.hand + 1) % self.max_size
+
+        slot = self.hand
+        self.hand = (self.hand + 1) % self.max_size
+
+        return slot
+
+    def resize(self, max_size: int) -> List[Tuple[str, object]]:
+        evicted_records = super().resize(max_size)
+
+        # Records keep their order from the hand and their reference bits.
+        # The values stay in the storage.
+        records = []
+        num_slots = len(self.keys)
+        for i in range(num_slots):
+            slot = (self.hand + i) % num_slots
+            if self.keys[slot] is not None:
+                records.append((self.keys[slot], self.referenced[slot]))
+
+        self._allocate(max_size)
+        for key, referenced in records:
+            slot = self.free_slots.pop()
+            self.keys[slot] = key
+            self.slots[key] = slot
+            self.referenced[slot] = referenced
+
+        return evicted_records
+
+    def __delitem__(self, key: str):
+        slot = self.slots.get(key)
+        if slot is None:
+            return
+
+        self._free(slot)
+
+    def _free(self, slot: int):
+        key = self.keys[slot]
+
+        del self.slots[key]
+        del self.storage_manager[key]
+        self._forget(key)
+
+        self.keys[slot] = None
+        self.referenced[slot] = 0
+        self.free_slots.append(slot)
+        self.size -= 1
+
+    def __iter__(self) -> Iterable:
+        for key in self.keys:
+            if key is not None:
+                yield key, self.storage_manager[key]
@@ -1,8 +1,11 @@
 import abc
 from dataclasses import dataclass
 from collections.abc import Iterable, MutableMapping
-from typing import Optional, Union
+from typing import Callable, Dict, Iterator, List, Optional, Tuple, Union
 
+from RoomDict.HyperLogLog import HyperLogLog
+from RoomDict.SortedKeys import SortedKeys
+from RoomDict.caches.sizers import SIZER_MAPPING, pickled_size
 from RoomDict.membership_tests.GenericMembership import GenericMembership
 from RoomDict.storage_backends.GenericStorage import GenericStorage
 
@@ -18,11 +21,49 @@ class GenericCache(MutableMapping):
         self,
         membership_test: GenericMembership,
         storage_manager: GenericStorage,  # noaq: E501
+        max_bytes: Optional[int] = None,
+        sizer: Optional[Union[str, Callable[[object], int]]] = None,
     ):
+        """Initialize the state shared by every cache policy.
+
+        Parameters
+        ----------
+        membership_test : GenericMembership
+            Membership test of the cache.
+        storage_manager : GenericStorage
+            Storage of the cache.
+        max_bytes : Optional[int]
+            Maximum total size of the cached values in bytes, as measured by
+            sizer. Unlimited if None.
+        sizer : Optional[Union[str, Callable[[object], int]]]
+            Function returning the size of a value in bytes, or the name of
+            one in SIZER_MAPPING. Defaults to the size of the pickled value.
+        """
+        assert (
+            max_bytes is None or max_bytes > 0
+        ), "Max bytes should be greater than 0. Max bytes is {}".format(max_bytes)
+
         self.size = 0
         self.storage_manager = storage_manager
         self.membership_test = membership_test
 
+        if sizer is None:
+            sizer = pickled_size
+        elif isinstance(sizer, str):
+            sizer = SIZER_MAPPING[sizer]
+
+        self.max_bytes = max_bytes
+        self.sizer = sizer
+        self.bytes = 0
+        self.record_bytes: Dict[str, int] = {}
+
+        # Sorted index of the cached keys, kept only if a RoomDict sets one.
+        self.key_index: Optional[SortedKeys] = None
+        # Sketch of the keys that entered the cache, kept only if a RoomDict
+        # sets one, and the number of keys that left it since.
+        self.sketch: Optional[HyperLogLog] = None
+        self.num_forgotten = 0
+
     @abc.abstractmethod
     def put(self, key: str, value: object) -> Optional[Union[str, object]]:
         """Puts a key and value to the cache.
@@ -36,10 +77,151 @@ class GenericCache(MutableMapping):
 
         Returns
         -------
-        Returns the evicted Record. If nothing was evicted, then None.
+        Returns the evicted Record. If nothing was evicted, then None. If a
+        byte budget forced several evictions, the first of them, see
+        put_many for every evicted Record.
         """
         pass
 
+    def _put(self, key: str, value: object) -> List[Tuple[str, object]]:
+        """Puts a key and value to the cache and returns every eviction.
+
+        Policies that can evict several records per put override this and
+        implement put on top of it.
+        """
+        evicted = self.put(key, value)
+        if evicted is None:
+            return []
+        else:
+            return [evicted]
+
+    @staticmethod
+    def _first_eviction(
+        evicted_records: List[Tuple[str, object]]
+    ) -> Optional[Tuple[str, object]]:
+        # put returns a single record whatever the number of evictions.
+        if not evicted_records:
+            return None
+
+        return evicted_records[0]
+
+    def _weigh(self, value: object) -> int:
+        if self.max_bytes is None:
+            return 0
+
+        return self.sizer(value)
+
+    def _too_large(self, num_bytes: int) -> bool:
+        return self.max_bytes is not None and num_bytes > self.max_bytes
+
+    def _evict(self) -> Tuple[str, object]:
+        """Evicts the record chosen by the policy and returns it."""
+        raise NotImplementedError
+
+    def _evict_over_budget(self) -> List[Tuple[str, object]]:
+        # A record larger than max_bytes is never admitted, so the cache can
+        # always get back under budget.
+        evicted_records = []
+        while self.max_bytes is not None and self.bytes > self.max_bytes:
+            evicted_records.append(self._evict())
+
+        return evicted_records
+
+    def resize(self, max_size: int) -> List[Tuple[str, object]]:
+        """Changes the maximum number of records, evicting those over it.
+
+        Parameters
+        ----------
+        max_size : int
+            New maximum number of records.
+
+        Returns
+        -------
+        List[Tuple[str, object]]
+            Every record evicted to fit max_size, in eviction order.
+        """
+        assert (
+            max_size > 0
+        ), "Max size should be greater than 0. Max size is {}".format(max_size)
+
+        evicted_records = []
+        while self.size > max_size:
+            evicted_records.append(self._evict())
+
+        self.max_size = max_size
+
+        return evicted_records
+
+    def _charge(self, key: str, num_bytes: int):
+        if self.max_bytes is not None:
+            self.bytes += num_bytes - self.record_bytes.get(key, 0)
+            self.record_bytes[key] = num_bytes
+
+    def _remember(self, key: str):
+        # Called exactly once for every key that enters the cache.
+        self.membership_test.add(key)
+
+        if self.key_index is not None:
+            self.key_index.add(key)
+
+        if self.sketch is not None:
+            self.sketch.add(key)
+
+    def _remember_many(self, keys: List[str]):
+        self.membership_test.add_many(keys)
+
+        if self.key_index is not None:
+            self.key_index.update(keys)
+
+        if self.sketch is not None:
+            self.sketch.add_many(keys)
+
+    def _forget(self, key: str):
+        # Called exactly once for every key that leaves the cache.
+        self.membership_test.remove(key)
+
+        if self.key_index is not None:
+            self.key_index.discard(key)
+
+        self.num_forgotten += 1
+
+        if self.max_bytes is not None:
+            self.bytes -= self.record_bytes.pop(key, 0)
+
+    def snapshot(self) -> dict:
+        """Returns the policy state of the cache, for a warm restart.
+
+        Values kept in the storage are left out. The storage either
+        snapshots them itself or keeps them on close if it is persistent.
+
+        Returns
+        -------
+        dict
+            Picklable state that restore takes.
+        """
+        state = dict(self.__dict__)
+        for name in [
+            "membership_test",
+            "storage_manager",
+            "sizer",
+            "key_index",
+            "sketch",
+        ]:
+            del state[name]
+
+        return state
+
+    def restore(self, state: dict):
+        """Restores the policy state returned by snapshot.
+
+        Parameters
+        ----------
+        state : dict
+            State returned by snapshot of a cache of the same policy and
+            size.
+        """
+        self.__dict__.update(state)
+
     @abc.abstractmethod
     def get(self, key: str) -> Optional[object]:
         """Gets the associated record from cache if exists.
@@ -63,8 +245,115 @@ class GenericCache(MutableMapping):
     def __iter__(self) -> Iterable:
         pass
 
+    def get_many(self, keys: Iterable[str]) -> Dict[str, object]:
+        """Gets the values of all keys in keys that are in the cache.
+
+        Parameters
+        ----------
+        keys : Iterable[str]
+            Keys to get from the cache.
+
+        Returns
+        -------
+        Dict[str, object]
+            Mapping of every key in the cache to its value.
+        """
+        result = {}
+        for key in keys:
+            value = self.get(key)
+            if value is not None:
+                result[key] = value
+
+        return result
+
+    def put_many(
+        self, records: Iterable[Tuple[str, object]]
+    ) -> List[Tuple[str, object]]:
+        """Puts every key and value in records to the cache.
+
+        Parameters
+        ----------
+        records : Iterable[Tuple[str, object]]
+            Keys and values to add to the cache.
+
+        Returns
+        -------
+        List[Tuple[str, object]]
+            Every record evicted while adding records, in eviction order.
+        """
+        evicted_records = []
+        for key, value in records:
+            evicted_records += self._put(key, value)
+
+        return evicted_records
+
+    def delete_many(self, keys: Iterable[str]):
+        """Deletes every key in keys that is in the cache.
+
+        Parameters
+        ----------
+        keys : Iterable[str]
+            Keys to delete from the cache.
+        """
+        keys = list(keys)
+        for key, is_contained in zip(keys, self.contains_many(keys)):
+            if is_contained:
+                del self[key]
+
+    def contains_many(self, keys: Iterable[str]) -> List[bool]:
+        """Checks whether each key in keys is in the cache.
+
+        Parameters
+        ----------
+        keys : Iterable[str]
+            Keys to check.
+
+        Returns
+        -------
+        List[bool]
+            Whether each key is in the cache, in the order of keys.
+        """
+        keys = list(keys)
+        result = [False] * len(keys)
+
+        # Only ask the storage about keys the membership test lets through.
+        candidates = [
+            i
+            for i, may_contain in enumerate(self.membership_test.contains_many(keys))
+            if may_contain
+        ]
+        candidate_keys = [keys[i] for i in candidates]
+        for i, is_contained in zip(
+            candidates, self.storage_manager.contains_many(candidate_keys)
+        ):
+            result[i] = is_contained
+
+        return result
+
+    def iter_keys(self) -> Iterator[str]:
+        """Yields every key in the cache, leaving the policy state as it is.
+
+        The cache must not change while iterating.
+        """
+        return iter(self.storage_manager)
+
+    def peek_many(self, keys: Iterable[str]) -> Dict[str, object]:
+        """Gets the values of keys in the cache, leaving the policy state as it is.
+
+        Parameters
+        ----------
+        keys : Iterable[str]
+            Keys in the cache, such as those yielded by iter_keys.
+
+        Returns
+        -------
+        Dict[str, object]
+            Mapping of every key in the cache to its value.
+        """
+        return self.storage_manager.get_many(keys)
+
     def __contains__(self, key: str) -> bool:
-        if key not in self.membership_test:
+        if key in self.membership_test:
             return key in self.storage_manager
         else:
             return False
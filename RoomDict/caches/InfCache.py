@@ -1,4 +1,5 @@
-from typing import Union
+from collections.abc import Iterable
+from typing import Dict, List, Optional, Tuple
 
 from RoomDict.caches.GenericCache import GenericCache
 from RoomDict.membership_tests.GenericMembership import GenericMembership
@@ -14,15 +15,89 @@ class InfCache(GenericCache):
         super().__init__(membership_test, storage_manager)
 
     def put(self, key: str, value: object):
-        self.membership_test.add(key)
+        self.put_many([(key, value)])
 
-        self.storage_manager[key] = value
+    def get(self, key: str) -> Optional[object]:
+        if key not in self.membership_test:
+            return None
 
-    def get(self, key: str) -> object:
-        return self.storage_manager[key]
+        return self.storage_manager.get(key)
+
+    def _filter(self, keys: List[str]) -> List[str]:
+        return [
+            key
+            for key, may_contain in zip(keys, self.membership_test.contains_many(keys))
+            if may_contain
+        ]
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, object]:
+        keys = self._filter(list(keys))
+        if not keys:
+            return {}
+
+        return self.storage_manager.get_many(keys)
+
+    def put_many(
+        self, records: Iterable[Tuple[str, object]]
+    ) -> List[Tuple[str, object]]:
+        records = list(dict(records).items())
+        new_keys = self._new_keys([key for key, _ in records])
+
+        self.storage_manager.set_many(records)
+
+        self._remember_many(new_keys)
+
+        return []
+
+    def _new_keys(self, keys: List[str]) -> List[str]:
+        # Membership tests that can forget keys must see every key added once.
+        if not self.membership_test.supports_remove:
+            return keys
+
+        maybe_contained = self._filter(keys)
+        contained = set(
+            key
+            for key, is_contained in zip(
+                maybe_contained, self.storage_manager.contains_many(maybe_contained)
+            )
+            if is_contained
+        )
+
+        return [key for key in keys if key not in contained]
+
+    def delete_many(self, keys: Iterable[str]):
+        if not self.membership_test.supports_remove:
+            keys = list(keys)
+            if self.sketch is not None:
+                # Only keys that leave the tier make its sketch stale.
+                self.num_forgotten += sum(self.storage_manager.contains_many(keys))
+            self.storage_manager.delete_many(keys)
+
+            # The rest of what _forget does, which ignores missing keys.
+            if self.key_index is not None:
+                for key in keys:
+                    self.key_index.discard(key)
+            return
+
+        keys = list(dict.fromkeys(keys))
+        keys = [
+            key
+            for key, is_contained in zip(keys, self.contains_many(keys))
+            if is_contained
+        ]
+        self.storage_manager.delete_many(keys)
+
+        for key in keys:
+            self._forget(key)
 
     def __delitem__(self, key: str):
         del self.storage_manager[key]
+        self._forget(key)
+
+    def __len__(self) -> int:
+        # Every stored record is cached, so the storage keeps the count.
+        return len(self.storage_manager)
 
-    def __iter__(self) -> Union[str, object]:
-        return iter(self.storage_manager)
+    def __iter__(self) -> Iterable:
+        for key in self.storage_manager:
+            yield key, self.storage_manager[key]
@@ -1,8 +1,8 @@
-from collections.abc import Iterable, MutableMapping
-from typing import Optional, Union
+from collections.abc import Iterable
+from typing import Callable, Dict, List, Optional, Tuple, Union
 
 from RoomDict.caches.LinkedList import LinkedList, Node
-from RoomDict.caches.GenericCache import GenericCache, Record
+from RoomDict.caches.GenericCache import GenericCache
 from RoomDict.membership_tests.GenericMembership import GenericMembership
 from RoomDict.storage_backends.GenericStorage import GenericStorage
 
@@ -12,70 +12,109 @@ class LRUCache(GenericCache):
         self,
         membership_test: GenericMembership,
         storage_manager: GenericStorage,
-        max_size: int,
+        max_size: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        sizer: Optional[Union[str, Callable[[object], int]]] = None,
     ):
         assert (
-            max_size > 0
+            max_size is not None or max_bytes is not None
+        ), "Either max size or max bytes must be given."
+        assert (
+            max_size is None or max_size > 0
         ), "Max size should be greater than 0. Max size is {}".format(max_size)
 
         self.max_size = max_size
+        # The recency list holds keys. Values are kept in the storage, so
+        # backends that serialize or compress them see plain values.
         self.lru_list = LinkedList()
+        self.nodes: Dict[str, Node] = {}
 
-        super().__init__(membership_test, storage_manager)
-
-        # Hack to get the typing to work.
-        self.storage_manager: MutableMapping[str, Node]
+        super().__init__(membership_test, storage_manager, max_bytes, sizer)
 
     def put(self, key: str, value: object) -> Optional[Union[str, object]]:
-        self.membership_test.add(key)
+        return self._first_eviction(self._put(key, value))
 
-        record = Record(key, value)
+    def _put(self, key: str, value: object) -> List[Tuple[str, object]]:
+        num_bytes = self._weigh(value)
+        if self._too_large(num_bytes):
+            # Too large to ever fit, so pass it straight to the next tier.
+            del self[key]
+            return [(key, value)]
 
-        if key in self.storage_manager:
-            self.storage_manager[key].value = record
-            return None
+        if key in self.nodes:
+            self.storage_manager[key] = value
+            self._charge(key, num_bytes)
+            return self._evict_over_budget()
+
+        evicted_records = []
+        if self.max_size is not None and self.size >= self.max_size:
+            evicted_records.append(self._evict())
 
-        if self.size < self.max_size:
-            self.size += 1
-            evicted_value = None
-        else:
-            evicted_value = self.lru_list.pop().value
-            if evicted_value is None:
-                raise ValueError("No value to evict.")
+        self.size += 1
+        self.nodes[key] = self.lru_list.prepend_value(key)
+        self.storage_manager[key] = value
+        self._charge(key, num_bytes)
+        self._remember(key)
 
-            del self.storage_manager[evicted_value.key]
+        return evicted_records + self._evict_over_budget()
 
-        new_list_value = self.lru_list.prepend_value(record)
-        self.storage_manager[key] = new_list_value
+    def _evict(self) -> Tuple[str, object]:
+        evicted_key = self.lru_list.pop().value
+        if evicted_key is None:
+            raise ValueError("No value to evict.")
 
-        if evicted_value is not None:
-            return evicted_value.key, evicted_value.value
+        self.size -= 1
+        del self.nodes[evicted_key]
+        evicted_value = self.storage_manager[evicted_key]
+        del self.storage_manager[evicted_key]
+        self._forget(evicted_key)
+
+        return evicted_key, evicted_value
 
     def get(self, key: str) -> Optional[object]:
-        if key not in self.storage_manager:
+        node = self.nodes.get(key)
+        if node is None:
             return None
 
-        node = self.storage_manager[key]
-
         self.lru_list.delete(node)
         self.lru_list.prepend_node(node)
 
-        stored_record = node.value
-        return stored_record.value
+        return self.storage_manager[key]
 
     def __delitem__(self, key: str):
-        if key in self:
+        if key in self.nodes:
             self.size -= 1
 
-            node = self.storage_manager[key]
+            node = self.nodes.pop(key)
             self.lru_list.delete(node)
 
             del self.storage_manager[key]
+            self._forget(key)
 
-    def __iter__(self) -> Iterable:
-        self.record_iter = iter(self.lru_list)
-        return self
+    def snapshot(self) -> dict:
+        state = super().snapshot()
+        del state["lru_list"]
+        del state["nodes"]
+        state.pop("record_iter", None)
 
-    def __next__(self) -> Union[str, object]:
-        next_record: Record = next(self.record_iter)
-        return (next_record.key, next_record.value)
+        # Pickling the nodes would recurse through the whole list.
+        state["keys"] = list(self.lru_list)
+
+        return state
+
+    def restore(self, state: dict):
+        state = dict(state)
+        keys = state.pop("keys")
+        super().restore(state)
+
+        self.lru_list = LinkedList()
+        self.nodes = {}
+        for key in reversed(keys):
+            self.nodes[key] = self.lru_list.prepend_value(key)
+
+    def __iter__(self) -> Iterable:
+        # A generator, so several iterations may run at once.
+        node = self.lru_list.head.next
+        while node.value is not None:
+            yield node.value, self.storage_manager[node.value]
+            node = node.next
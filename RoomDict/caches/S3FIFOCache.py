@@ -0,0 +1,162 @@
+from collections import OrderedDict
+from collections.abc import Iterable
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+from RoomDict.caches.GenericCache import GenericCache
+from RoomDict.membership_tests.GenericMembership import GenericMembership
+from RoomDict.storage_backends.GenericStorage import GenericStorage
+
+MAX_FREQUENCY = 3
+
+
+class S3FIFOCache(GenericCache):
+    def __init__(
+        self,
+        membership_test: GenericMembership,
+        storage_manager: GenericStorage,
+        max_size: int,
+        small_ratio: float = 0.1,
+        max_bytes: Optional[int] = None,
+        sizer: Optional[Union[str, Callable[[object], int]]] = None,
+    ):
+        """Initialize an S3-FIFO cache.
+
+        New keys enter the small FIFO and are only moved to the main FIFO if
+        they were accessed again before reaching its head. Keys evicted from
+        the small FIFO are remembered in a ghost FIFO and go straight to the
+        main FIFO when they come back. Hits only bump a small counter, so they
+        never reorder any queue.
+
+        Parameters
+        ----------
+        membership_test : GenericMembership
+            Membership test of the cache.
+        storage_manager : GenericStorage
+            Storage of the cached values.
+        max_size : int
+            Maximum number of cached records.
+        small_ratio : float
+            Fraction of max_size reserved for the small FIFO.
+        max_bytes : Optional[int]
+            Maximum total size of the cached values in bytes.
+        sizer : Optional[Union[str, Callable[[object], int]]]
+            Function returning the size of a value in bytes.
+        """
+        assert (
+            max_size > 0
+        ), "Max size should be greater than 0. Max size is {}".format(max_size)
+
+        self.max_size = max_size
+        self.small_ratio = small_ratio
+        self.max_small_size = max(1, int(max_size * small_ratio))
+        self.max_ghost_size = max(1, max_size - self.max_small_size)
+
+        # Ordered from oldest to newest.
+        self.small: OrderedDict = OrderedDict()
+        self.main: OrderedDict = OrderedDict()
+        self.ghost: OrderedDict = OrderedDict()
+        self.frequencies: Dict[str, int] = {}
+
+        super().__init__(membership_test, storage_manager, max_bytes, sizer)
+
+    def put(self, key: str, value: object) -> Optional[Union[str, object]]:
+        return self._first_eviction(self._put(key, value))
+
+    def _put(self, key: str, value: object) -> List[Tuple[str, object]]:
+        num_bytes = self._weigh(value)
+        if self._too_large(num_bytes):
+            del self[key]
+            return [(key, value)]
+
+        if key in self.frequencies:
+            self.storage_manager[key] = value
+            self._touch(key)
+            self._charge(key, num_bytes)
+            return self._evict_over_budget()
+
+        evicted_record = None
+        if self.size >= self.max_size:
+            evicted_record = self._evict()
+
+        if key in self.ghost:
+            del self.ghost[key]
+            self.main[key] = None
+        else:
+            self.small[key] = None
+        self.frequencies[key] = 0
+
+        self.size += 1
+        self.storage_manager[key] = value
+        self._charge(key, num_bytes)
+        self._remember(key)
+
+        evicted_records = [] if evicted_record is None else [evicted_record]
+        return evicted_records + self._evict_over_budget()
+
+    def get(self, key: str) -> Optional[object]:
+        if key not in self.frequencies:
+            return None
+
+        self._touch(key)
+
+        return self.storage_manager[key]
+
+    def _touch(self, key: str):
+        self.frequencies[key] = min(self.frequencies[key] + 1, MAX_FREQUENCY)
+
+    def _evict(self) -> Tuple[str, object]:
+        while True:
+            if len(self.small) >= self.max_small_size or not self.main:
+                key, _ = self.small.popitem(last=False)
+                if self.frequencies[key] > 1:
+                    self.main[key] = None
+                    continue
+
+                self.ghost[key] = None
+                if len(self.ghost) > self.max_ghost_size:
+                    self.ghost.popitem(last=False)
+            else:
+                key, _ = self.main.popitem(last=False)
+                if self.frequencies[key] > 0:
+                    self.frequencies[key] -= 1
+                    self.main[key] = None
+                    continue
+
+            del self.frequencies[key]
+            self.size -= 1
+
+            value = self.storage_manager[key]
+            del self.storage_manager[key]
+            self._forget(key)
+
+            return key, value
+
+    def resize(self, max_size: int) -> List[Tuple[str, object]]:
+        evicted_records = super().resize(max_size)
+
+        self.max_small_size = max(1, int(max_size * self.small_ratio))
+        self.max_ghost_size = max(1, max_size - self.max_small_size)
+        while len(self.ghost) > self.max_ghost_size:
+            self.ghost.popitem(last=False)
+
+        return evicted_records
+
+    def __delitem__(self, key: str):
+        if key not in self.frequencies:
+            return
+
+        if key in self.small:
+            del self.small[key]
+        else:
+            del self.main[key]
+        del self.frequencies[key]
+
+        self.size -= 1
+        del self.storage_manager[key]
+        self._forget(key)
+
+    def __iter__(self) -> Iterable:
+        for key in reversed(self.main):
+            yield key, self.storage_manager[key]
+        for key in reversed(self.small):
+            yield key, self.storage_manager[key]
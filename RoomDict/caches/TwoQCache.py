@@ -0,0 +1,152 @@
+from collections import OrderedDict
+from collections.abc import Iterable
+from typing import Callable, List, Optional, Tuple, Union
+
+from RoomDict.caches.GenericCache import GenericCache
+from RoomDict.membership_tests.GenericMembership import GenericMembership
+from RoomDict.storage_backends.GenericStorage import GenericStorage
+
+
+class TwoQCache(GenericCache):
+    def __init__(
+        self,
+        membership_test: GenericMembership,
+        storage_manager: GenericStorage,
+        max_size: int,
+        in_ratio: float = 0.25,
+        out_ratio: float = 0.5,
+        max_bytes: Optional[int] = None,
+        sizer: Optional[Union[str, Callable[[object], int]]] = None,
+    ):
+        """Initialize a 2Q cache.
+
+        New keys enter the a1_in FIFO. Keys evicted from it are remembered in
+        the a1_out ghost FIFO, and only keys that come back while remembered
+        are admitted to the am LRU list. One-off scans therefore never reach
+        am.
+
+        Parameters
+        ----------
+        membership_test : GenericMembership
+            Membership test of the cache.
+        storage_manager : GenericStorage
+            Storage of the cached values.
+        max_size : int
+            Maximum number of cached records.
+        in_ratio : float
+            Fraction of max_size that a1_in may hold before it is evicted from.
+        out_ratio : float
+            Number of ghost keys to remember, as a fraction of max_size.
+        max_bytes : Optional[int]
+            Maximum total size of the cached values in bytes.
+        sizer : Optional[Union[str, Callable[[object], int]]]
+            Function returning the size of a value in bytes.
+        """
+        assert (
+            max_size > 0
+        ), "Max size should be greater than 0. Max size is {}".format(max_size)
+
+        self.max_size = max_size
+        self.in_ratio = in_ratio
+        self.out_ratio = out_ratio
+        self.max_in_size = max(1, int(max_size * in_ratio))
+        self.max_out_size = max(1, int(max_size * out_ratio))
+
+        # Ordered from oldest to newest.
+        self.a1_in: OrderedDict = OrderedDict()
+        self.a1_out: OrderedDict = OrderedDict()
+        self.am: OrderedDict = OrderedDict()
+
+        super().__init__(membership_test, storage_manager, max_bytes, sizer)
+
+    def put(self, key: str, value: object) -> Optional[Union[str, object]]:
+        return self._first_eviction(self._put(key, value))
+
+    def _put(self, key: str, value: object) -> List[Tuple[str, object]]:
+        num_bytes = self._weigh(value)
+        if self._too_large(num_bytes):
+            del self[key]
+            return [(key, value)]
+
+        if key in self.am or key in self.a1_in:
+            self.storage_manager[key] = value
+            if key in self.am:
+                self.am.move_to_end(key)
+            self._charge(key, num_bytes)
+            return self._evict_over_budget()
+
+        # Check the ghost list first since evicting can push key out of it.
+        remembered = key in self.a1_out
+        if remembered:
+            del self.a1_out[key]
+
+        evicted_record = None
+        if self.size >= self.max_size:
+            evicted_record = self._evict()
+
+        if remembered:
+            self.am[key] = None
+        else:
+            self.a1_in[key] = None
+
+        self.size += 1
+        self.storage_manager[key] = value
+        self._charge(key, num_bytes)
+        self._remember(key)
+
+        evicted_records = [] if evicted_record is None else [evicted_record]
+        return evicted_records + self._evict_over_budget()
+
+    def get(self, key: str) -> Optional[object]:
+        if key in self.am:
+            self.am.move_to_end(key)
+        elif key not in self.a1_in:
+            return None
+
+        return self.storage_manager[key]
+
+    def _evict(self) -> Tuple[str, object]:
+        if len(self.a1_in) > self.max_in_size or not self.am:
+            evicted_key, _ = self.a1_in.popitem(last=False)
+
+            self.a1_out[evicted_key] = None
+            if len(self.a1_out) > self.max_out_size:
+                self.a1_out.popitem(last=False)
+        else:
+            evicted_key, _ = self.am.popitem(last=False)
+
+        self.size -= 1
+
+        value = self.storage_manager[evicted_key]
+        del self.storage_manager[evicted_key]
+        self._forget(evicted_key)
+
+        return evicted_key, value
+
+    def resize(self, max_size: int) -> List[Tuple[str, object]]:
+        evicted_records = super().resize(max_size)
+
+        self.max_in_size = max(1, int(max_size * self.in_ratio))
+        self.max_out_size = max(1, int(max_size * self.out_ratio))
+        while len(self.a1_out) > self.max_out_size:
+            self.a1_out.popitem(last=False)
+
+        return evicted_records
+
+    def __delitem__(self, key: str):
+        if key in self.am:
+            del self.am[key]
+        elif key in self.a1_in:
+            del self.a1_in[key]
+        else:
+            return
+
+        self.size -= 1
+        del self.storage_manager[key]
+        self._forget(key)
+
+    def __iter__(self) -> Iterable:
+        for key in reversed(self.am):
+            yield key, self.storage_manager[key]
+        for key in reversed(self.a1_in):
+            yield key, self.storage_manager[key]
@@ -1,4 +1,19 @@
+from RoomDict.caches.ARCCache import ARCCache
+from RoomDict.caches.ArrayLRUCache import ArrayLRUCache
+from RoomDict.caches.AsyncInfCache import AsyncInfCache
+from RoomDict.caches.ClockCache import ClockCache
 from RoomDict.caches.InfCache import InfCache
 from RoomDict.caches.LRUCache import LRUCache
+from RoomDict.caches.S3FIFOCache import S3FIFOCache
+from RoomDict.caches.TwoQCache import TwoQCache
 
-__all__ = [InfCache, LRUCache]
+__all__ = [
+    ARCCache,
+    ArrayLRUCache,
+    AsyncInfCache,
+    ClockCache,
+    InfCache,
+    LRUCache,
+    S3FIFOCache,
+    TwoQCache,
+]
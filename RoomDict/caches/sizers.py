@@ -0,0 +1,18 @@
+import pickle
+import sys
+
+
+def pickled_size(value: object) -> int:
+    """Returns the number of bytes of value once pickled."""
+    return len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+
+
+def object_size(value: object) -> int:
+    """Returns the shallow in-memory size of value in bytes."""
+    return sys.getsizeof(value)
+
+
+SIZER_MAPPING = {
+    "pickle": pickled_size,
+    "getsizeof": object_size,
+}
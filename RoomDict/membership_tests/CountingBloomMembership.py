@@ -0,0 +1,60 @@
+import math
+
+from RoomDict.membership_tests.GenericMembership import GenericMembership
+from RoomDict.membership_tests.hashing import hash_pair
+
+MAX_COUNT = 255
+
+
+class CountingBloomMembership(GenericMembership):
+    supports_remove = True
+
+    def __init__(self, max_size: int, error_rate: float):
+        """Initialize a Bloom filter with a counter per bit so keys can be removed.
+
+        Parameters
+        ----------
+        max_size : int
+            Number of keys the filter is sized for. More keys raise the
+            false positive rate above error_rate.
+        error_rate : float
+            False positive rate at max_size keys.
+        """
+        assert (
+            max_size > 0
+        ), "Max size should be greater than 0. Max size is {}".format(max_size)
+        assert (
+            0 < error_rate < 1
+        ), "Error rate should be between 0 and 1. Error rate is {}".format(error_rate)
+
+        self.num_counters = max(
+            1, math.ceil(-max_size * math.log(error_rate) / math.log(2) ** 2)
+        )
+        self.num_hashes = max(
+            1, round(self.num_counters / max_size * math.log(2))
+        )
+
+        # Counters that reach MAX_COUNT stick there, since their true count
+        # is no longer known. That only costs false positives.
+        self.counters = bytearray(self.num_counters)
+
+    def _indexes(self, key: str):
+        first_hash, second_hash = hash_pair(key)
+        for i in range(self.num_hashes):
+            yield (first_hash + i * second_hash) % self.num_counters
+
+    def add(self, key: str):
+        counters = self.counters
+        for index in self._indexes(key):
+            if counters[index] < MAX_COUNT:
+                counters[index] += 1
+
+    def remove(self, key: str):
+        counters = self.counters
+        for index in self._indexes(key):
+            if 0 < counters[index] < MAX_COUNT:
+                counters[index] -= 1
+
+    def __contains__(self, key: str) -> bool:
+        counters = self.counters
+        return all(counters[index] for index in self._indexes(key))
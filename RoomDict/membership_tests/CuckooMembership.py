@@ -0,0 +1,139 @@
+from array import array
+from typing import List, Tuple
+
+from RoomDict.membership_tests.GenericMembership import GenericMembership
+from RoomDict.membership_tests.hashing import hash_pair
+
+EMPTY = 0
+
+
+class CuckooMembership(GenericMembership):
+    supports_remove = True
+
+    def __init__(
+        self,
+        max_size: int,
+        bucket_size: int = 4,
+        fingerprint_bits: int = 16,
+        max_kicks: int = 500,
+        seed: int = 0,
+    ):
+        """Initialize a cuckoo filter.
+
+        Every key is stored as a short fingerprint in one of two buckets, and
+        the other bucket can be computed from the fingerprint alone. Removing
+        a key deletes one copy of its fingerprint. Keys that cannot be placed
+        after max_kicks relocations are kept in a stash, so the filter never
+        has false negatives.
+
+        Parameters
+        ----------
+        max_size : int
+            Number of keys the filter is sized for.
+        bucket_size : int
+            Number of fingerprints per bucket.
+        fingerprint_bits : int
+            Bits per fingerprint, at most 32. The false positive rate is
+            about 2 * bucket_size / 2 ** fingerprint_bits.
+        max_kicks : int
+            Maximum number of relocations per add.
+        seed : int
+            Seed for choosing which fingerprint to relocate.
+        """
+        assert (
+            max_size > 0
+        ), "Max size should be greater than 0. Max size is {}".format(max_size)
+        assert (
+            0 < fingerprint_bits <= 32
+        ), "Fingerprint bits should be between 1 and 32. Fingerprint bits is {}".format(  # noqa: E501
+            fingerprint_bits
+        )
+
+        # A power of two, so the alternate bucket is an xor away.
+        num_buckets = 1
+        while num_buckets * bucket_size * 0.95 < max_size:
+            num_buckets *= 2
+
+        self.num_buckets = num_buckets
+        self.bucket_size = bucket_size
+        self.fingerprint_mask = (1 << fingerprint_bits) - 1
+        self.max_kicks = max_kicks
+        self.kick_state = seed
+
+        typecode = "H" if fingerprint_bits <= 16 else "L"
+        self.slots = array(typecode, [EMPTY]) * (num_buckets * bucket_size)
+        self.stash: List[Tuple[int, int]] = []
+
+    def _locate(self, key: str) -> Tuple[int, int, int]:
+        first_hash, second_hash = hash_pair(key)
+        fingerprint = (second_hash & self.fingerprint_mask) or 1
+        bucket = first_hash & (self.num_buckets - 1)
+
+        return fingerprint, bucket, self._alternate(bucket, fingerprint)
+
+    def _alternate(self, bucket: int, fingerprint: int) -> int:
+        # Any fixed mixing of the fingerprint works; this is a 32 bit LCG step.
+        mixed = (fingerprint * 0x5BD1E995 + 0x3C6EF372) & 0xFFFFFFFF
+        return (bucket ^ mixed) & (self.num_buckets - 1)
+
+    def _insert(self, bucket: int, fingerprint: int) -> bool:
+        start = bucket * self.bucket_size
+        for slot in range(start, start + self.bucket_size):
+            if self.slots[slot] == EMPTY:
+                self.slots[slot] = fingerprint
+                return True
+
+        return False
+
+    def _delete(self, bucket: int, fingerprint: int) -> bool:
+        start = bucket * self.bucket_size
+        for slot in range(start, start + self.bucket_size):
+            if self.slots[slot] == fingerprint:
+                self.slots[slot] = EMPTY
+                return True
+
+        return False
+
+    def _has(self, bucket: int, fingerprint: int) -> bool:
+        start = bucket * self.bucket_size
+        return fingerprint in self.slots[start : start + self.bucket_size]
+
+    def add(self, key: str):
+        fingerprint, bucket, other_bucket = self._locate(key)
+        if self._insert(bucket, fingerprint) or self._insert(
+            other_bucket, fingerprint
+        ):
+            return
+
+        for _ in range(self.max_kicks):
+            self.kick_state = (self.kick_state * 1103515245 + 12345) & 0x7FFFFFFF
+            slot = bucket * self.bucket_size + self.kick_state % self.bucket_size
+
+            fingerprint, self.slots[slot] = self.slots[slot], fingerprint
+            bucket = self._alternate(bucket, fingerprint)
+            if self._insert(bucket, fingerprint):
+                return
+
+        self.stash.append((bucket, fingerprint))
+
+    def remove(self, key: str):
+        fingerprint, bucket, other_bucket = self._locate(key)
+        if self._delete(bucket, fingerprint) or self._delete(
+            other_bucket, fingerprint
+        ):
+            return
+
+        for entry in ((bucket, fingerprint), (other_bucket, fingerprint)):
+            if entry in self.stash:
+                self.stash.remove(entry)
+                return
+
+    def __contains__(self, key: str) -> bool:
+        fingerprint, bucket, other_bucket = self._locate(key)
+        if self._has(bucket, fingerprint) or self._has(other_bucket, fingerprint):
+            return True
+
+        return bool(self.stash) and (
+            (bucket, fingerprint) in self.stash
+            or (other_bucket, fingerprint) in self.stash
+        )
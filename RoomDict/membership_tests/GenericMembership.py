@@ -1,12 +1,41 @@
 import abc
-from collections.abc import Container
+from collections.abc import Container, Iterable
+from typing import List
 
 
 class GenericMembership(Container):
+    # Whether remove forgets keys. Caches only need to track exactly which
+    # keys they added when it does.
+    supports_remove = False
+    # Whether the membership test was loaded with the keys added by a
+    # previous run, which then need not be added again.
+    is_loaded = False
+
     @abc.abstractmethod
     def add(self, key: str):
         pass
 
+    def remove(self, key: str):
+        """Forgets a key that was added and has not been removed since.
+
+        Membership tests that cannot forget keys keep answering that the key
+        may be contained, which is always safe.
+        """
+        return
+
     @abc.abstractmethod
     def __contains__(self, key: str) -> bool:
         pass
+
+    def add_many(self, keys: Iterable[str]):
+        """Adds every key in keys."""
+        for key in keys:
+            self.add(key)
+
+    def contains_many(self, keys: Iterable[str]) -> List[bool]:
+        """Checks whether each key in keys may be contained, in order."""
+        return [key in self for key in keys]
+
+    def close(self):
+        """Persists the membership test, if it is backed by a file."""
+        return
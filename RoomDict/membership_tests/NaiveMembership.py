@@ -6,4 +6,4 @@ class NaiveMembership(GenericMembership):
         return
 
     def __contains__(self, key: str) -> bool:
-        return False
+        return True
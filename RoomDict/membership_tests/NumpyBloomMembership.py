@@ -0,0 +1,139 @@
+import hashlib
+import math
+import os
+from collections.abc import Iterable
+from typing import List, Optional
+
+import numpy as np
+
+from RoomDict.membership_tests.GenericMembership import GenericMembership
+
+
+class NumpyBloomMembership(GenericMembership):
+    def __init__(self, max_size: int, error_rate: float, path: Optional[str] = None):
+        """Initialize a Bloom filter whose bits live in a NumPy array.
+
+        Batches of keys are hashed once each and then set or probed with
+        vectorized operations. If path is given, the bits are memory mapped
+        from a .npy file there, so a filter reopened with the same path and
+        parameters keeps its keys.
+
+        Parameters
+        ----------
+        max_size : int
+            Number of keys the filter is sized for. More keys raise the
+            false positive rate above error_rate.
+        error_rate : float
+            False positive rate at max_size keys.
+        path : Optional[str]
+            File the bits are kept in. Kept in memory only if None. A filter
+            read from an existing file is_loaded.
+        """
+        assert (
+            max_size > 0
+        ), "Max size should be greater than 0. Max size is {}".format(max_size)
+        assert (
+            0 < error_rate < 1
+        ), "Error rate should be between 0 and 1. Error rate is {}".format(error_rate)
+
+        num_bits = math.ceil(-max_size * math.log(error_rate) / math.log(2) ** 2)
+        num_bytes = max(1, math.ceil(num_bits / 8))
+
+        self.num_bits = num_bytes * 8
+        self.num_hashes = max(1, round(self.num_bits / max_size * math.log(2)))
+        self.path = path
+
+        if path is None:
+            self.bits = np.zeros(num_bytes, dtype=np.uint8)
+        elif os.path.exists(path):
+            self.bits = np.load(path, mmap_mode="r+")
+            assert self.bits.shape == (
+                num_bytes,
+            ), "{} holds a filter of {} bytes, expected {}.".format(
+                path, self.bits.shape[0], num_bytes
+            )
+            self.is_loaded = True
+        else:
+            self.bits = np.lib.format.open_memmap(
+                path, mode="w+", dtype=np.uint8, shape=(num_bytes,)
+            )
+
+        self.probe_offsets = np.arange(self.num_hashes, dtype=np.uint64)
+
+    def _bit_indexes(self, keys: List[str]) -> np.ndarray:
+        # One 128 bit digest per key, split into the two hashes of double
+        # hashing. Returns an array of shape (len(keys), num_hashes).
+        digests = b"".join(
+            hashlib.blake2b(key.encode(), digest_size=16).digest() for key in keys
+        )
+        hashes = np.frombuffer(digests, dtype="<u8").reshape(-1, 2)
+
+        # uint64 arithmetic wraps around, which is fine for hashing.
+        with np.errstate(over="ignore"):
+            combined = hashes[:, :1] + self.probe_offsets * hashes[:, 1:]
+
+        return combined % np.uint64(self.num_bits)
+
+    def add(self, key: str):
+        self.add_many([key])
+
+    def add_many(self, keys: Iterable[str]):
+        keys = list(keys)
+        if not keys:
+            return
+
+        indexes = self._bit_indexes(keys).ravel()
+        masks = np.left_shift(1, indexes & np.uint64(7)).astype(np.uint8)
+        np.bitwise_or.at(self.bits, indexes >> np.uint64(3), masks)
+
+    def __contains__(self, key: str) -> bool:
+        return self.contains_many([key])[0]
+
+    def contains_many(self, keys: Iterable[str]) -> List[bool]:
+        keys = list(keys)
+        if not keys:
+            return []
+
+        indexes = self._bit_indexes(keys)
+        bits = self.bits[indexes >> np.uint64(3)] >> (indexes & np.uint64(7))
+
+        return (bits & 1).all(axis=1).tolist()
+
+    def save(self, path: str):
+        """Writes the bits to a .npy file at path."""
+        np.save(path, np.asarray(self.bits))
+
+    @classmethod
+    def load(
+        cls, path: str, max_size: int, error_rate: float
+    ) -> "NumpyBloomMembership":
+        """Reads a filter written by save with the same parameters."""
+        membership_test = cls(max_size, error_rate)
+        bits = np.load(path)
+        assert (
+            bits.shape == membership_test.bits.shape
+        ), "{} holds a filter of {} bytes, expected {}.".format(
+            path, bits.shape[0], membership_test.bits.shape[0]
+        )
+        membership_test.bits[:] = bits
+        membership_test.is_loaded = True
+
+        return membership_test
+
+    def close(self):
+        if isinstance(self.bits, np.memmap):
+            self.bits.flush()
+
+    def __getstate__(self) -> dict:
+        # Bits backed by a file are reopened from it rather than pickled.
+        state = dict(self.__dict__)
+        if self.path is not None:
+            self.close()
+            state["bits"] = None
+
+        return state
+
+    def __setstate__(self, state: dict):
+        self.__dict__.update(state)
+        if self.path is not None:
+            self.bits = np.load(self.path, mmap_mode="r+")
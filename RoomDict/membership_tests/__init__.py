@@ -1,4 +1,13 @@
 from RoomDict.membership_tests.BloomMembership import BloomMembership
+from RoomDict.membership_tests.CountingBloomMembership import CountingBloomMembership
+from RoomDict.membership_tests.CuckooMembership import CuckooMembership
 from RoomDict.membership_tests.NaiveMembership import NaiveMembership
+from RoomDict.membership_tests.NumpyBloomMembership import NumpyBloomMembership
 
-__all__ = [NaiveMembership, BloomMembership]
+__all__ = [
+    NaiveMembership,
+    BloomMembership,
+    CountingBloomMembership,
+    CuckooMembership,
+    NumpyBloomMembership,
+]
@@ -0,0 +1,11 @@
+import hashlib
+from typing import Tuple
+
+
+def hash_pair(key: str) -> Tuple[int, int]:
+    """Returns two independent 64 bit hashes of key.
+
+    Unlike hash() of a str, these are stable across processes.
+    """
+    digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+    return int.from_bytes(digest[:8], "little"), int.from_bytes(digest[8:], "little")
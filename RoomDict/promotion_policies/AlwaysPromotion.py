@@ -0,0 +1,6 @@
+from RoomDict.promotion_policies.GenericPromotion import GenericPromotion
+
+
+class AlwaysPromotion(GenericPromotion):
+    def should_promote(self, key: str, tier: int) -> bool:
+        return True
@@ -0,0 +1,25 @@
+import abc
+
+
+class GenericPromotion(abc.ABC):
+    @abc.abstractmethod
+    def should_promote(self, key: str, tier: int) -> bool:
+        """Decides whether a hit in a lower tier moves key to the highest one.
+
+        Parameters
+        ----------
+        key : str
+            Key that was hit.
+        tier : int
+            Index of the tier that holds key. Always greater than 0.
+
+        Returns
+        -------
+        bool
+            Whether to promote key.
+        """
+        pass
+
+    def forget(self, key: str):
+        """Drops any state kept about key, e.g. once it is deleted."""
+        return
@@ -0,0 +1,6 @@
+from RoomDict.promotion_policies.GenericPromotion import GenericPromotion
+
+
+class NeverPromotion(GenericPromotion):
+    def should_promote(self, key: str, tier: int) -> bool:
+        return False
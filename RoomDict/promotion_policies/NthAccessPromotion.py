@@ -0,0 +1,45 @@
+from typing import Dict
+
+from RoomDict.promotion_policies.GenericPromotion import GenericPromotion
+
+
+class NthAccessPromotion(GenericPromotion):
+    def __init__(self, n: int = 2, max_tracked: int = 2 ** 16):
+        """Initialize a policy that promotes keys on their nth lower tier hit.
+
+        Keys hit once in a scan never reach the highest tier, so they do not
+        evict hot keys from it.
+
+        Parameters
+        ----------
+        n : int
+            Number of lower tier hits that promote a key.
+        max_tracked : int
+            Maximum number of keys whose hits are counted. All counts are
+            reset once more keys are seen, so stale counts do not pile up.
+        """
+        assert n > 0, "n should be greater than 0. n is {}".format(n)
+        assert (
+            max_tracked > 0
+        ), "Max tracked should be greater than 0. Max tracked is {}".format(
+            max_tracked
+        )
+
+        self.n = n
+        self.max_tracked = max_tracked
+        self.hits: Dict[str, int] = {}
+
+    def should_promote(self, key: str, tier: int) -> bool:
+        hits = self.hits.get(key, 0) + 1
+        if hits >= self.n:
+            self.hits.pop(key, None)
+            return True
+
+        if len(self.hits) >= self.max_tracked:
+            self.hits.clear()
+        self.hits[key] = hits
+
+        return False
+
+    def forget(self, key: str):
+        self.hits.pop(key, None)
@@ -0,0 +1,31 @@
+import random
+from typing import Optional
+
+from RoomDict.promotion_policies.GenericPromotion import GenericPromotion
+
+
+class ProbabilisticPromotion(GenericPromotion):
+    def __init__(self, probability: float = 0.1, seed: Optional[int] = None):
+        """Initialize a policy that promotes lower tier hits at random.
+
+        A key hit k times is promoted with probability 1 - (1 - p) ** k, so
+        hot keys are promoted soon without keeping any per key state.
+
+        Parameters
+        ----------
+        probability : float
+            Probability that a hit promotes its key.
+        seed : Optional[int]
+            Seed of the random number generator.
+        """
+        assert (
+            0 < probability <= 1
+        ), "Probability should be between 0 and 1. Probability is {}".format(
+            probability
+        )
+
+        self.probability = probability
+        self.random = random.Random(seed)
+
+    def should_promote(self, key: str, tier: int) -> bool:
+        return self.random.random() < self.probability
@@ -0,0 +1,11 @@
+from RoomDict.promotion_policies.AlwaysPromotion import AlwaysPromotion
+from RoomDict.promotion_policies.NeverPromotion import NeverPromotion
+from RoomDict.promotion_policies.NthAccessPromotion import NthAccessPromotion
+from RoomDict.promotion_policies.ProbabilisticPromotion import ProbabilisticPromotion
+
+__all__ = [
+    AlwaysPromotion,
+    NeverPromotion,
+    NthAccessPromotion,
+    ProbabilisticPromotion,
+]
@@ -1,10 +1,13 @@
 import time
-from typing import Optional
+from collections.abc import Iterable
+from typing import Dict, List, Optional, Tuple
 
 from RoomDict.storage_backends import MemoryStorage
 
 
 class ArbitraryStorage(MemoryStorage):
+    blocking = True
+
     def __init__(self, delay: int):
         self.delay = delay
 
@@ -29,3 +32,23 @@ class ArbitraryStorage(MemoryStorage):
         time.sleep(self.delay)
         
         return super().__contains__(key)
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, object]:
+        time.sleep(self.delay)
+
+        return super().get_many(keys)
+
+    def set_many(self, records: Iterable[Tuple[str, object]]):
+        time.sleep(self.delay)
+
+        super().set_many(records)
+
+    def delete_many(self, keys: Iterable[str]):
+        time.sleep(self.delay)
+
+        super().delete_many(keys)
+
+    def contains_many(self, keys: Iterable[str]) -> List[bool]:
+        time.sleep(self.delay)
+
+        return super().contains_many(keys)
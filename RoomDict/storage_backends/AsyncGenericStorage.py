@@ -0,0 +1,63 @@
+import abc
+from collections.abc import Iterable
+from typing import Dict, List, Optional, Tuple
+
+
+class AsyncGenericStorage(abc.ABC):
+    """Awaitable counterpart of GenericStorage."""
+
+    @abc.abstractmethod
+    async def open(self):
+        pass
+
+    @abc.abstractmethod
+    async def close(self, exc_type=None, exc_value=None, traceback=None):
+        pass
+
+    @abc.abstractmethod
+    async def get(self, key: str) -> Optional[object]:
+        """Gets the value stored for key.
+
+        Parameters
+        ----------
+        key : str
+            Key to get.
+
+        Returns
+        -------
+        Value stored for key if it exists, else None.
+        """
+        pass
+
+    @abc.abstractmethod
+    async def set(self, key: str, value: object):
+        pass
+
+    @abc.abstractmethod
+    async def delete(self, key: str):
+        """Deletes key from the storage. Missing keys are ignored."""
+        pass
+
+    @abc.abstractmethod
+    async def contains(self, key: str) -> bool:
+        pass
+
+    async def get_many(self, keys: Iterable[str]) -> Dict[str, object]:
+        result = {}
+        for key in keys:
+            value = await self.get(key)
+            if value is not None:
+                result[key] = value
+
+        return result
+
+    async def set_many(self, records: Iterable[Tuple[str, object]]):
+        for key, value in records:
+            await self.set(key, value)
+
+    async def delete_many(self, keys: Iterable[str]):
+        for key in keys:
+            await self.delete(key)
+
+    async def contains_many(self, keys: Iterable[str]) -> List[bool]:
+        return [await self.contains(key) for key in keys]
@@ -0,0 +1,517 @@
+import glob
+import mmap
+import os
+import pickle
+import struct
+import threading
+import zlib
+from collections.abc import MutableMapping
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+
+# crc32 of the rest of the record, whether it is a tombstone, key length and
+# value length. The key and the value follow the header.
+RECORD_HEADER = struct.Struct("<IBII")
+RECORD_CRC = struct.Struct("<I")
+# Whether it is a tombstone, key length, value offset and value length. The
+# key follows the header.
+HINT_HEADER = struct.Struct("<BIQI")
+
+# File id, value offset and value length.
+Location = Tuple[int, int, int]
+
+
+class DataFile:
+    """An append-only data file that is read through an mmap."""
+
+    def __init__(self, path: str, file_id: int):
+        self.path = path
+        self.file_id = file_id
+
+        self.file = open(path, "ab+")
+        self.size = self.file.seek(0, os.SEEK_END)
+        self.mapped: Optional[mmap.mmap] = None
+        self.dirty = False
+
+    def append(self, data: bytes) -> int:
+        offset = self.size
+        self.file.write(data)
+        self.size += len(data)
+        self.dirty = True
+
+        return offset
+
+    def read(self, offset: int, length: int) -> bytes:
+        return bytes(self.view(offset, length))
+
+    def view(self, offset: int, length: int) -> memoryview:
+        """Returns a read only view of the mmap, without copying."""
+        end = offset + length
+        if self.mapped is None or end > len(self.mapped):
+            # Only the active file grows, so this is rare for the others.
+            self._remap()
+
+        return memoryview(self.mapped)[offset:end]
+
+    def _remap(self):
+        if self.dirty:
+            self.file.flush()
+            self.dirty = False
+
+        self._unmap()
+        self.mapped = mmap.mmap(self.file.fileno(), self.size, access=mmap.ACCESS_READ)
+
+    def _unmap(self):
+        if self.mapped is None:
+            return
+
+        try:
+            self.mapped.close()
+        except BufferError:
+            # Views of it are still in use. It is unmapped once they are
+            # released.
+            pass
+        self.mapped = None
+
+    def sync(self):
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self.dirty = False
+
+    def close(self):
+        self._unmap()
+        self.file.close()
+
+
+class Bitcask(MutableMapping):
+    def __init__(
+        self,
+        directory: str,
+        prefix: str,
+        max_file_size: int = 64 * 2 ** 20,
+        merge_threshold: float = 0.5,
+        background_merge: bool = True,
+    ):
+        """Initialize a Bitcask style log of key value records.
+
+        Every write appends a record to the active data file, and the key
+        directory maps every live key to the location of its latest value.
+        A get is a dict lookup plus a view of the mmap of a data file. The
+        active file is closed once it reaches max_file_size. A hint file of
+        its keys and locations is written then, so reopening the log does
+        not have to read the values.
+
+        Merging rewrites the live records of every closed data file into
+        one, and runs once at least merge_threshold of their bytes are
+        overwritten or deleted records.
+
+        Values are bytes-like, and gets return read only memoryviews that
+        stay valid after the record is overwritten or merged away.
+
+        Parameters
+        ----------
+        directory : str
+            Directory to keep the data files in.
+        prefix : str
+            File name prefix of the data files. Existing data files with
+            this prefix are loaded.
+        max_file_size : int
+            Size in bytes at which the active data file is closed.
+        merge_threshold : float
+            Fraction of dead bytes in the closed data files that triggers a
+            merge.
+        background_merge : bool
+            Whether merges run on a background thread. Otherwise they run
+            inline when a data file is closed.
+        """
+        assert (
+            max_file_size > 0
+        ), "Max file size should be greater than 0. Max file size is {}".format(
+            max_file_size
+        )
+        assert (
+            0 < merge_threshold <= 1
+        ), "Merge threshold should be between 0 and 1. Merge threshold is {}".format(  # noqa: E501
+            merge_threshold
+        )
+
+        self.directory = directory
+        self.prefix = prefix
+        self.max_file_size = max_file_size
+        self.merge_threshold = merge_threshold
+
+        self.keydir: Dict[str, Location] = {}
+        self.files: Dict[int, DataFile] = {}
+        # Total and dead bytes of every data file.
+        self.file_bytes: Dict[int, int] = {}
+        self.dead_bytes: Dict[int, int] = {}
+
+        # Guards everything above. Merging only holds it to look up and swap
+        # locations.
+        self.mutex = threading.RLock()
+        self.merge_lock = threading.Lock()
+
+        self._load()
+        self.active = self._new_file(max(self.files, default=-1) + 1)
+        # Hint entries of the records in the active file, in write order.
+        self.active_entries: List[Tuple[bool, str, int, int]] = []
+
+        self.merge_needed = threading.Condition(self.mutex)
+        self.merge_error: Optional[BaseException] = None
+        self.running = False
+        self.merger: Optional[threading.Thread] = None
+        if background_merge:
+            self.running = True
+            self.merger = threading.Thread(target=self._merge_forever, daemon=True)
+            self.merger.start()
+
+    def _path(self, file_id: int, suffix: str) -> str:
+        return os.path.join(
+            self.directory, "{}{:08d}.{}".format(self.prefix, file_id, suffix)
+        )
+
+    def _new_file(self, file_id: int) -> DataFile:
+        data_file = DataFile(self._path(file_id, "data"), file_id)
+        self.files[file_id] = data_file
+        self.file_bytes[file_id] = data_file.size
+        self.dead_bytes.setdefault(file_id, 0)
+
+        return data_file
+
+    def _load(self):
+        pattern = os.path.join(
+            glob.escape(self.directory), glob.escape(self.prefix) + "*"
+        )
+
+        # A merge interrupted after its file took the place of the newest
+        # merged file must still remove the others, since it dropped the
+        # tombstones that shadowed their records. One interrupted before
+        # that must be undone, keeping every merged file.
+        for path in glob.glob(pattern):
+            name = os.path.basename(path)[len(self.prefix) :]
+            merged_id, _, suffix = name.partition(".")
+            if suffix == "manifest" and merged_id.isdigit():
+                if not os.path.exists(self._path(int(merged_id), "merge")):
+                    with open(path, "rb") as manifest_file:
+                        replaced_ids = pickle.load(manifest_file)
+                    for file_id in replaced_ids:
+                        self._remove_files(file_id)
+                os.remove(path)
+
+        file_ids = []
+        for path in glob.glob(pattern):
+            name = os.path.basename(path)[len(self.prefix) :]
+            file_id, _, suffix = name.partition(".")
+            if suffix == "data" and file_id.isdigit():
+                file_ids.append(int(file_id))
+            elif suffix.startswith("merge") or suffix == "manifest.tmp":
+                # Left over from an interrupted merge.
+                os.remove(path)
+
+        for file_id in sorted(file_ids):
+            data_file = self._new_file(file_id)
+            if os.path.exists(self._path(file_id, "hint")):
+                entries = self._read_hint(file_id)
+            else:
+                entries = self._scan(data_file)
+
+            for is_tombstone, key, offset, length in entries:
+                self._retire(key)
+                if is_tombstone:
+                    self.dead_bytes[file_id] += self._record_size(key, 0)
+                else:
+                    self.keydir[key] = (file_id, offset, length)
+
+    def _scan(self, data_file: DataFile) -> Iterator[Tuple[bool, str, int, int]]:
+        offset = 0
+        while offset + RECORD_HEADER.size <= data_file.size:
+            header = data_file.read(offset, RECORD_HEADER.size)
+            crc, is_tombstone, key_length, value_length = RECORD_HEADER.unpack(header)
+
+            body_offset = offset + RECORD_HEADER.size
+            body_length = key_length + value_length
+            if body_offset + body_length > data_file.size:
+                break
+
+            body = data_file.read(body_offset, body_length)
+            if zlib.crc32(body, zlib.crc32(header[RECORD_CRC.size :])) != crc:
+                # A torn write at the end of the file.
+                break
+
+            key = body[:key_length].decode()
+            yield bool(is_tombstone), key, body_offset + key_length, value_length
+            offset = body_offset + body_length
+
+    def _read_hint(self, file_id: int) -> Iterator[Tuple[bool, str, int, int]]:
+        with open(self._path(file_id, "hint"), "rb") as hint_file:
+            data = hint_file.read()
+
+        offset = 0
+        while offset < len(data):
+            is_tombstone, key_length, value_offset, value_length = (
+                HINT_HEADER.unpack_from(data, offset)
+            )
+            offset += HINT_HEADER.size
+            key = data[offset : offset + key_length].decode()
+            offset += key_length
+
+            yield bool(is_tombstone), key, value_offset, value_length
+
+    def _write_hint(self, path: str, entries: List[Tuple[bool, str, int, int]]):
+        with open(path, "wb") as hint_file:
+            for is_tombstone, key, offset, length in entries:
+                encoded_key = key.encode()
+                hint_file.write(
+                    HINT_HEADER.pack(is_tombstone, len(encoded_key), offset, length)
+                )
+                hint_file.write(encoded_key)
+
+            hint_file.flush()
+            os.fsync(hint_file.fileno())
+
+    def _write_manifest(self, merged_id: int, replaced_ids: List[int]):
+        # Written under a temporary name and synced, so a manifest found on
+        # reopen is always complete.
+        path = self._path(merged_id, "manifest")
+        with open(path + ".tmp", "wb") as manifest_file:
+            pickle.dump(replaced_ids, manifest_file, protocol=pickle.HIGHEST_PROTOCOL)
+            manifest_file.flush()
+            os.fsync(manifest_file.fileno())
+
+        os.replace(path + ".tmp", path)
+
+    def _remove_files(self, file_id: int):
+        for suffix in ("data", "hint"):
+            if os.path.exists(self._path(file_id, suffix)):
+                os.remove(self._path(file_id, suffix))
+
+    @staticmethod
+    def _record_size(key: str, value_length: int) -> int:
+        return RECORD_HEADER.size + len(key.encode()) + value_length
+
+    @staticmethod
+    def _encode(key: str, value: Optional[bytes]) -> bytes:
+        # A value of None encodes a tombstone.
+        encoded_key = key.encode()
+        if value is None:
+            header = RECORD_HEADER.pack(0, True, len(encoded_key), 0)
+            body = encoded_key
+        else:
+            header = RECORD_HEADER.pack(0, False, len(encoded_key), len(value))
+            body = encoded_key + value
+
+        crc = zlib.crc32(body, zlib.crc32(header[RECORD_CRC.size :]))
+
+        return RECORD_CRC.pack(crc) + header[RECORD_CRC.size :] + body
+
+    def _retire(self, key: str):
+        # The current value of key, if any, becomes dead weight.
+        location = self.keydir.pop(key, None)
+        if location is not None:
+            file_id, _, length = location
+            self.dead_bytes[file_id] += self._record_size(key, length)
+
+    def _append(self, key: str, value: Optional[bytes]):
+        record = self._encode(key, value)
+        offset = self.active.append(record)
+        self.file_bytes[self.active.file_id] += len(record)
+
+        self._retire(key)
+        if value is None:
+            self.dead_bytes[self.active.file_id] += len(record)
+            self.active_entries.append((True, key, offset + len(record), 0))
+        else:
+            value_offset = offset + len(record) - len(value)
+            self.keydir[key] = (self.active.file_id, value_offset, len(value))
+            self.active_entries.append((False, key, value_offset, len(value)))
+
+        if self.active.size >= self.max_file_size:
+            self._roll()
+
+    def _roll(self):
+        closed = self.active
+        closed.sync()
+
+        # Tombstones are kept so reloading still shadows older files.
+        self._write_hint(self._path(closed.file_id, "hint"), self.active_entries)
+
+        self.active = self._new_file(closed.file_id + 1)
+        self.active_entries = []
+
+        if self.merger is not None:
+            self.merge_needed.notify()
+        elif self._should_merge():
+            self.merge()
+
+    def __setitem__(self, key: str, value: Union[bytes, memoryview]):
+        data = bytes(memoryview(value))
+        with self.mutex:
+            self._append(key, data)
+
+    def __delitem__(self, key: str):
+        with self.mutex:
+            if key not in self.keydir:
+                raise KeyError(key)
+
+            self._append(key, None)
+
+    def __getitem__(self, key: str) -> memoryview:
+        with self.mutex:
+            file_id, offset, length = self.keydir[key]
+
+            return self.files[file_id].view(offset, length)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.keydir
+
+    def __iter__(self) -> Iterator[str]:
+        with self.mutex:
+            keys = list(self.keydir)
+
+        return iter(keys)
+
+    def __len__(self) -> int:
+        return len(self.keydir)
+
+    def _should_merge(self) -> bool:
+        closed_ids = [i for i in self.files if i != self.active.file_id]
+        total = sum(self.file_bytes[i] for i in closed_ids)
+        dead = sum(self.dead_bytes[i] for i in closed_ids)
+
+        return total > 0 and dead >= self.merge_threshold * total
+
+    def merge(self):
+        """Rewrites the live records of every closed data file into one."""
+        with self.merge_lock:
+            with self.mutex:
+                merged_ids = sorted(i for i in self.files if i != self.active.file_id)
+                if not merged_ids:
+                    return
+                sources = [self.files[i] for i in merged_ids]
+
+            # Reuses the newest merged id, which is still older than the
+            # active file, so reloading keeps the order of the records.
+            merged_id = merged_ids[-1]
+            merged_path = self._path(merged_id, "merge")
+            merged = DataFile(merged_path, merged_id)
+
+            moved = []
+            for source in sources:
+                for key, old_location, value in self._live_records(source):
+                    offset = merged.append(self._encode(key, value))
+                    new_location = (
+                        merged_id,
+                        offset + RECORD_HEADER.size + len(key.encode()),
+                        len(value),
+                    )
+                    moved.append((key, old_location, new_location))
+            merged.sync()
+
+            hint_path = self._path(merged_id, "merge_hint")
+            self._write_hint(
+                hint_path,
+                [(False, key, offset, length) for key, _, (_, offset, length) in moved],
+            )
+
+            with self.mutex:
+                merged_dead_bytes = 0
+                for key, old_location, new_location in moved:
+                    if self.keydir.get(key) == old_location:
+                        self.keydir[key] = new_location
+                    else:
+                        # Overwritten or deleted while merging.
+                        merged_dead_bytes += self._record_size(key, new_location[2])
+
+                for file_id in merged_ids:
+                    del self.files[file_id]
+                    del self.file_bytes[file_id]
+                    del self.dead_bytes[file_id]
+
+                self.files[merged_id] = merged
+                self.file_bytes[merged_id] = merged.size
+                self.dead_bytes[merged_id] = merged_dead_bytes
+
+                for source in sources:
+                    source.close()
+
+                # The merged file takes the place of the newest source before
+                # the others are removed, so every record survives a crash.
+                # The manifest makes the next open finish the merge.
+                self._write_manifest(merged_id, merged_ids[:-1])
+
+                merged.path = self._path(merged_id, "data")
+                if os.path.exists(self._path(merged_id, "hint")):
+                    # A crash before the new hint is in place scans the file.
+                    os.remove(self._path(merged_id, "hint"))
+                os.replace(merged_path, merged.path)
+                os.replace(hint_path, self._path(merged_id, "hint"))
+
+                for file_id in merged_ids[:-1]:
+                    self._remove_files(file_id)
+                os.remove(self._path(merged_id, "manifest"))
+
+    def _live_records(
+        self, source: DataFile
+    ) -> Iterator[Tuple[str, Location, bytes]]:
+        for is_tombstone, key, offset, length in self._scan(source):
+            location = (source.file_id, offset, length)
+            with self.mutex:
+                is_live = not is_tombstone and self.keydir.get(key) == location
+            if is_live:
+                yield key, location, source.read(offset, length)
+
+    def _merge_forever(self):
+        while True:
+            with self.mutex:
+                while self.running and not self._should_merge():
+                    self.merge_needed.wait()
+
+                if not self.running:
+                    return
+
+            try:
+                self.merge()
+            except BaseException as e:
+                with self.mutex:
+                    self.merge_error = e
+                    self.running = False
+                return
+
+    def sync(self):
+        """Flushes the active data file to disk."""
+        with self.mutex:
+            self._raise_merge_error()
+
+            self.active.sync()
+
+    def _raise_merge_error(self):
+        if self.merge_error is not None:
+            raise RuntimeError("Merging the Bitcask data files failed.") from (
+                self.merge_error
+            )
+
+    def close(self):
+        """Stops merging, syncs the active data file and closes every file.
+
+        The active data file gets a hint file too, or is removed if empty.
+        """
+        with self.mutex:
+            self.running = False
+            self.merge_needed.notify_all()
+
+        if self.merger is not None:
+            self.merger.join()
+            self.merger = None
+
+        with self.mutex:
+            self.active.sync()
+            if self.active.size:
+                # Reopening then reads hints only.
+                self._write_hint(
+                    self._path(self.active.file_id, "hint"), self.active_entries
+                )
+            for data_file in self.files.values():
+                data_file.close()
+            if not self.active.size:
+                os.remove(self.active.path)
+
+        self._raise_merge_error()
@@ -0,0 +1,95 @@
+import glob
+import os
+from typing import Optional, Union
+
+from RoomDict.storage_backends.Bitcask import Bitcask
+from RoomDict.storage_backends.GenericStorage import GenericStorage
+from RoomDict.storage_backends.serializers import GenericSerializer
+
+
+class BitcaskStorage(GenericStorage):
+    def __init__(
+        self,
+        directory: str = ".RoomDict",
+        fname: str = "RoomDict.bitcask",
+        serializer: Optional[Union[str, GenericSerializer]] = "pickle",
+        persistent: bool = False,
+        **bitcask_kwargs,
+    ):
+        """Initialize an append-only log backed storage.
+
+        Suited to read mostly tiers: the location of every value is kept in
+        memory, so a get reads exactly one value from an mmap. The data
+        files are removed on close.
+
+        Parameters
+        ----------
+        directory : str
+            Directory to keep the data files in.
+        fname : str
+            File name prefix of the data files.
+        serializer : Optional[Union[str, GenericSerializer]]
+            Serializer of stored values, or the name of one in
+            SERIALIZER_MAPPING. If None, values must be bytes-like and are
+            returned as memoryviews of the mmap. Otherwise the serializer is
+            given such a memoryview, so with "pickle5" buffers such as NumPy
+            arrays are loaded as read only views of the data file instead of
+            copies.
+        persistent : bool
+            Whether the files are kept on close and loaded by the next open.
+            Otherwise they are removed on close.
+        bitcask_kwargs
+            Bitcask initialization kwargs.
+        """
+        self.directory = directory
+        self.fname = fname
+        self.bitcask_kwargs = bitcask_kwargs
+
+        super().__init__(serializer, persistent)
+
+    @classmethod
+    def shard_kwargs(cls, kwargs: dict, shard: int) -> dict:
+        fname = kwargs.get("fname", "RoomDict.bitcask")
+        return {**kwargs, "fname": "shard{}_{}".format(shard, fname)}
+
+    def _data_paths(self):
+        return glob.glob(
+            os.path.join(glob.escape(self.directory), glob.escape(self.fname) + "*")
+        )
+
+    def open(self):
+        os.makedirs(self.directory, exist_ok=True)
+
+        if not self.persistent:
+            # Leftovers of a process that did not close its storage.
+            for path in self._data_paths():
+                os.remove(path)
+
+        kv_store = Bitcask(self.directory, self.fname, **self.bitcask_kwargs)
+        self.size = len(kv_store)
+
+        super()._open(kv_store)
+
+    def close(self, exc_type=None, exc_value=None, traceback=None):
+        try:
+            if self.valid:
+                self.kv_store.close()
+        finally:
+            if not self.persistent:
+                for path in self._data_paths():
+                    os.remove(path)
+                if os.path.isdir(self.directory) and not os.listdir(self.directory):
+                    os.rmdir(self.directory)
+
+            super()._close()
+
+    def sync(self):
+        """Flushes the active data file to disk."""
+        self._check_valid()
+
+        self.kv_store.sync()
+
+    def __iter__(self):
+        self._check_valid()
+
+        return iter(self.kv_store)
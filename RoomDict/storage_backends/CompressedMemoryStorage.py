@@ -0,0 +1,69 @@
+from typing import Optional, Union
+
+from RoomDict.storage_backends.MemoryStorage import MemoryStorage
+from RoomDict.storage_backends.compressors import GenericCompressor, get_compressor
+from RoomDict.storage_backends.serializers import GenericSerializer
+
+# First byte of every stored value.
+RAW = b"\x00"
+COMPRESSED = b"\x01"
+
+
+class CompressedMemoryStorage(MemoryStorage):
+    def __init__(
+        self,
+        compressor: Optional[Union[str, GenericCompressor]] = "zlib",
+        threshold: int = 256,
+        serializer: Union[str, GenericSerializer] = "pickle",
+    ):
+        """Initialize an in-memory storage of serialized, compressed values.
+
+        Meant as a tier between memory and disk: it holds several times more
+        values per byte of RAM than MemoryStorage, at the cost of a
+        serialization and decompression per get. Values that are small or
+        that do not shrink are kept uncompressed.
+
+        Parameters
+        ----------
+        compressor : Optional[Union[str, GenericCompressor]]
+            Compressor of serialized values, or the name of one in
+            COMPRESSOR_MAPPING. Values are only serialized if None.
+        threshold : int
+            Serialized values shorter than this many bytes are not
+            compressed.
+        serializer : Union[str, GenericSerializer]
+            Serializer of stored values, or the name of one in
+            SERIALIZER_MAPPING.
+        """
+        assert serializer is not None, "CompressedMemoryStorage needs a serializer."
+        assert (
+            threshold >= 0
+        ), "Threshold should not be negative. Threshold is {}".format(threshold)
+
+        self.compressor = get_compressor(compressor)
+        self.threshold = threshold
+
+        super().__init__(serializer)
+
+    def _encode(self, value: object) -> bytes:
+        data = self.serializer.dumps(value)
+
+        if self.compressor is not None and len(data) >= self.threshold:
+            compressed = self.compressor.compress(data)
+            if len(compressed) < len(data):
+                return COMPRESSED + compressed
+
+        return RAW + data
+
+    def _decode(self, data: bytes) -> object:
+        view = memoryview(data)[1:]
+        if data[:1] == COMPRESSED:
+            view = self.compressor.decompress(view)
+
+        return self.serializer.loads(view)
+
+    def stored_bytes(self) -> int:
+        """Returns the number of bytes of all stored values. O(n)."""
+        self._check_valid()
+
+        return sum(len(data) for data in self.kv_store.values())
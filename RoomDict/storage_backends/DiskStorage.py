@@ -1,49 +1,164 @@
+import dbm
 import os
-import shelve
-from typing import Optional
+import time
+from collections.abc import Iterable
+from typing import Iterator, Optional, Tuple, Union
 
 from RoomDict.storage_backends.GenericStorage import GenericStorage
+from RoomDict.storage_backends.serializers import GenericSerializer
+
+# Files each dbm implementation may keep the database in, by suffix.
+DBM_SUFFIXES = ("", ".db", ".dat", ".dir", ".bak")
 
 
 class DiskStorage(GenericStorage):
     def __init__(
-        self, directory: str = ".RoomDict", fname: str = "RoomDict.pkl"
+        self,
+        directory: str = ".RoomDict",
+        fname: str = "RoomDict.pkl",
+        sync_every: Optional[int] = None,
+        sync_interval: Optional[float] = None,
+        serializer: Union[str, GenericSerializer] = "pickle",
+        persistent: bool = False,
     ):  # noqa: E501
+        """Initialize a dbm backed storage.
+
+        The database is opened once in `open` and kept open until `close`.
+        Writes are flushed to disk according to the sync policy; the
+        database is always synced when it is closed.
+
+        Parameters
+        ----------
+        directory : str
+            Directory to keep the database in.
+        fname : str
+            File name of the database.
+        sync_every : Optional[int]
+            Sync the database after this many writes.
+        sync_interval : Optional[float]
+            Sync the database on the first write this many seconds after the
+            last sync.
+        serializer : Union[str, GenericSerializer]
+            Serializer of stored values, or the name of one in
+            SERIALIZER_MAPPING. dbm only stores bytes.
+        persistent : bool
+            Whether the database is kept on close and reopened by the next
+            open. Otherwise it is removed on close.
+        """
+        assert serializer is not None, "DiskStorage needs a serializer."
+        assert (
+            sync_every is None or sync_every > 0
+        ), "sync_every should be greater than 0. sync_every is {}".format(
+            sync_every
+        )
+        assert (
+            sync_interval is None or sync_interval >= 0
+        ), "sync_interval should not be negative. sync_interval is {}".format(
+            sync_interval
+        )
+
         self.directory = directory
         self.path = "{}/{}".format(self.directory, fname)
+        self.sync_every = sync_every
+        self.sync_interval = sync_interval
+
+        self.unsynced_writes = 0
+        self.last_sync = time.monotonic()
+
+        super().__init__(serializer, persistent)
 
-        super().__init__()
+    @classmethod
+    def shard_kwargs(cls, kwargs: dict, shard: int) -> dict:
+        fname = kwargs.get("fname", "RoomDict.pkl")
+        return {**kwargs, "fname": "shard{}_{}".format(shard, fname)}
 
     def open(self):
-        if not os.path.exists(self.path):
-            os.mkdir(self.directory)
+        os.makedirs(self.directory, exist_ok=True)
+
+        self.unsynced_writes = 0
+        self.last_sync = time.monotonic()
+
+        kv_store = dbm.open(self.path, "c")
+        self.size = len(kv_store)
+
+        super()._open(kv_store)
 
     def close(self, exc_type=None, exc_value=None, traceback=None):
-        if os.path.exists(self.path):
-            os.remove(self.path)
-            os.rmdir(self.directory)
+        if self.valid:
+            self.kv_store.close()
+
+        if not self.persistent:
+            # Depending on the dbm implementation the database is one or
+            # more files that share its path as a prefix. Other files that
+            # do are left alone.
+            for suffix in DBM_SUFFIXES:
+                if os.path.exists(self.path + suffix):
+                    os.remove(self.path + suffix)
+            if os.path.isdir(self.directory) and not os.listdir(self.directory):
+                os.rmdir(self.directory)
 
         super()._close()
 
+    def sync(self):
+        """Flushes all pending writes to disk."""
+        self._check_valid()
+
+        # Not every dbm implementation buffers writes.
+        if hasattr(self.kv_store, "sync"):
+            self.kv_store.sync()
+
+        self.unsynced_writes = 0
+        self.last_sync = time.monotonic()
+
+    def _record_write(self, count: int = 1):
+        self.unsynced_writes += count
+
+        if self.sync_every is not None and self.unsynced_writes >= self.sync_every:
+            self.sync()
+        elif (
+            self.sync_interval is not None
+            and time.monotonic() - self.last_sync >= self.sync_interval
+        ):
+            self.sync()
+
     def __setitem__(self, key: str, value: object):
-        self.size += 1
-        with shelve.open(self.path, writeback=False) as kv_store:
-            kv_store[key] = value
+        super().__setitem__(key, value)
 
-    def __getitem__(self, key: str) -> Optional[object]:
-        with shelve.open(self.path, writeback=False) as kv_store:
-            return kv_store[key]
+        self._record_write()
 
     def __delitem__(self, key: str):
-        with shelve.open(self.path, writeback=False) as kv_store:
-            if key in kv_store:
-                self.size -= 1
+        super().__delitem__(key)
+
+        self._record_write()
 
-            del kv_store[key]
+    def set_many(self, records: Iterable[Tuple[str, object]]):
+        records = list(records)
+        super().set_many(records)
+
+        self._record_write(len(records))
+
+    def delete_many(self, keys: Iterable[str]):
+        keys = list(keys)
+        super().delete_many(keys)
+
+        self._record_write(len(keys))
 
     def __iter__(self):
-        raise NotImplementedError
+        self._check_valid()
+
+        # dbm.gnu walks the database without listing every key, and
+        # dbm.dumb iterates its index in place. dbm.ndbm can only list.
+        if hasattr(self.kv_store, "firstkey"):
+            keys = self._walk()
+        elif hasattr(self.kv_store, "__iter__"):
+            keys = iter(self.kv_store)
+        else:
+            keys = iter(self.kv_store.keys())
+
+        return (key.decode() for key in keys)
 
-    def __contains__(self, key: str) -> bool:
-        with shelve.open(self.path, writeback=False) as kv_store:
-            return key in kv_store
+    def _walk(self) -> Iterator[bytes]:
+        key = self.kv_store.firstkey()
+        while key is not None:
+            yield key
+            key = self.kv_store.nextkey(key)
@@ -0,0 +1,81 @@
+import asyncio
+import functools
+import threading
+from collections.abc import Iterable
+from concurrent.futures import Executor
+from typing import Callable, Dict, List, Optional, Tuple
+
+from RoomDict.storage_backends.AsyncGenericStorage import AsyncGenericStorage
+from RoomDict.storage_backends.GenericStorage import GenericStorage
+
+
+class ExecutorStorage(AsyncGenericStorage):
+    def __init__(
+        self,
+        storage_backend: GenericStorage,
+        executor: Optional[Executor] = None,
+    ):
+        """Adapt a GenericStorage to AsyncGenericStorage.
+
+        Every operation runs on executor so the event loop is never blocked.
+        Backends that are not thread safe are only entered by one thread at a
+        time.
+
+        Parameters
+        ----------
+        storage_backend : GenericStorage
+            Storage backend to adapt.
+        executor : Optional[Executor]
+            Executor to run operations on. Uses the loop's default executor
+            if None.
+        """
+        self.storage_backend = storage_backend
+        self.executor = executor
+        self.lock = None if storage_backend.thread_safe else threading.Lock()
+
+    async def _run(self, function: Callable, *args):
+        loop = asyncio.get_running_loop()
+
+        return await loop.run_in_executor(
+            self.executor, functools.partial(self._call, function, *args)
+        )
+
+    def _call(self, function: Callable, *args):
+        if self.lock is None:
+            return function(*args)
+
+        with self.lock:
+            return function(*args)
+
+    async def open(self):
+        await self._run(self.storage_backend.open)
+
+    async def close(self, exc_type=None, exc_value=None, traceback=None):
+        await self._run(self.storage_backend.close, exc_type, exc_value, traceback)
+
+    async def get(self, key: str) -> Optional[object]:
+        return await self._run(self.storage_backend.get, key)
+
+    async def set(self, key: str, value: object):
+        await self._run(self.storage_backend.__setitem__, key, value)
+
+    async def delete(self, key: str):
+        await self._run(self.storage_backend.delete_many, [key])
+
+    async def contains(self, key: str) -> bool:
+        return await self._run(self.storage_backend.__contains__, key)
+
+    async def get_many(self, keys: Iterable[str]) -> Dict[str, object]:
+        return await self._run(self.storage_backend.get_many, list(keys))
+
+    async def set_many(self, records: Iterable[Tuple[str, object]]):
+        await self._run(self.storage_backend.set_many, list(records))
+
+    async def delete_many(self, keys: Iterable[str]):
+        await self._run(self.storage_backend.delete_many, list(keys))
+
+    async def contains_many(self, keys: Iterable[str]) -> List[bool]:
+        return await self._run(self.storage_backend.contains_many, list(keys))
+
+    def __len__(self) -> int:
+        return len(self.storage_backend)
@@ -1,13 +1,58 @@
 import abc
-from collections.abc import MutableMapping
-from typing import Optional
+from collections.abc import Iterable, MutableMapping
+from typing import Dict, List, Optional, Tuple, Union
+
+from RoomDict.storage_backends.serializers import GenericSerializer, get_serializer
 
 
 class GenericStorage(MutableMapping):
-    def __init__(self):
+    # Whether operations may block the calling thread, e.g. on I/O.
+    blocking = True
+    # Whether operations may be called from several threads at once.
+    thread_safe = False
+
+    def __init__(
+        self,
+        serializer: Optional[Union[str, GenericSerializer]] = None,
+        persistent: bool = False,
+    ):
+        """Initialize a storage.
+
+        Parameters
+        ----------
+        serializer : Optional[Union[str, GenericSerializer]]
+            Serializer of stored values, or the name of one in
+            SERIALIZER_MAPPING. Values are stored as is if None.
+        persistent : bool
+            Whether records are kept on close and found again on the next
+            open. Only backends that store records in files support it.
+        """
+        self.serializer = get_serializer(serializer)
+        self.persistent = persistent
         self.valid = False
         self.size = 0
 
+    @classmethod
+    def shard_kwargs(cls, kwargs: dict, shard: int) -> dict:
+        """Returns initialization kwargs for one shard of a sharded RoomDict.
+
+        Backends that keep state outside the process override this so that
+        shards do not share it.
+
+        Parameters
+        ----------
+        kwargs : dict
+            Initialization kwargs shared by every shard.
+        shard : int
+            Index of the shard.
+
+        Returns
+        -------
+        dict
+            Initialization kwargs for the shard.
+        """
+        return kwargs
+
     def _check_valid(self):
         if not self.valid:
             raise ValueError("RoomDict has not been opened.")
@@ -30,16 +75,46 @@ class GenericStorage(MutableMapping):
     def _close(self):
         self.valid = False
 
+    def snapshot(self) -> Optional[Dict[str, object]]:
+        """Returns every record as stored, for a warm restart.
+
+        Returns
+        -------
+        Optional[Dict[str, object]]
+            Mapping of every key to its stored value, or None if the storage
+            does not hand its records over. Records of such a storage only
+            survive a restart if it is persistent.
+        """
+        return None
+
+    def restore(self, records: Dict[str, object]):
+        """Stores records returned by snapshot, as they were stored."""
+        raise NotImplementedError
+
+    def _encode(self, value: object) -> object:
+        if self.serializer is None:
+            return value
+
+        return self.serializer.dumps(value)
+
+    def _decode(self, data: object) -> object:
+        if self.serializer is None:
+            return data
+
+        return self.serializer.loads(data)
+
     def __setitem__(self, key: str, value: object):
         self._check_valid()
 
-        self.size += 1
-        self.kv_store[key] = value
+        # Overwrites keep the size.
+        if key not in self.kv_store:
+            self.size += 1
+        self.kv_store[key] = self._encode(value)
 
     def __getitem__(self, key: str) -> Optional[object]:
         self._check_valid()
 
-        return self.kv_store[key]
+        return self._decode(self.kv_store[key])
 
     def __delitem__(self, key: str):
         self._check_valid()
@@ -52,9 +127,79 @@ class GenericStorage(MutableMapping):
     def __iter__(self):
         self._check_valid()
 
-        iter(self.kv_store)
+        return iter(self.kv_store)
 
     def __contains__(self, key: str) -> bool:
         self._check_valid()
 
         return key in self.kv_store
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, object]:
+        """Gets the values of all stored keys in keys.
+
+        Parameters
+        ----------
+        keys : Iterable[str]
+            Keys to get from the storage.
+
+        Returns
+        -------
+        Dict[str, object]
+            Mapping of every key that is stored to its value. Keys that are
+            not stored are left out.
+        """
+        self._check_valid()
+
+        result = {}
+        for key in keys:
+            if key in self.kv_store:
+                result[key] = self._decode(self.kv_store[key])
+
+        return result
+
+    def set_many(self, records: Iterable[Tuple[str, object]]):
+        """Stores every key and value in records.
+
+        Parameters
+        ----------
+        records : Iterable[Tuple[str, object]]
+            Keys and values to store.
+        """
+        self._check_valid()
+
+        for key, value in records:
+            if key not in self.kv_store:
+                self.size += 1
+            self.kv_store[key] = self._encode(value)
+
+    def delete_many(self, keys: Iterable[str]):
+        """Deletes every stored key in keys. Missing keys are ignored.
+
+        Parameters
+        ----------
+        keys : Iterable[str]
+            Keys to delete from the storage.
+        """
+        self._check_valid()
+
+        for key in keys:
+            if key in self.kv_store:
+                self.size -= 1
+                del self.kv_store[key]
+
+    def contains_many(self, keys: Iterable[str]) -> List[bool]:
+        """Checks whether each key in keys is stored.
+
+        Parameters
+        ----------
+        keys : Iterable[str]
+            Keys to check.
+
+        Returns
+        -------
+        List[bool]
+            Whether each key is stored, in the order of keys.
+        """
+        self._check_valid()
+
+        return [key in self.kv_store for key in keys]
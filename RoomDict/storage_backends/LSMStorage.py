@@ -0,0 +1,125 @@
+import glob
+import os
+from collections.abc import Iterable
+from typing import Optional, Tuple, Union
+
+from RoomDict.storage_backends.GenericStorage import GenericStorage
+from RoomDict.storage_backends.serializers import GenericSerializer
+from RoomDict.storage_backends.LSMTree import LSMTree
+
+
+class LSMStorage(GenericStorage):
+    def __init__(
+        self,
+        directory: str = ".RoomDict",
+        fname: str = "RoomDict.lsm",
+        serializer: Optional[Union[str, GenericSerializer]] = None,
+        persistent: bool = False,
+        **lsm_kwargs,
+    ):
+        """Initialize a log-structured merge tree backed storage.
+
+        Suited to write heavy tiers such as the one below an LRU cache:
+        writes are buffered in memory and written out sequentially, and
+        deletes are tombstones. Neither reads the segments first, so the
+        number of stored keys is not tracked, and len merges the segments.
+        The segment files are removed on close.
+
+        Parameters
+        ----------
+        directory : str
+            Directory to keep the segment files in.
+        fname : str
+            File name prefix of the segment files.
+        serializer : Optional[Union[str, GenericSerializer]]
+            Serializer of stored values, or the name of one in
+            SERIALIZER_MAPPING. Values are stored as is if None, and are
+            pickled with their segment block either way.
+        persistent : bool
+            Whether the files are kept on close and loaded by the next open.
+            Otherwise they are removed on close.
+        lsm_kwargs
+            LSMTree initialization kwargs.
+        """
+        self.directory = directory
+        self.fname = fname
+        self.lsm_kwargs = lsm_kwargs
+
+        super().__init__(serializer, persistent)
+
+    @classmethod
+    def shard_kwargs(cls, kwargs: dict, shard: int) -> dict:
+        fname = kwargs.get("fname", "RoomDict.lsm")
+        return {**kwargs, "fname": "shard{}_{}".format(shard, fname)}
+
+    def _segment_paths(self):
+        return glob.glob(
+            os.path.join(glob.escape(self.directory), glob.escape(self.fname) + "*")
+        )
+
+    def open(self):
+        os.makedirs(self.directory, exist_ok=True)
+
+        if not self.persistent:
+            # Leftovers of a process that did not close its storage.
+            for path in self._segment_paths():
+                os.remove(path)
+
+        kv_store = LSMTree(self.directory, self.fname, **self.lsm_kwargs)
+
+        super()._open(kv_store)
+
+    def close(self, exc_type=None, exc_value=None, traceback=None):
+        try:
+            if self.valid:
+                if self.persistent:
+                    self.kv_store.flush()
+                self.kv_store.close()
+        finally:
+            if not self.persistent:
+                for path in self._segment_paths():
+                    os.remove(path)
+                if os.path.isdir(self.directory) and not os.listdir(self.directory):
+                    os.rmdir(self.directory)
+
+            super()._close()
+
+    def flush(self):
+        """Writes the memtable out as a new segment."""
+        self._check_valid()
+
+        self.kv_store.flush()
+
+    def __iter__(self):
+        self._check_valid()
+
+        return iter(self.kv_store)
+
+    # Writes are blind: checking whether a key is stored would cost a Bloom
+    # probe per segment, and a block read for keys written before.
+    def __setitem__(self, key: str, value: object):
+        self._check_valid()
+
+        self.kv_store[key] = self._encode(value)
+
+    def __delitem__(self, key: str):
+        self._check_valid()
+
+        self.kv_store.discard(key)
+
+    def set_many(self, records: Iterable[Tuple[str, object]]):
+        self._check_valid()
+
+        for key, value in records:
+            self.kv_store[key] = self._encode(value)
+
+    def delete_many(self, keys: Iterable[str]):
+        self._check_valid()
+
+        for key in keys:
+            self.kv_store.discard(key)
+
+    def __len__(self) -> int:
+        self._check_valid()
+
+        return len(self.kv_store)
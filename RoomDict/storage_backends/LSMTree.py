@@ -0,0 +1,544 @@
+import glob
+import heapq
+import os
+import pickle
+import struct
+import threading
+from bisect import bisect_right
+from collections.abc import Iterable, MutableMapping
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from RoomDict.membership_tests import NumpyBloomMembership
+
+FOOTER_OFFSET = struct.Struct("<Q")
+
+# A record as kept in segments: key, whether it is a tombstone, and value.
+SegmentRecord = Tuple[str, bool, object]
+
+
+class Segment:
+    """An immutable sorted run of records in one file.
+
+    Records are written in blocks of pickled lists. The first key and the
+    offset of every block form a sparse index, so a lookup reads one block.
+    A Bloom filter over the keys lets most lookups skip the segment
+    entirely. The index and filter are also written to a footer, so the
+    segment can be reopened.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        first_keys: List[str],
+        block_offsets: List[Tuple[int, int]],
+        num_records: int,
+        bloom_filter: NumpyBloomMembership,
+    ):
+        self.path = path
+        self.first_keys = first_keys
+        self.block_offsets = block_offsets
+        self.num_records = num_records
+        self.bloom_filter = bloom_filter
+
+        self.file = open(path, "rb")
+        self.mutex = threading.Lock()
+
+    @classmethod
+    def write(
+        cls,
+        path: str,
+        records: Iterable[SegmentRecord],
+        block_size: int,
+        error_rate: float,
+        before_replace: Optional[Callable[[], None]] = None,
+    ) -> Optional["Segment"]:
+        """Writes sorted records to a new segment file at path.
+
+        before_replace, if given, is called once the file is complete and
+        synced, right before it takes the place of any file at path.
+
+        Returns
+        -------
+        Optional[Segment]
+            The new segment, or None if records was empty.
+        """
+        first_keys = []
+        block_offsets = []
+        keys = []
+
+        # Written under a temporary name, so a segment file found on reopen
+        # is always complete.
+        temporary_path = path + ".tmp"
+        with open(temporary_path, "wb") as segment_file:
+            block: List[SegmentRecord] = []
+            for record in records:
+                block.append(record)
+                keys.append(record[0])
+                if len(block) == block_size:
+                    cls._write_block(segment_file, block, first_keys, block_offsets)
+                    block = []
+            if block:
+                cls._write_block(segment_file, block, first_keys, block_offsets)
+
+            if not keys:
+                segment_file.close()
+                os.remove(temporary_path)
+                return None
+
+            bloom_filter = NumpyBloomMembership(len(keys), error_rate)
+            bloom_filter.add_many(keys)
+
+            footer_offset = segment_file.tell()
+            footer = (
+                first_keys,
+                block_offsets,
+                len(keys),
+                error_rate,
+                bloom_filter.bits.tobytes(),
+            )
+            pickle.dump(footer, segment_file, protocol=pickle.HIGHEST_PROTOCOL)
+            segment_file.write(FOOTER_OFFSET.pack(footer_offset))
+
+            segment_file.flush()
+            os.fsync(segment_file.fileno())
+
+        if before_replace is not None:
+            before_replace()
+        os.replace(temporary_path, path)
+
+        return cls(path, first_keys, block_offsets, len(keys), bloom_filter)
+
+    @staticmethod
+    def _write_block(segment_file, block, first_keys, block_offsets):
+        data = pickle.dumps(block, protocol=pickle.HIGHEST_PROTOCOL)
+
+        first_keys.append(block[0][0])
+        block_offsets.append((segment_file.tell(), len(data)))
+        segment_file.write(data)
+
+    @classmethod
+    def load(cls, path: str) -> "Segment":
+        """Reopens a segment written by write."""
+        with open(path, "rb") as segment_file:
+            segment_file.seek(-FOOTER_OFFSET.size, os.SEEK_END)
+            (footer_offset,) = FOOTER_OFFSET.unpack(
+                segment_file.read(FOOTER_OFFSET.size)
+            )
+
+            segment_file.seek(footer_offset)
+            first_keys, block_offsets, num_records, error_rate, bits = pickle.load(
+                segment_file
+            )
+
+        bloom_filter = NumpyBloomMembership(num_records, error_rate)
+        bloom_filter.bits[:] = np.frombuffer(bits, dtype=np.uint8)
+
+        return cls(path, first_keys, block_offsets, num_records, bloom_filter)
+
+    def _read_block(self, index: int) -> List[SegmentRecord]:
+        offset, length = self.block_offsets[index]
+        with self.mutex:
+            self.file.seek(offset)
+            data = self.file.read(length)
+
+        return pickle.loads(data)
+
+    def get(self, key: str) -> Optional[SegmentRecord]:
+        """Returns the record of key, or None if the segment has none."""
+        if key not in self.bloom_filter:
+            return None
+
+        index = bisect_right(self.first_keys, key) - 1
+        if index < 0:
+            return None
+
+        block = self._read_block(index)
+        position = bisect_right(block, (key,))
+        if position < len(block) and block[position][0] == key:
+            return block[position]
+
+        return None
+
+    def __iter__(self) -> Iterator[SegmentRecord]:
+        for index in range(len(self.block_offsets)):
+            yield from self._read_block(index)
+
+    def __len__(self) -> int:
+        return self.num_records
+
+    def close(self):
+        self.file.close()
+
+    def remove(self):
+        self.close()
+        os.remove(self.path)
+
+
+class LSMTree(MutableMapping):
+    def __init__(
+        self,
+        directory: str,
+        prefix: str,
+        memtable_size: int = 1024,
+        block_size: int = 64,
+        error_rate: float = 0.01,
+        min_merge: int = 4,
+        size_ratio: float = 2.0,
+        background_compaction: bool = True,
+    ):
+        """Initialize a log-structured merge tree over segment files.
+
+        Writes go to an in-memory memtable. A full memtable is written out
+        sequentially as a new sorted segment. Deletes write tombstones.
+        Lookups check the memtable, then the segments from newest to oldest.
+        Size-tiered compaction merges runs of min_merge or more adjacent
+        segments of similar size into one, dropping shadowed records, and
+        dropping tombstones once nothing older can be shadowed.
+
+        Parameters
+        ----------
+        directory : str
+            Directory to keep the segment files in.
+        prefix : str
+            File name prefix of the segment files. Existing segment files
+            with this prefix are loaded.
+        memtable_size : int
+            Number of records in the memtable before it is flushed.
+        block_size : int
+            Number of records per data block of a segment.
+        error_rate : float
+            False positive rate of the Bloom filter of each segment.
+        min_merge : int
+            Minimum number of similar sized segments merged at once.
+        size_ratio : float
+            Maximum ratio between the sizes of segments merged together.
+        background_compaction : bool
+            Whether compaction runs on a background thread. Otherwise it
+            runs inline after each memtable flush.
+        """
+        assert (
+            memtable_size > 0
+        ), "Memtable size should be greater than 0. Memtable size is {}".format(
+            memtable_size
+        )
+        assert (
+            block_size > 0
+        ), "Block size should be greater than 0. Block size is {}".format(block_size)
+        assert (
+            min_merge > 1
+        ), "Min merge should be greater than 1. Min merge is {}".format(min_merge)
+        assert (
+            size_ratio >= 1
+        ), "Size ratio should be at least 1. Size ratio is {}".format(size_ratio)
+
+        self.directory = directory
+        self.prefix = prefix
+        self.memtable_size = memtable_size
+        self.block_size = block_size
+        self.error_rate = error_rate
+        self.min_merge = min_merge
+        self.size_ratio = size_ratio
+
+        # Key to (is tombstone, value).
+        self.memtable: Dict[str, Tuple[bool, object]] = {}
+        # Ordered from oldest to newest.
+        self.segments: List[Segment] = []
+        self.next_segment_id = 0
+        self._load()
+
+        # Guards memtable and segments. Segments are immutable, so merging
+        # them only needs it to take a snapshot and to swap in the result.
+        self.mutex = threading.RLock()
+        self.compaction_lock = threading.Lock()
+
+        self.compaction_needed = threading.Condition(self.mutex)
+        self.compaction_error: Optional[BaseException] = None
+        self.running = False
+        self.compactor: Optional[threading.Thread] = None
+        if background_compaction:
+            self.running = True
+            self.compactor = threading.Thread(target=self._compact_forever, daemon=True)
+            self.compactor.start()
+
+    def _load(self):
+        pattern = os.path.join(
+            glob.escape(self.directory), glob.escape(self.prefix) + "*"
+        )
+
+        # A compaction interrupted after its output took the place of its
+        # newest input must still remove the others, since the output may
+        # have dropped the tombstones that shadowed their records. One
+        # interrupted before that must be undone, keeping every input.
+        for path in glob.glob(pattern):
+            if path.endswith(".merge"):
+                output_path = path[: -len(".merge")] + ".sst"
+                if not os.path.exists(output_path + ".tmp"):
+                    with open(path, "rb") as manifest_file:
+                        for name in pickle.load(manifest_file):
+                            input_path = os.path.join(self.directory, name)
+                            if os.path.exists(input_path):
+                                os.remove(input_path)
+                os.remove(path)
+
+        segment_ids = []
+        for path in glob.glob(pattern):
+            name = os.path.basename(path)[len(self.prefix) :]
+            segment_id, _, suffix = name.partition(".")
+            if suffix == "sst" and segment_id.isdigit():
+                segment_ids.append(int(segment_id))
+            elif suffix in ("sst.tmp", "merge.tmp"):
+                # Left over from an interrupted flush or compaction.
+                os.remove(path)
+
+        # Segment ids grow with age, so sorting restores the newest last
+        # order.
+        for segment_id in sorted(segment_ids):
+            path = os.path.join(
+                self.directory, "{}{:08d}.sst".format(self.prefix, segment_id)
+            )
+            self.segments.append(Segment.load(path))
+            self.next_segment_id = segment_id + 1
+
+    def _segment_path(self) -> str:
+        path = os.path.join(
+            self.directory, "{}{:08d}.sst".format(self.prefix, self.next_segment_id)
+        )
+        self.next_segment_id += 1
+
+        return path
+
+    def __setitem__(self, key: str, value: object):
+        with self.mutex:
+            self.memtable[key] = (False, value)
+            self._maybe_flush()
+
+    def __delitem__(self, key: str):
+        with self.mutex:
+            if key not in self:
+                raise KeyError(key)
+
+            self.memtable[key] = (True, None)
+            self._maybe_flush()
+
+    def discard(self, key: str):
+        """Deletes key without checking that it is stored, which would read
+        the segments. Deleting a missing key writes a tombstone too."""
+        with self.mutex:
+            self.memtable[key] = (True, None)
+            self._maybe_flush()
+
+    def __getitem__(self, key: str) -> object:
+        with self.mutex:
+            entry = self.memtable.get(key)
+            if entry is not None:
+                is_tombstone, value = entry
+                if is_tombstone:
+                    raise KeyError(key)
+                return value
+
+            for segment in reversed(self.segments):
+                record = segment.get(key)
+                if record is not None:
+                    _, is_tombstone, value = record
+                    if is_tombstone:
+                        raise KeyError(key)
+                    return value
+
+        raise KeyError(key)
+
+    def __contains__(self, key: str) -> bool:
+        try:
+            self[key]
+        except KeyError:
+            return False
+
+        return True
+
+    def __iter__(self) -> Iterator[str]:
+        for key, _ in self.items():
+            yield key
+
+    def items(self) -> Iterator[Tuple[str, object]]:
+        """Yields every live key and value in key order."""
+        with self.mutex:
+            memtable = sorted(
+                (key, is_tombstone, value)
+                for key, (is_tombstone, value) in self.memtable.items()
+            )
+            sources = [memtable] + list(reversed(self.segments))
+
+        for key, is_tombstone, value in self._merge(sources, drop_tombstones=True):
+            yield key, value
+
+    def __len__(self) -> int:
+        # Tombstones and shadowed records make this a full merge.
+        return sum(1 for _ in self.items())
+
+    def _merge(
+        self, sources: List[Iterable[SegmentRecord]], drop_tombstones: bool
+    ) -> Iterator[SegmentRecord]:
+        # Sources are ordered from newest to oldest, and the newest record of
+        # each key wins.
+        streams = [
+            ((key, age, is_tombstone, value) for key, is_tombstone, value in source)
+            for age, source in enumerate(sources)
+        ]
+
+        last_key = None
+        for key, _, is_tombstone, value in heapq.merge(
+            *streams, key=lambda entry: (entry[0], entry[1])
+        ):
+            if key == last_key:
+                continue
+            last_key = key
+
+            if is_tombstone and drop_tombstones:
+                continue
+            yield key, is_tombstone, value
+
+    def flush(self):
+        """Writes the memtable out as a new segment."""
+        with self.mutex:
+            self._raise_compaction_error()
+
+            if not self.memtable:
+                return
+
+            records = sorted(
+                (key, is_tombstone, value)
+                for key, (is_tombstone, value) in self.memtable.items()
+            )
+            segment = Segment.write(
+                self._segment_path(), records, self.block_size, self.error_rate
+            )
+            self.segments.append(segment)
+            self.memtable = {}
+
+            if self.compactor is not None:
+                self.compaction_needed.notify()
+
+        if self.compactor is None:
+            self.compact()
+
+    def _maybe_flush(self):
+        if len(self.memtable) >= self.memtable_size:
+            self.flush()
+
+    def _next_run(self) -> Optional[List[Segment]]:
+        # The first run of at least min_merge adjacent segments whose sizes
+        # are within size_ratio of each other.
+        segments = self.segments
+        start = 0
+        while start + self.min_merge <= len(segments):
+            end = start + 1
+            smallest = largest = len(segments[start])
+            while end < len(segments):
+                size = len(segments[end])
+                if max(largest, size) > self.size_ratio * min(smallest, size):
+                    break
+                smallest = min(smallest, size)
+                largest = max(largest, size)
+                end += 1
+
+            if end - start >= self.min_merge:
+                return segments[start:end]
+            start += 1
+
+        return None
+
+    def compact(self):
+        """Merges runs of similar sized segments until none is left."""
+        with self.compaction_lock:
+            while True:
+                with self.mutex:
+                    run = self._next_run()
+                    if run is None:
+                        return
+
+                    # Nothing older can be shadowed by the run's tombstones.
+                    drop_tombstones = run[0] is self.segments[0]
+
+                # The merged segment takes the place of the newest segment of
+                # the run, so ordering segments by id stays newest last.
+                # Readers of the replaced file keep their open handle to it.
+                # The manifest names the other inputs, which it replaces too.
+                manifest_path = run[-1].path[: -len(".sst")] + ".merge"
+                records = self._merge(list(reversed(run)), drop_tombstones)
+                merged = Segment.write(
+                    run[-1].path,
+                    records,
+                    self.block_size,
+                    self.error_rate,
+                    lambda: self._write_manifest(manifest_path, run[:-1]),
+                )
+                if merged is None:
+                    # Nothing is left, so every input goes.
+                    self._write_manifest(manifest_path, run)
+
+                with self.mutex:
+                    start = next(
+                        i for i, segment in enumerate(self.segments) if segment is run[0]
+                    )
+                    replacement = [] if merged is None else [merged]
+                    self.segments[start : start + len(run)] = replacement
+
+                for segment in run:
+                    if merged is not None and segment is run[-1]:
+                        segment.close()
+                    else:
+                        segment.remove()
+                os.remove(manifest_path)
+
+    @staticmethod
+    def _write_manifest(path: str, replaced: List[Segment]):
+        # Written under a temporary name and synced, so a manifest found on
+        # reopen is always complete.
+        temporary_path = path + ".tmp"
+        with open(temporary_path, "wb") as manifest_file:
+            names = [os.path.basename(segment.path) for segment in replaced]
+            pickle.dump(names, manifest_file, protocol=pickle.HIGHEST_PROTOCOL)
+            manifest_file.flush()
+            os.fsync(manifest_file.fileno())
+
+        os.replace(temporary_path, path)
+
+    def _compact_forever(self):
+        while True:
+            with self.mutex:
+                while self.running and self._next_run() is None:
+                    self.compaction_needed.wait()
+
+                if not self.running:
+                    return
+
+            try:
+                self.compact()
+            except BaseException as e:
+                with self.mutex:
+                    self.compaction_error = e
+                    self.running = False
+                return
+
+    def _raise_compaction_error(self):
+        if self.compaction_error is not None:
+            raise RuntimeError("Compacting the LSM tree failed.") from (
+                self.compaction_error
+            )
+
+    def close(self):
+        """Stops compaction and closes every segment file."""
+        with self.mutex:
+            self.running = False
+            self.compaction_needed.notify_all()
+
+        if self.compactor is not None:
+            self.compactor.join()
+            self.compactor = None
+
+        with self.mutex:
+            for segment in self.segments:
+                segment.close()
+
+        self._raise_compaction_error()
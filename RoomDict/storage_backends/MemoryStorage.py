@@ -1,7 +1,12 @@
+from typing import Dict
+
 from RoomDict.storage_backends.GenericStorage import GenericStorage
 
 
 class MemoryStorage(GenericStorage):
+    blocking = False
+    thread_safe = True
+
     def open(self):
         kv_store = {}
 
@@ -11,3 +16,14 @@ class MemoryStorage(GenericStorage):
         self.kv_store.clear()
 
         super()._close()
+
+    def snapshot(self) -> Dict[str, object]:
+        self._check_valid()
+
+        return dict(self.kv_store)
+
+    def restore(self, records: Dict[str, object]):
+        self._check_valid()
+
+        self.kv_store.update(records)
+        self.size = len(self.kv_store)
@@ -0,0 +1,266 @@
+import os
+import sqlite3
+import time
+from collections.abc import Iterable
+from typing import Dict, List, Optional, Tuple, Union
+
+from RoomDict.storage_backends.GenericStorage import GenericStorage
+from RoomDict.storage_backends.serializers import GenericSerializer
+
+# SQLite limits the number of parameters per statement.
+MAX_PARAMETERS = 500
+
+# The database, its write-ahead log, its shared memory file and its journal.
+SQLITE_SUFFIXES = ("", "-wal", "-shm", "-journal")
+
+SCHEMA = [
+    "CREATE TABLE IF NOT EXISTS records (key TEXT PRIMARY KEY, value BLOB NOT NULL)",
+    "CREATE TABLE IF NOT EXISTS record_count (count INTEGER NOT NULL)",
+    "INSERT INTO record_count SELECT COUNT(*) FROM records "
+    "WHERE NOT EXISTS (SELECT 1 FROM record_count)",
+    # Keep the count exact without a scan. Upserts that update a key do not
+    # fire the insert trigger.
+    "CREATE TRIGGER IF NOT EXISTS count_insert AFTER INSERT ON records "
+    "BEGIN UPDATE record_count SET count = count + 1; END",
+    "CREATE TRIGGER IF NOT EXISTS count_delete AFTER DELETE ON records "
+    "BEGIN UPDATE record_count SET count = count - 1; END",
+]
+
+UPSERT = (
+    "INSERT INTO records (key, value) VALUES (?, ?) "
+    "ON CONFLICT (key) DO UPDATE SET value = excluded.value"
+)
+SELECT = "SELECT value FROM records WHERE key = ?"
+# Only reads the primary key index.
+EXISTS = "SELECT 1 FROM records WHERE key = ?"
+DELETE = "DELETE FROM records WHERE key = ?"
+COUNT = "SELECT count FROM record_count"
+
+
+class SQLiteStorage(GenericStorage):
+    def __init__(
+        self,
+        directory: str = ".RoomDict",
+        fname: str = "RoomDict.sqlite",
+        sync_every: Optional[int] = 1000,
+        sync_interval: Optional[float] = 0.1,
+        synchronous: str = "NORMAL",
+        serializer: Union[str, GenericSerializer] = "pickle",
+        persistent: bool = False,
+    ):
+        """Initialize a SQLite backed storage in WAL mode.
+
+        One connection is opened in `open` and kept until `close`. Writes
+        are grouped into transactions that are committed according to the
+        sync policy, and always when the storage is closed. Statements are
+        fixed strings, so the sqlite3 module prepares each of them once.
+
+        Parameters
+        ----------
+        directory : str
+            Directory to keep the database in.
+        fname : str
+            File name of the database.
+        sync_every : Optional[int]
+            Commit after this many writes.
+        sync_interval : Optional[float]
+            Commit on the first write this many seconds after the last
+            commit.
+        synchronous : str
+            SQLite synchronous pragma. NORMAL is crash safe in WAL mode but
+            may lose the last commits on power loss; FULL does not.
+        serializer : Union[str, GenericSerializer]
+            Serializer of stored values, or the name of one in
+            SERIALIZER_MAPPING. Values are stored as blobs.
+        persistent : bool
+            Whether the database is kept on close and reopened by the next
+            open. Otherwise it is removed on close.
+        """
+        assert serializer is not None, "SQLiteStorage needs a serializer."
+        assert (
+            sync_every is None or sync_every > 0
+        ), "sync_every should be greater than 0. sync_every is {}".format(
+            sync_every
+        )
+        assert (
+            sync_interval is None or sync_interval >= 0
+        ), "sync_interval should not be negative. sync_interval is {}".format(
+            sync_interval
+        )
+
+        self.directory = directory
+        self.path = "{}/{}".format(self.directory, fname)
+        self.sync_every = sync_every
+        self.sync_interval = sync_interval
+        self.synchronous = synchronous
+
+        self.unsynced_writes = 0
+        self.last_sync = time.monotonic()
+
+        super().__init__(serializer, persistent)
+
+    @classmethod
+    def shard_kwargs(cls, kwargs: dict, shard: int) -> dict:
+        fname = kwargs.get("fname", "RoomDict.sqlite")
+        return {**kwargs, "fname": "shard{}_{}".format(shard, fname)}
+
+    def open(self):
+        os.makedirs(self.directory, exist_ok=True)
+
+        # Transactions are managed explicitly. The connection may be used by
+        # the write-behind worker, which RoomDict serializes with its lock.
+        connection = sqlite3.connect(
+            self.path, isolation_level=None, check_same_thread=False
+        )
+        connection.execute("PRAGMA journal_mode = WAL")
+        connection.execute("PRAGMA synchronous = {}".format(self.synchronous))
+        for statement in SCHEMA:
+            connection.execute(statement)
+
+        self.unsynced_writes = 0
+        self.last_sync = time.monotonic()
+
+        super()._open(connection)
+
+    def close(self, exc_type=None, exc_value=None, traceback=None):
+        if self.valid:
+            if self.kv_store.in_transaction:
+                self.kv_store.commit()
+            self.kv_store.close()
+
+        if not self.persistent:
+            for suffix in SQLITE_SUFFIXES:
+                if os.path.exists(self.path + suffix):
+                    os.remove(self.path + suffix)
+            if os.path.isdir(self.directory) and not os.listdir(self.directory):
+                os.rmdir(self.directory)
+
+        super()._close()
+
+    def sync(self):
+        """Commits the open transaction."""
+        self._check_valid()
+
+        if self.kv_store.in_transaction:
+            self.kv_store.commit()
+
+        self.unsynced_writes = 0
+        self.last_sync = time.monotonic()
+
+    def _begin(self):
+        if not self.kv_store.in_transaction:
+            self.kv_store.execute("BEGIN")
+
+    def _record_write(self, count: int = 1):
+        self.unsynced_writes += count
+
+        if self.sync_every is not None and self.unsynced_writes >= self.sync_every:
+            self.sync()
+        elif (
+            self.sync_interval is not None
+            and time.monotonic() - self.last_sync >= self.sync_interval
+        ):
+            self.sync()
+
+    @staticmethod
+    def _chunks(keys: List[str]) -> Iterable[List[str]]:
+        for start in range(0, len(keys), MAX_PARAMETERS):
+            yield keys[start : start + MAX_PARAMETERS]
+
+    def __len__(self):
+        self._check_valid()
+
+        return self.kv_store.execute(COUNT).fetchone()[0]
+
+    def __setitem__(self, key: str, value: object):
+        self._check_valid()
+
+        self._begin()
+        self.kv_store.execute(UPSERT, (key, self._encode(value)))
+
+        self._record_write()
+
+    def __getitem__(self, key: str) -> Optional[object]:
+        self._check_valid()
+
+        row = self.kv_store.execute(SELECT, (key,)).fetchone()
+        if row is None:
+            raise KeyError(key)
+
+        return self._decode(row[0])
+
+    def __delitem__(self, key: str):
+        self._check_valid()
+
+        self._begin()
+        if self.kv_store.execute(DELETE, (key,)).rowcount == 0:
+            raise KeyError(key)
+
+        self._record_write()
+
+    def __iter__(self):
+        self._check_valid()
+
+        return (row[0] for row in self.kv_store.execute("SELECT key FROM records"))
+
+    def __contains__(self, key: str) -> bool:
+        self._check_valid()
+
+        return self.kv_store.execute(EXISTS, (key,)).fetchone() is not None
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, object]:
+        self._check_valid()
+
+        result = {}
+        for chunk in self._chunks(list(dict.fromkeys(keys))):
+            rows = self.kv_store.execute(
+                "SELECT key, value FROM records WHERE key IN ({})".format(
+                    ", ".join("?" * len(chunk))
+                ),
+                chunk,
+            )
+            for key, value in rows:
+                result[key] = self._decode(value)
+
+        return result
+
+    def set_many(self, records: Iterable[Tuple[str, object]]):
+        self._check_valid()
+
+        rows = [(key, self._encode(value)) for key, value in records]
+        if not rows:
+            return
+
+        self._begin()
+        self.kv_store.executemany(UPSERT, rows)
+
+        self._record_write(len(rows))
+
+    def delete_many(self, keys: Iterable[str]):
+        self._check_valid()
+
+        rows = [(key,) for key in keys]
+        if not rows:
+            return
+
+        self._begin()
+        self.kv_store.executemany(DELETE, rows)
+
+        self._record_write(len(rows))
+
+    def contains_many(self, keys: Iterable[str]) -> List[bool]:
+        self._check_valid()
+
+        keys = list(keys)
+
+        found = set()
+        for chunk in self._chunks(list(dict.fromkeys(keys))):
+            rows = self.kv_store.execute(
+                "SELECT key FROM records WHERE key IN ({})".format(
+                    ", ".join("?" * len(chunk))
+                ),
+                chunk,
+            )
+            found.update(row[0] for row in rows)
+
+        return [key in found for key in keys]
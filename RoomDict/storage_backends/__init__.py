@@ -1,5 +1,19 @@
+from RoomDict.storage_backends.BitcaskStorage import BitcaskStorage
+from RoomDict.storage_backends.CompressedMemoryStorage import CompressedMemoryStorage
 from RoomDict.storage_backends.DiskStorage import DiskStorage
+from RoomDict.storage_backends.LSMStorage import LSMStorage
 from RoomDict.storage_backends.MemoryStorage import MemoryStorage
+from RoomDict.storage_backends.SQLiteStorage import SQLiteStorage
 from RoomDict.storage_backends.ArbitraryStorage import ArbitraryStorage
+from RoomDict.storage_backends.ExecutorStorage import ExecutorStorage
 
-__all__ = [ArbitraryStorage, DiskStorage, MemoryStorage]
+__all__ = [
+    ArbitraryStorage,
+    BitcaskStorage,
+    CompressedMemoryStorage,
+    DiskStorage,
+    ExecutorStorage,
+    LSMStorage,
+    MemoryStorage,
+    SQLiteStorage,
+]
@@ -0,0 +1,72 @@
+import abc
+import bz2
+import lzma
+import zlib
+from typing import Optional, Union
+
+from RoomDict.storage_backends.registry import resolve
+
+
+class GenericCompressor(abc.ABC):
+    @abc.abstractmethod
+    def compress(self, data: Union[bytes, memoryview]) -> bytes:
+        """Returns data compressed."""
+        pass
+
+    @abc.abstractmethod
+    def decompress(self, data: Union[bytes, memoryview]) -> bytes:
+        """Returns the data that compress returned data for."""
+        pass
+
+
+class ZlibCompressor(GenericCompressor):
+    def __init__(self, level: int = 1):
+        self.level = level
+
+    def compress(self, data: Union[bytes, memoryview]) -> bytes:
+        return zlib.compress(data, self.level)
+
+    def decompress(self, data: Union[bytes, memoryview]) -> bytes:
+        return zlib.decompress(data)
+
+
+class LZMACompressor(GenericCompressor):
+    """lzma, which compresses better than zlib but is several times slower."""
+
+    def __init__(self, preset: int = 1):
+        self.preset = preset
+
+    def compress(self, data: Union[bytes, memoryview]) -> bytes:
+        return lzma.compress(data, preset=self.preset)
+
+    def decompress(self, data: Union[bytes, memoryview]) -> bytes:
+        return lzma.decompress(data)
+
+
+class BZ2Compressor(GenericCompressor):
+    def __init__(self, level: int = 9):
+        self.level = level
+
+    def compress(self, data: Union[bytes, memoryview]) -> bytes:
+        return bz2.compress(data, self.level)
+
+    def decompress(self, data: Union[bytes, memoryview]) -> bytes:
+        return bz2.decompress(data)
+
+
+COMPRESSOR_MAPPING = {
+    "zlib": ZlibCompressor,
+    "lzma": LZMACompressor,
+    "bz2": BZ2Compressor,
+}
+
+
+def get_compressor(
+    compressor: Optional[Union[str, GenericCompressor]]
+) -> Optional[GenericCompressor]:
+    """Returns the compressor named by compressor, or compressor itself.
+
+    Any object with compress and decompress, such as the zlib module, may be
+    used as a compressor.
+    """
+    return resolve(compressor, COMPRESSOR_MAPPING)
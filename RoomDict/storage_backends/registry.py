@@ -0,0 +1,11 @@
+from typing import Dict, Optional, TypeVar, Union
+
+T = TypeVar("T")
+
+
+def resolve(value: Optional[Union[str, T]], mapping: Dict[str, type]) -> Optional[T]:
+    """Returns value, or a new instance of the class it names in mapping."""
+    if isinstance(value, str):
+        return mapping[value]()
+
+    return value
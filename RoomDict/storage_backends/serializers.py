@@ -0,0 +1,142 @@
+import abc
+import marshal
+import pickle
+import struct
+from typing import Callable, List, Optional, Union
+
+from RoomDict.storage_backends.registry import resolve
+
+# Number of out-of-band buffers, then the length of the pickle and of every
+# buffer.
+FRAME_COUNT = struct.Struct("<I")
+FRAME_LENGTH = struct.Struct("<Q")
+# Buffers start at multiples of this, so views of them are aligned for any
+# NumPy dtype.
+ALIGNMENT = 8
+
+
+class GenericSerializer(abc.ABC):
+    @abc.abstractmethod
+    def dumps(self, value: object) -> bytes:
+        """Returns value encoded as bytes."""
+        pass
+
+    @abc.abstractmethod
+    def loads(self, data: Union[bytes, memoryview]) -> object:
+        """Returns the value encoded in data."""
+        pass
+
+
+class PickleSerializer(GenericSerializer):
+    def __init__(self, protocol: int = pickle.HIGHEST_PROTOCOL):
+        self.protocol = protocol
+
+    def dumps(self, value: object) -> bytes:
+        return pickle.dumps(value, protocol=self.protocol)
+
+    def loads(self, data: Union[bytes, memoryview]) -> object:
+        return pickle.loads(data)
+
+
+class Pickle5Serializer(GenericSerializer):
+    """Pickle protocol 5 with out-of-band buffers.
+
+    Buffers that support protocol 5, such as contiguous NumPy arrays, are
+    framed after the pickle instead of copied into it. Loading passes
+    slices of data back as those buffers, so such values are views of data,
+    read only if data is. Backends that return a memoryview of mapped
+    storage therefore load them without copying.
+    """
+
+    def dumps(self, value: object) -> bytes:
+        buffers: List[pickle.PickleBuffer] = []
+        data = pickle.dumps(value, protocol=5, buffer_callback=buffers.append)
+        raw_buffers = [buffer.raw() for buffer in buffers]
+
+        parts = [FRAME_COUNT.pack(len(raw_buffers)), FRAME_LENGTH.pack(len(data))]
+        parts += [FRAME_LENGTH.pack(raw_buffer.nbytes) for raw_buffer in raw_buffers]
+        parts.append(data)
+
+        offset = sum(len(part) for part in parts)
+        for raw_buffer in raw_buffers:
+            padding = -offset % ALIGNMENT
+            parts.append(b"\0" * padding)
+            parts.append(raw_buffer)
+            offset += padding + raw_buffer.nbytes
+
+        return b"".join(parts)
+
+    def loads(self, data: Union[bytes, memoryview]) -> object:
+        data = memoryview(data)
+
+        (num_buffers,) = FRAME_COUNT.unpack_from(data, 0)
+        offset = FRAME_COUNT.size
+
+        lengths = []
+        for _ in range(num_buffers + 1):
+            lengths.append(FRAME_LENGTH.unpack_from(data, offset)[0])
+            offset += FRAME_LENGTH.size
+
+        pickle_data = data[offset : offset + lengths[0]]
+        offset += lengths[0]
+
+        buffers = []
+        for length in lengths[1:]:
+            offset += -offset % ALIGNMENT
+            buffers.append(data[offset : offset + length])
+            offset += length
+
+        return pickle.loads(pickle_data, buffers=buffers)
+
+
+class MarshalSerializer(GenericSerializer):
+    """marshal, which is faster than pickle but only handles builtin types."""
+
+    def dumps(self, value: object) -> bytes:
+        return marshal.dumps(value)
+
+    def loads(self, data: Union[bytes, memoryview]) -> object:
+        return marshal.loads(data)
+
+
+class CodecSerializer(GenericSerializer):
+    def __init__(
+        self,
+        dumps: Callable[[object], bytes],
+        loads: Callable[[Union[bytes, memoryview]], object],
+    ):
+        """Initialize a serializer from a user supplied pair of functions.
+
+        Parameters
+        ----------
+        dumps : Callable[[object], bytes]
+            Function encoding a value as bytes.
+        loads : Callable[[Union[bytes, memoryview]], object]
+            Function decoding a value from what dumps returned.
+        """
+        self.encode = dumps
+        self.decode = loads
+
+    def dumps(self, value: object) -> bytes:
+        return self.encode(value)
+
+    def loads(self, data: Union[bytes, memoryview]) -> object:
+        return self.decode(data)
+
+
+SERIALIZER_MAPPING = {
+    "pickle": PickleSerializer,
+    "pickle5": Pickle5Serializer,
+    "marshal": MarshalSerializer,
+}
+
+
+def get_serializer(
+    serializer: Optional[Union[str, GenericSerializer]]
+) -> Optional[GenericSerializer]:
+    """Returns the serializer named by serializer, or serializer itself.
+
+    Any object with dumps and loads, such as the json module, may be used as
+    a serializer.
+    """
+    return resolve(serializer, SERIALIZER_MAPPING)
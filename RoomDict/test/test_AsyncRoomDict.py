@@ -0,0 +1,116 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from RoomDict.AsyncRoomDict import AsyncRoomDict
+
+from RoomDict.test.utils import assert_equal
+
+KEY, VALUE = ("TEST{}", "TSET{}")
+DELAY = 0.02
+
+
+def create_room_dict(executor=None, **kwargs) -> AsyncRoomDict:
+    return AsyncRoomDict(
+        ["lru", "none"],
+        ["none", "none"],
+        ["memory", "arbitrary"],
+        [{"max_size": 2}],
+        storage_backends_kwargs=[{}, {"delay": DELAY}],
+        executor=executor,
+        **kwargs,
+    )
+
+
+def test_set_and_get():
+    async def run():
+        async with create_room_dict() as cache:
+            for i in range(10):
+                await cache.set(KEY.format(i), VALUE.format(i))
+
+            for i in range(10):
+                assert_equal(VALUE.format(i), await cache.get(KEY.format(i)))
+
+            assert_equal(None, await cache.get("BAD_KEY"))
+
+    asyncio.run(run())
+
+
+def test_delete_and_contains():
+    async def run():
+        async with create_room_dict() as cache:
+            for i in range(10):
+                await cache.set(KEY.format(i), VALUE.format(i))
+            await cache.flush()
+
+            for i in range(0, 10, 2):
+                await cache.delete(KEY.format(i))
+
+            for i in range(10):
+                assert_equal(i % 2 == 1, await cache.contains(KEY.format(i)))
+                assert_equal(
+                    None if i % 2 == 0 else VALUE.format(i),
+                    await cache.get(KEY.format(i)),
+                )
+
+    asyncio.run(run())
+
+
+def test_concurrent_misses_overlap():
+    num_keys = 8
+    executor = ThreadPoolExecutor(max_workers=num_keys)
+
+    async def run():
+        async with create_room_dict(executor) as cache:
+            for i in range(num_keys + 2):
+                await cache.set(KEY.format(i), VALUE.format(i))
+            await cache.flush()
+
+            # The first keys were evicted to the slow tier.
+            start = time.monotonic()
+            values = await asyncio.gather(
+                *[cache.get(KEY.format(i)) for i in range(num_keys)]
+            )
+            elapsed = time.monotonic() - start
+
+            assert_equal([VALUE.format(i) for i in range(num_keys)], values)
+            assert elapsed < num_keys * DELAY
+
+    asyncio.run(run())
+    executor.shutdown()
+
+
+def test_hits_keep_inline_tiers():
+    async def run():
+        async with AsyncRoomDict(
+            ["lru", "lru", "none"],
+            ["none", "none", "none"],
+            ["memory", "memory", "arbitrary"],
+            [{"max_size": 2}, {"max_size": 2}],
+            storage_backends_kwargs=[{}, {}, {"delay": 0}],
+        ) as cache:
+            for i in range(6):
+                await cache.set(KEY.format(i), VALUE.format(i))
+            assert_equal(4, len(cache.room_dict))
+
+            # Hits in the highest level cache do not reinsert the record.
+            for _ in range(3):
+                assert_equal(VALUE.format(5), await cache.get(KEY.format(5)))
+            assert_equal(4, len(cache.room_dict))
+
+            # Promoting from the second tier evicts a record of it, which
+            # moves on to the blocking tier.
+            assert_equal(VALUE.format(2), await cache.get(KEY.format(2)))
+            assert_equal(4, len(cache.room_dict))
+            await cache.flush()
+            for i in range(6):
+                assert_equal(VALUE.format(i), await cache.get(KEY.format(i)))
+
+    asyncio.run(run())
+
+
+def test_blocking_tier_cache_policy():
+    with pytest.raises(AssertionError):
+        AsyncRoomDict(["lru", "lru"], ["none", "none"], ["memory", "arbitrary"])
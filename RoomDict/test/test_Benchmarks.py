@@ -0,0 +1,110 @@
+import json
+from collections import Counter
+
+import pytest
+
+from RoomDict.benchmarks import (
+    WORKLOAD_MAPPING,
+    compare_results,
+    run_benchmark,
+    run_benchmarks,
+    trace,
+    write_trace,
+)
+from RoomDict.benchmarks.__main__ import main
+
+from RoomDict.test.utils import assert_equal
+
+CONFIG = {
+    "cache_policies": ["lru", "none"],
+    "membership_tests": ["none", "none"],
+    "storage_backends": ["memory", "disk"],
+    "cache_policies_kwargs": [{"max_size": 10}],
+}
+
+
+def test_workloads():
+    zipf_kwargs = {"exponent": 1.5, "write_ratio": 0.5}
+    zipf = WORKLOAD_MAPPING["zipf"](1000, 100, **zipf_kwargs)
+    assert_equal(zipf, WORKLOAD_MAPPING["zipf"](1000, 100, **zipf_kwargs))
+    assert_equal(1000, len(zipf))
+    assert 400 < sum(operation == "set" for operation, _ in zipf) < 600
+
+    # The most popular key gets a large share of a skewed workload.
+    counts = Counter(key for _, key in zipf).most_common()
+    assert counts[0][1] > 5 * counts[10][1]
+
+    uniform = WORKLOAD_MAPPING["uniform"](1000, 100)
+    assert_equal({"get"}, {operation for operation, _ in uniform})
+    assert len({key for _, key in uniform}) > 90
+
+    scan_loop = WORKLOAD_MAPPING["scan_loop"](12, 3, scan_length=2, scan_interval=4)
+    assert_equal(
+        ["key0", "key1", "key2", "key0", "scan0", "scan1"]
+        + ["key1", "key2", "key0", "key1", "scan2", "scan3"],
+        [key for _, key in scan_loop],
+    )
+
+
+def test_trace(tmp_path):
+    path = str(tmp_path / "trace")
+    operations = WORKLOAD_MAPPING["zipf"](100, 10, write_ratio=0.2)
+    operations.append(("delete", "key0"))
+
+    write_trace(path, operations)
+    assert_equal(operations, trace(path))
+    assert_equal(operations[:10], trace(path, num_ops=10))
+
+    with open(path, "w") as trace_file:
+        trace_file.write("# A key per line is read.\nkey1\n\nset key2\n")
+    assert_equal([("get", "key1"), ("set", "key2")], trace(path))
+
+
+@pytest.mark.parametrize("isolate", [False, True])
+def test_run_benchmark(isolate):
+    workload = {"workload": "scan_loop", "num_ops": 200, "num_keys": 20}
+    result = run_benchmark(workload, CONFIG, isolate=isolate)
+
+    # The loop misses the first time around and then hits in the second tier.
+    assert_equal(200, result["num_ops"])
+    assert_equal(0.9, result["hit_ratio"])
+    assert_equal([0.0, 180 / 200], result["tier_hit_ratios"])
+    assert_equal(200, result["latencies"]["get"]["count"])
+    assert result["ops_per_sec"] > 0
+    assert result["peak_rss"] > 0
+
+
+def test_compare(tmp_path):
+    spec = {
+        "workloads": {
+            "uniform": {"workload": "uniform", "num_ops": 100, "num_keys": 20}
+        },
+        "configs": {"lru": CONFIG},
+    }
+    baseline = run_benchmarks(spec, isolate=False)
+    result = baseline["results"][0]
+    assert_equal("uniform/lru", result["name"])
+
+    assert not any(
+        comparison["regression"] for comparison in compare_results(baseline, baseline)
+    )
+
+    current = json.loads(json.dumps(baseline))
+    current["results"][0]["ops_per_sec"] *= 0.9
+    current["results"][0]["hit_ratio"] *= 1.1
+    regressions = [
+        comparison["metric"]
+        for comparison in compare_results(baseline, current)
+        if comparison["regression"]
+    ]
+    assert_equal(["ops_per_sec"], regressions)
+    assert not any(
+        comparison["regression"]
+        for comparison in compare_results(baseline, current, tolerance=0.2)
+    )
+
+    baseline_path, current_path = tmp_path / "baseline.json", tmp_path / "current.json"
+    baseline_path.write_text(json.dumps(baseline))
+    current_path.write_text(json.dumps(current))
+    assert_equal(0, main(["compare", str(baseline_path), str(baseline_path)]))
+    assert_equal(1, main(["compare", str(baseline_path), str(current_path)]))
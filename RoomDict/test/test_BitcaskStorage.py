@@ -0,0 +1,165 @@
+import os
+import random
+
+import pytest
+
+from RoomDict import RoomDict
+from RoomDict.storage_backends import BitcaskStorage
+from RoomDict.storage_backends.Bitcask import Bitcask
+
+from RoomDict.test.utils import assert_equal
+
+NUM_RECORDS = 200
+
+
+@pytest.fixture(params=[False, True], ids=["inline", "background"])
+def bitcask_storage(request, tmp_path):
+    storage_backend = BitcaskStorage(
+        directory=str(tmp_path / "bitcask"),
+        max_file_size=512,
+        background_merge=request.param,
+    )
+    storage_backend.open()
+
+    yield storage_backend
+
+    storage_backend.close()
+
+
+def churn(mapping, rng):
+    expected = {}
+    for i in range(10 * NUM_RECORDS):
+        key = "test{}".format(rng.randrange(NUM_RECORDS))
+        if rng.random() < 0.3 and key in expected:
+            del mapping[key]
+            del expected[key]
+        else:
+            mapping[key] = str(i).encode()
+            expected[key] = str(i).encode()
+
+    return expected
+
+
+def test_put_get_and_delete(bitcask_storage):
+    expected = churn(bitcask_storage, random.Random(0))
+
+    for i in range(NUM_RECORDS):
+        key = "test{}".format(i)
+        assert_equal(key in expected, key in bitcask_storage)
+        if key in expected:
+            assert_equal(expected[key], bitcask_storage[key])
+
+    assert_equal(sorted(expected), sorted(bitcask_storage))
+
+
+def test_merge(tmp_path):
+    bitcask = Bitcask(str(tmp_path), "test", max_file_size=256, background_merge=False)
+
+    for i in range(1000):
+        bitcask["test{}".format(i % 10)] = str(i).encode()
+
+    # Merging keeps the closed files down to about one file of live records.
+    assert len(bitcask.files) <= 3
+    for i in range(10):
+        assert_equal(str(990 + i).encode(), bitcask["test{}".format(i)])
+
+    bitcask.close()
+
+
+@pytest.mark.parametrize("use_hints", [True, False])
+def test_reopen(tmp_path, use_hints):
+    bitcask = Bitcask(str(tmp_path), "test", max_file_size=256, background_merge=False)
+    expected = churn(bitcask, random.Random(1))
+    bitcask.close()
+
+    if not use_hints:
+        for name in os.listdir(str(tmp_path)):
+            if name.endswith(".hint"):
+                os.remove(str(tmp_path / name))
+
+    reopened = Bitcask(str(tmp_path), "test", background_merge=False)
+    assert_equal(expected, dict((key, reopened[key]) for key in reopened))
+    reopened.close()
+
+
+class Crash(Exception):
+    pass
+
+
+@pytest.mark.parametrize("crash_at", ["manifest", "remove"])
+def test_interrupted_merge(tmp_path, monkeypatch, crash_at):
+    bitcask = Bitcask(
+        str(tmp_path),
+        "test",
+        max_file_size=256,
+        merge_threshold=1,
+        background_merge=False,
+    )
+
+    # The newest closed file holds only tombstones of records in older ones,
+    # and the merged file takes its place.
+    expected = {}
+    for i in range(30):
+        bitcask["test{}".format(i)] = str(i).encode()
+        expected["test{}".format(i)] = str(i).encode()
+    with bitcask.mutex:
+        bitcask._roll()
+    for i in range(10):
+        del bitcask["test{}".format(i)]
+        del expected["test{}".format(i)]
+    with bitcask.mutex:
+        bitcask._roll()
+
+    if crash_at == "manifest":
+        # Before the merged file takes the place of the newest merged one.
+        write_manifest = bitcask._write_manifest
+
+        def crash(*args):
+            write_manifest(*args)
+            raise Crash()
+
+        monkeypatch.setattr(bitcask, "_write_manifest", crash)
+    else:
+        # After it did, before the other merged files are removed.
+        def crash(*args):
+            raise Crash()
+
+        monkeypatch.setattr(bitcask, "_remove_files", crash)
+    with pytest.raises(Crash):
+        bitcask.merge()
+
+    reopened = Bitcask(str(tmp_path), "test", background_merge=False)
+    assert_equal(sorted(expected), sorted(reopened))
+    for key, value in expected.items():
+        assert_equal(value, bytes(reopened[key]))
+    reopened.close()
+
+
+def test_close_removes_files(tmp_path):
+    directory = str(tmp_path / "bitcask")
+    storage_backend = BitcaskStorage(directory=directory, max_file_size=64)
+    storage_backend.open()
+
+    for i in range(20):
+        storage_backend["test{}".format(i)] = i
+
+    storage_backend.close()
+
+    assert not os.path.exists(directory)
+
+
+def test_cold_tier(tmp_path):
+    key, value = ("TEST{}", "TSET{}")
+
+    with RoomDict(
+        ["lru", "none"],
+        ["none", "none"],
+        ["memory", "bitcask"],
+        [{"max_size": 10}],
+        storage_backends_kwargs=[{}, {"directory": str(tmp_path / "bitcask")}],
+    ) as cache:
+        for i in range(NUM_RECORDS):
+            cache[key.format(i)] = value.format(i)
+
+        for i in range(NUM_RECORDS):
+            assert_equal(value.format(i), cache[key.format(i)])
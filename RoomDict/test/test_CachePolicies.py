@@ -0,0 +1,215 @@
+import random
+
+import pytest
+
+from RoomDict.caches import (
+    ARCCache,
+    ArrayLRUCache,
+    ClockCache,
+    LRUCache,
+    S3FIFOCache,
+    TwoQCache,
+)
+from RoomDict.membership_tests import NaiveMembership
+from RoomDict.storage_backends import MemoryStorage
+
+from RoomDict.test.utils import assert_equal
+
+TEST_SIZE = 10
+CACHE_POLICIES = [
+    LRUCache,
+    ArrayLRUCache,
+    ClockCache,
+    ARCCache,
+    TwoQCache,
+    S3FIFOCache,
+]
+
+
+@pytest.fixture(params=CACHE_POLICIES)
+def cache(request):
+    storage_backend = MemoryStorage()
+    storage_backend.open()
+
+    yield request.param(NaiveMembership(), storage_backend, TEST_SIZE)
+
+    storage_backend.close()
+
+
+def test_put_and_get(cache):
+    for i in range(TEST_SIZE):
+        assert_equal(None, cache.put("test{}".format(i), i))
+
+    for i in range(TEST_SIZE):
+        assert_equal(i, cache.get("test{}".format(i)))
+        assert "test{}".format(i) in cache
+
+    assert_equal(None, cache.get("BAD_KEY"))
+
+
+def test_update(cache):
+    cache.put("test", 0)
+    assert_equal(None, cache.put("test", 1))
+    assert_equal(1, cache.get("test"))
+    assert_equal(1, len(cache))
+
+
+def test_evictions_are_consistent(cache):
+    rng = random.Random(0)
+    resident = {}
+
+    for i in range(2000):
+        key = "test{}".format(int(rng.paretovariate(1.0)) % (5 * TEST_SIZE))
+        if rng.random() < 0.5:
+            value = cache.get(key)
+            assert_equal(resident.get(key), value)
+        elif rng.random() < 0.9:
+            evicted = cache.put(key, i)
+            resident[key] = i
+            if evicted is not None:
+                evicted_key, evicted_value = evicted
+                assert_equal(resident.pop(evicted_key), evicted_value)
+        else:
+            del cache[key]
+            resident.pop(key, None)
+
+        assert len(cache) <= TEST_SIZE
+        assert_equal(len(resident), len(cache))
+
+    assert_equal(resident, dict(list(iter(cache))))
+
+
+def test_resize(cache):
+    rng = random.Random(0)
+    resident = {}
+
+    def put(key, value):
+        evicted = cache.put(key, value)
+        resident[key] = value
+        if evicted is not None:
+            evicted_key, evicted_value = evicted
+            assert_equal(resident.pop(evicted_key), evicted_value)
+
+    for i in range(TEST_SIZE):
+        put("test{}".format(i), i)
+
+    # Shrinking evicts the surplus, and every policy keeps working after.
+    for max_size in [TEST_SIZE // 2, 2 * TEST_SIZE, 1]:
+        for evicted_key, evicted_value in cache.resize(max_size):
+            assert_equal(resident.pop(evicted_key), evicted_value)
+        assert_equal(min(max_size, len(resident)), len(cache))
+        assert_equal(resident, dict(list(iter(cache))))
+
+        for i in range(200):
+            key = "test{}".format(int(rng.paretovariate(1.0)) % (5 * TEST_SIZE))
+            if cache.get(key) is None:
+                put(key, i)
+            assert len(cache) <= max_size
+
+        assert_equal(max_size, len(cache))
+        assert_equal(resident, dict(list(iter(cache))))
+
+
+def test_peek(cache):
+    for i in range(TEST_SIZE + 1):
+        cache.put("test{}".format(i), i)
+
+    # Reading every record leaves the next eviction as it was.
+    keys = list(cache.iter_keys())
+    assert_equal(TEST_SIZE, len(keys))
+    assert_equal(
+        {"test{}".format(i): i for i in range(1, TEST_SIZE + 1)}, cache.peek_many(keys)
+    )
+    assert_equal(sorted(keys), sorted(key for key, _ in cache))
+    assert_equal(("test1", 1), cache.put("new", -1))
+
+
+def test_deletion(cache):
+    for i in range(TEST_SIZE):
+        cache.put("test{}".format(i), i)
+
+    for i in range(TEST_SIZE):
+        del cache["test{}".format(i)]
+        assert "test{}".format(i) not in cache
+
+    assert_equal(0, len(cache))
+
+
+@pytest.mark.parametrize("cache_policy", [ARCCache, TwoQCache, S3FIFOCache])
+def test_scan_resistance(cache_policy):
+    storage_backend = MemoryStorage()
+    storage_backend.open()
+    cache = cache_policy(NaiveMembership(), storage_backend, TEST_SIZE)
+
+    hot_keys = ["hot{}".format(i) for i in range(TEST_SIZE // 2)]
+    for i in range(5):
+        for key in hot_keys:
+            if cache.get(key) is None:
+                cache.put(key, key)
+
+        for j in range(TEST_SIZE // 2):
+            cache.put("filler{}_{}".format(i, j), j)
+
+    # A scan of keys that are never used again.
+    for i in range(10 * TEST_SIZE):
+        cache.put("scan{}".format(i), i)
+
+    hits = sum(cache.get(key) is not None for key in hot_keys)
+    assert hits >= len(hot_keys) // 2
+
+    storage_backend.close()
+
+
+def test_array_lru_matches_lru():
+    rng = random.Random(0)
+    caches = []
+    for cache_policy in [LRUCache, ArrayLRUCache]:
+        storage_backend = MemoryStorage()
+        storage_backend.open()
+        caches.append(cache_policy(NaiveMembership(), storage_backend, TEST_SIZE))
+
+    for i in range(2000):
+        key = "test{}".format(rng.randrange(3 * TEST_SIZE))
+        if rng.random() < 0.9:
+            values = [cache.get(key) for cache in caches]
+            assert_equal(*values)
+
+            if values[0] is None:
+                assert_equal(*[cache.put(key, i) for cache in caches])
+        else:
+            for cache in caches:
+                del cache[key]
+
+    assert_equal(*[list(iter(cache)) for cache in caches])
+
+
+@pytest.mark.parametrize("cache_policy", CACHE_POLICIES)
+def test_max_bytes(cache_policy):
+    storage_backend = MemoryStorage()
+    storage_backend.open()
+
+    cache = cache_policy(
+        NaiveMembership(), storage_backend, TEST_SIZE, max_bytes=100, sizer=len
+    )
+
+    for i in range(4):
+        assert_equal(None, cache.put("test{}".format(i), "x" * 25))
+    assert_equal(100, cache.bytes)
+
+    # One large value has to push out several small ones. put returns the
+    # first of them, put_many every one.
+    assert_equal(("test0", "x" * 25), cache.put("large", "x" * 60))
+    assert_equal(2, len(cache))
+    assert_equal(2, len(cache.put_many([("larger", "x" * 90)])))
+    assert cache.bytes <= 100
+    assert_equal(cache.bytes, sum(len(value) for _, value in list(iter(cache))))
+
+    # A value over the budget is never cached.
+    assert_equal(("huge", "x" * 101), cache.put("huge", "x" * 101))
+    assert "huge" not in dict(list(iter(cache)))
+
+    for key, _ in list(iter(cache)):
+        del cache[key]
+    assert_equal(0, cache.bytes)
+
+    storage_backend.close()
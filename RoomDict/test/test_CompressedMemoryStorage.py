@@ -0,0 +1,84 @@
+import zlib
+
+import pytest
+
+from RoomDict import RoomDict
+from RoomDict.storage_backends import CompressedMemoryStorage
+from RoomDict.storage_backends.compressors import COMPRESSOR_MAPPING
+
+from RoomDict.test.utils import assert_equal
+
+NUM_RECORDS = 100
+
+TEST_RECORDS = [
+    ("test{}".format(i), {"id": i, "text": "test " * (i % 50)}) for i in range(100)
+]
+
+
+@pytest.mark.parametrize("compressor", [None, zlib] + list(COMPRESSOR_MAPPING))
+def test_put_get_and_delete(compressor):
+    storage_backend = CompressedMemoryStorage(compressor=compressor)
+    storage_backend.open()
+
+    storage_backend.set_many(TEST_RECORDS[:50])
+    for key, value in TEST_RECORDS[50:]:
+        storage_backend[key] = value
+
+    for key, value in TEST_RECORDS:
+        assert_equal(value, storage_backend[key])
+    assert_equal(dict(TEST_RECORDS), storage_backend.get_many(dict(TEST_RECORDS)))
+
+    for key, _ in TEST_RECORDS[::2]:
+        del storage_backend[key]
+    assert_equal([False, True] * 50, storage_backend.contains_many(dict(TEST_RECORDS)))
+
+    storage_backend.close()
+
+
+def test_threshold():
+    storage_backend = CompressedMemoryStorage(threshold=64)
+    storage_backend.open()
+
+    storage_backend["small"] = "test"
+    storage_backend["large"] = "test" * 100
+
+    assert_equal(b"\x00", storage_backend.kv_store["small"][:1])
+    assert_equal(b"\x01", storage_backend.kv_store["large"][:1])
+    assert storage_backend.stored_bytes() < 100
+    assert_equal("test" * 100, storage_backend["large"])
+
+    storage_backend.close()
+
+
+def test_iter():
+    storage_backend = CompressedMemoryStorage()
+    storage_backend.open()
+
+    storage_backend.set_many(TEST_RECORDS)
+    del storage_backend[TEST_RECORDS[0][0]]
+
+    assert_equal([key for key, _ in TEST_RECORDS[1:]], list(storage_backend))
+
+    storage_backend.close()
+
+
+@pytest.mark.parametrize("cache_policy", ["lru", "array_lru", "clock"])
+def test_memory_tier(tmp_path, cache_policy):
+    key, value = ("TEST{0}", "TSET{0}" * 20)
+
+    with RoomDict(
+        ["lru", cache_policy, "none"],
+        ["none", "none", "none"],
+        ["memory", "compressed_memory", "disk"],
+        [{"max_size": 10}, {"max_size": 40}],
+        storage_backends_kwargs=[{}, {}, {"directory": str(tmp_path / "disk")}],
+    ) as cache:
+        for i in range(NUM_RECORDS):
+            cache[key.format(i)] = value.format(i)
+
+        # The cache stores plain values, so they are compressed.
+        assert_equal(40, len(cache.storage_backends[1].kv_store))
+        for i in range(50, 90):
+            assert_equal(value.format(i), cache.storage_backends[1][key.format(i)])
+        for i in range(NUM_RECORDS):
+            assert_equal(value.format(i), cache[key.format(i)])
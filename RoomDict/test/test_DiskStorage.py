@@ -0,0 +1,121 @@
+import os
+
+import pytest
+
+from RoomDict.storage_backends import DiskStorage
+
+from RoomDict.test.utils import assert_equal
+
+TEST_RECORDS = [("test{}".format(i), i) for i in range(10)]
+
+
+@pytest.fixture
+def disk_storage(tmp_path):
+    storage_backend = DiskStorage(directory=str(tmp_path / "disk"))
+    storage_backend.open()
+
+    yield storage_backend
+
+    storage_backend.close()
+
+
+def test_put_and_get(disk_storage):
+    for key, value in TEST_RECORDS:
+        disk_storage[key] = value
+
+    for key, value in TEST_RECORDS:
+        assert key in disk_storage
+        assert_equal(value, disk_storage[key])
+
+
+def test_delete(disk_storage):
+    for key, value in TEST_RECORDS:
+        disk_storage[key] = value
+
+    for key, _ in TEST_RECORDS:
+        del disk_storage[key]
+        assert key not in disk_storage
+
+
+def test_iter(disk_storage):
+    disk_storage.set_many(TEST_RECORDS)
+
+    assert_equal(sorted(key for key, _ in TEST_RECORDS), sorted(disk_storage))
+
+
+def test_overwrite_keeps_size(disk_storage):
+    disk_storage.set_many(TEST_RECORDS)
+    disk_storage.set_many(TEST_RECORDS)
+    for key, value in TEST_RECORDS:
+        disk_storage[key] = value
+
+    assert_equal(len(TEST_RECORDS), len(disk_storage))
+
+
+def test_handle_kept_open(disk_storage):
+    kv_store = disk_storage.kv_store
+
+    for key, value in TEST_RECORDS:
+        disk_storage[key] = value
+        assert disk_storage.kv_store is kv_store
+
+
+def test_sync_every(tmp_path):
+    storage_backend = DiskStorage(directory=str(tmp_path / "disk"), sync_every=3)
+    storage_backend.open()
+
+    for i, (key, value) in enumerate(TEST_RECORDS):
+        storage_backend[key] = value
+        assert_equal((i + 1) % 3, storage_backend.unsynced_writes)
+
+    storage_backend.close()
+
+
+def test_sync_interval(tmp_path):
+    storage_backend = DiskStorage(directory=str(tmp_path / "disk"), sync_interval=0)
+    storage_backend.open()
+
+    for key, value in TEST_RECORDS:
+        storage_backend[key] = value
+        assert_equal(0, storage_backend.unsynced_writes)
+
+    storage_backend.close()
+
+
+def test_close_removes_files(tmp_path):
+    directory = str(tmp_path / "disk")
+    storage_backend = DiskStorage(directory=directory)
+    storage_backend.open()
+
+    for key, value in TEST_RECORDS:
+        storage_backend[key] = value
+
+    storage_backend.close()
+
+    assert not os.path.exists(directory)
+
+
+def test_close_keeps_other_files(tmp_path):
+    directory = tmp_path / "disk"
+    directory.mkdir()
+    storage_backend = DiskStorage(directory=str(directory))
+    storage_backend.open()
+
+    # Files that only share the database's name are not the database's.
+    other_path = storage_backend.path + ".backup"
+    with open(other_path, "w") as other_file:
+        other_file.write("kept")
+
+    storage_backend[TEST_RECORDS[0][0]] = TEST_RECORDS[0][1]
+    storage_backend.close()
+
+    assert_equal([os.path.basename(other_path)], os.listdir(directory))
+
+
+@pytest.mark.xfail
+def test_closed_access(tmp_path):
+    storage_backend = DiskStorage(directory=str(tmp_path / "disk"))
+    storage_backend.open()
+    storage_backend.close()
+
+    storage_backend["test"] = 0
@@ -0,0 +1,37 @@
+import pytest
+
+from RoomDict.HyperLogLog import HyperLogLog
+
+from RoomDict.test.utils import assert_equal
+
+
+@pytest.mark.parametrize("num_keys", [0, 10, 1000, 50000])
+def test_estimate(num_keys):
+    sketch = HyperLogLog()
+    sketch.add_many("key{}".format(i) for i in range(num_keys))
+
+    assert abs(sketch.estimate() - num_keys) <= 0.03 * num_keys + 1
+
+
+def test_duplicates():
+    sketch = HyperLogLog(precision=10)
+    for _ in range(5):
+        sketch.add_many("key{}".format(i) for i in range(500))
+
+    assert abs(len(sketch) - 500) <= 25
+
+
+def test_merge():
+    left, right = HyperLogLog(), HyperLogLog()
+    left.add_many("key{}".format(i) for i in range(3000))
+    right.add_many("key{}".format(i) for i in range(2000, 5000))
+
+    union = HyperLogLog()
+    union.add_many("key{}".format(i) for i in range(5000))
+
+    left.merge(right)
+    assert_equal(union.registers, left.registers)
+    assert_equal(union.estimate(), left.estimate())
+
+    left.clear()
+    assert_equal(0, len(left))
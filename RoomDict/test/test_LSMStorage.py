@@ -0,0 +1,169 @@
+import os
+import random
+
+import pytest
+
+from RoomDict import RoomDict
+from RoomDict.storage_backends import LSMStorage
+from RoomDict.storage_backends.LSMTree import LSMTree, Segment
+
+from RoomDict.test.utils import assert_equal
+
+NUM_RECORDS = 500
+
+
+@pytest.fixture(params=[False, True], ids=["inline", "background"])
+def lsm_storage(request, tmp_path):
+    storage_backend = LSMStorage(
+        directory=str(tmp_path / "lsm"),
+        memtable_size=16,
+        block_size=4,
+        min_merge=3,
+        background_compaction=request.param,
+    )
+    storage_backend.open()
+
+    yield storage_backend
+
+    storage_backend.close()
+
+
+def test_put_get_and_delete(lsm_storage):
+    rng = random.Random(0)
+    expected = {}
+
+    for i in range(10 * NUM_RECORDS):
+        key = "test{}".format(rng.randrange(NUM_RECORDS))
+        if rng.random() < 0.3 and key in expected:
+            del lsm_storage[key]
+            del expected[key]
+        else:
+            lsm_storage[key] = i
+            expected[key] = i
+
+    for i in range(NUM_RECORDS):
+        key = "test{}".format(i)
+        assert_equal(key in expected, key in lsm_storage)
+        if key in expected:
+            assert_equal(expected[key], lsm_storage[key])
+
+    assert_equal(sorted(expected), list(lsm_storage))
+
+
+def test_compaction(tmp_path):
+    storage_backend = LSMStorage(
+        directory=str(tmp_path / "lsm"),
+        memtable_size=10,
+        min_merge=4,
+        background_compaction=False,
+    )
+    storage_backend.open()
+    lsm_tree = storage_backend.kv_store
+
+    for i in range(40):
+        storage_backend["test{}".format(i % 10)] = i
+    assert_equal(1, len(lsm_tree.segments))
+
+    # Overwritten records were merged away.
+    assert_equal(10, len(lsm_tree.segments[0]))
+
+    storage_backend.delete_many("test{}".format(i) for i in range(10))
+    storage_backend.flush()
+    assert_equal([], list(storage_backend))
+
+    storage_backend.close()
+
+
+class Crash(Exception):
+    pass
+
+
+@pytest.mark.parametrize("crash_at", ["manifest", "remove"])
+def test_interrupted_compaction(tmp_path, monkeypatch, crash_at):
+    def make_storage():
+        return LSMStorage(
+            directory=str(tmp_path / "lsm"),
+            memtable_size=10,
+            min_merge=4,
+            background_compaction=False,
+            persistent=True,
+        )
+
+    def crash(*args):
+        raise Crash()
+
+    storage_backend = make_storage()
+    storage_backend.open()
+
+    # The first segment holds records the second deletes, and merging all
+    # four drops the tombstones.
+    storage_backend.set_many(("test{}".format(i), i) for i in range(10))
+    storage_backend.delete_many("test{}".format(i) for i in range(5))
+    storage_backend.set_many(("test{}".format(i), i) for i in range(10, 25))
+
+    if crash_at == "manifest":
+        # Before the merged segment replaces its newest input.
+        monkeypatch.setattr(LSMTree, "_write_manifest", crash)
+    else:
+        # After it replaced it, before the other inputs are removed.
+        monkeypatch.setattr(Segment, "remove", crash)
+    with pytest.raises(Crash):
+        storage_backend.set_many(("test{}".format(i), i) for i in range(25, 35))
+    monkeypatch.undo()
+
+    storage_backend = make_storage()
+    storage_backend.open()
+    assert_equal(
+        sorted("test{}".format(i) for i in range(5, 35)), list(storage_backend)
+    )
+    storage_backend.persistent = False
+    storage_backend.close()
+
+
+def test_lookup_reads_one_block(lsm_storage):
+    for i in range(NUM_RECORDS):
+        lsm_storage["test{}".format(i)] = i
+    lsm_storage.flush()
+
+    # Keep compaction from replacing the segment while it is inspected.
+    with lsm_storage.kv_store.compaction_lock:
+        segment = lsm_storage.kv_store.segments[-1]
+        key = segment.first_keys[len(segment.first_keys) // 2]
+        expected = segment.get(key)[2]
+
+        reads = []
+        read_block = segment._read_block
+        segment._read_block = lambda index: reads.append(index) or read_block(index)
+
+        assert_equal(expected, lsm_storage.kv_store[key])
+        assert_equal(1, len(reads))
+
+
+def test_close_removes_files(tmp_path):
+    directory = str(tmp_path / "lsm")
+    storage_backend = LSMStorage(directory=directory, memtable_size=4)
+    storage_backend.open()
+
+    for i in range(20):
+        storage_backend["test{}".format(i)] = i
+
+    storage_backend.close()
+
+    assert not os.path.exists(directory)
+
+
+def test_cold_tier(tmp_path):
+    key, value = ("TEST{}", "TSET{}")
+
+    with RoomDict(
+        ["lru", "none"],
+        ["none", "none"],
+        ["memory", "lsm"],
+        [{"max_size": 10}],
+        storage_backends_kwargs=[{}, {"directory": str(tmp_path / "lsm")}],
+    ) as cache:
+        for i in range(NUM_RECORDS):
+            cache[key.format(i)] = value.format(i)
+
+        for i in range(NUM_RECORDS):
+            assert_equal(value.format(i), cache[key.format(i)])
@@ -0,0 +1,189 @@
+import pytest
+
+from RoomDict import RoomDict
+from RoomDict.caches import LRUCache
+from RoomDict.membership_tests import (
+    CountingBloomMembership,
+    CuckooMembership,
+    NumpyBloomMembership,
+)
+from RoomDict.storage_backends import MemoryStorage
+
+from RoomDict.test.utils import assert_equal
+
+NUM_KEYS = 1000
+MEMBERSHIP_TESTS = [
+    lambda: CountingBloomMembership(NUM_KEYS, 0.01),
+    lambda: CuckooMembership(NUM_KEYS),
+]
+
+
+@pytest.fixture(params=MEMBERSHIP_TESTS, ids=["counting_bloom", "cuckoo"])
+def membership_test(request):
+    return request.param()
+
+
+def false_positives(membership_test, keys):
+    return sum(1 for key in keys if key in membership_test)
+
+
+def test_add_and_remove(membership_test):
+    keys = ["test{}".format(i) for i in range(NUM_KEYS)]
+    for key in keys:
+        membership_test.add(key)
+
+    for key in keys:
+        assert key in membership_test
+
+    for key in keys[::2]:
+        membership_test.remove(key)
+
+    # Remaining keys are never lost, removed ones are mostly forgotten.
+    for key in keys[1::2]:
+        assert key in membership_test
+    assert false_positives(membership_test, keys[::2]) < NUM_KEYS // 20
+
+
+def test_churn(membership_test):
+    # Many more keys than the filter is sized for pass through it.
+    for i in range(10 * NUM_KEYS):
+        membership_test.add("test{}".format(i))
+        if i >= NUM_KEYS // 2:
+            membership_test.remove("test{}".format(i - NUM_KEYS // 2))
+
+    unseen = ["BAD_KEY{}".format(i) for i in range(NUM_KEYS)]
+    assert false_positives(membership_test, unseen) < NUM_KEYS // 20
+
+
+def test_overfull_cuckoo_has_no_false_negatives():
+    membership_test = CuckooMembership(16, bucket_size=2, max_kicks=10)
+
+    keys = ["test{}".format(i) for i in range(200)]
+    for key in keys:
+        membership_test.add(key)
+
+    assert len(membership_test.stash) > 0
+    for key in keys:
+        assert key in membership_test
+
+
+def test_cache_forgets_evicted_keys(membership_test):
+    storage_backend = MemoryStorage()
+    storage_backend.open()
+
+    cache = LRUCache(membership_test, storage_backend, 10)
+    for i in range(NUM_KEYS):
+        cache.put("test{}".format(i), i)
+        cache.put("test{}".format(i), i)
+
+    evicted = ["test{}".format(i) for i in range(NUM_KEYS - 10)]
+    assert false_positives(membership_test, evicted) < NUM_KEYS // 20
+
+    storage_backend.close()
+
+
+@pytest.mark.parametrize("membership_test", ["counting_bloom", "cuckoo"])
+def test_room_dict_deletes(membership_test):
+    key, value = ("TEST{}", "TSET{}")
+    membership_tests_kwargs = [{}, {"max_size": 100}]
+    if membership_test == "counting_bloom":
+        membership_tests_kwargs[1]["error_rate"] = 0.01
+
+    with RoomDict(
+        ["lru", "none"],
+        ["none", membership_test],
+        ["memory", "memory"],
+        [{"max_size": 10}],
+        membership_tests_kwargs,
+    ) as cache:
+        for i in range(NUM_KEYS):
+            cache[key.format(i)] = value.format(i)
+            if i >= 50:
+                del cache[key.format(i - 50)]
+
+        lower_membership_test = cache.caches[1].membership_test
+        deleted = [key.format(i) for i in range(NUM_KEYS - 50)]
+        assert false_positives(lower_membership_test, deleted) < NUM_KEYS // 20
+
+        for i in range(NUM_KEYS - 50, NUM_KEYS):
+            assert_equal(value.format(i), cache[key.format(i)])
+
+
+def test_numpy_bloom_batches():
+    membership_test = NumpyBloomMembership(NUM_KEYS, 0.01)
+
+    keys = ["test{}".format(i) for i in range(NUM_KEYS)]
+    membership_test.add_many(keys[: NUM_KEYS // 2])
+    for key in keys[NUM_KEYS // 2 :]:
+        membership_test.add(key)
+
+    assert_equal([True] * NUM_KEYS, membership_test.contains_many(keys))
+    assert_equal([], membership_test.contains_many([]))
+
+    unseen = ["BAD_KEY{}".format(i) for i in range(NUM_KEYS)]
+    assert false_positives(membership_test, unseen) < NUM_KEYS // 20
+
+
+def test_numpy_bloom_persistence(tmp_path):
+    keys = ["test{}".format(i) for i in range(NUM_KEYS)]
+
+    path = str(tmp_path / "bloom.npy")
+    membership_test = NumpyBloomMembership(NUM_KEYS, 0.01, path)
+    assert_equal(False, membership_test.is_loaded)
+    membership_test.add_many(keys)
+    membership_test.close()
+
+    reopened = NumpyBloomMembership(NUM_KEYS, 0.01, path)
+    assert_equal(True, reopened.is_loaded)
+    assert_equal([True] * NUM_KEYS, reopened.contains_many(keys))
+
+    saved_path = str(tmp_path / "saved.npy")
+    reopened.save(saved_path)
+    loaded = NumpyBloomMembership.load(saved_path, NUM_KEYS, 0.01)
+    assert_equal(True, loaded.is_loaded)
+    assert_equal([True] * NUM_KEYS, loaded.contains_many(keys))
+
+    with pytest.raises(AssertionError):
+        NumpyBloomMembership(10 * NUM_KEYS, 0.01, path)
+
+
+def test_loaded_numpy_bloom_is_not_refilled(tmp_path, monkeypatch):
+    key, value = ("TEST{}", "TSET{}")
+    added = []
+    add_many = NumpyBloomMembership.add_many
+
+    def counting_add_many(self, keys):
+        keys = list(keys)
+        added.append(keys)
+        add_many(self, keys)
+
+    monkeypatch.setattr(NumpyBloomMembership, "add_many", counting_add_many)
+
+    def make_cache(bloom_path):
+        return RoomDict(
+            ["none"],
+            ["numpy_bloom"],
+            ["sqlite"],
+            membership_tests_kwargs=[
+                {"max_size": 100, "error_rate": 0.01, "path": bloom_path}
+            ],
+            storage_backends_kwargs=[{"directory": str(tmp_path), "persistent": True}],
+        )
+
+    bloom_path = str(tmp_path / "bloom.npy")
+    with make_cache(bloom_path) as cache:
+        for i in range(10):
+            cache[key.format(i)] = value.format(i)
+
+    # The filter is loaded from its file, so the keys are not hashed again.
+    del added[:]
+    with make_cache(bloom_path) as cache:
+        assert_equal([], added)
+        for i in range(10):
+            assert_equal(value.format(i), cache[key.format(i)])
+
+    # A filter without its file is refilled from the storage.
+    with make_cache(str(tmp_path / "other.npy")) as cache:
+        assert_equal([sorted(key.format(i) for i in range(10))], [sorted(added[0])])
+        for i in range(10):
+            assert_equal(value.format(i), cache[key.format(i)])
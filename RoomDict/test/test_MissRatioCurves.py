@@ -0,0 +1,89 @@
+import pytest
+
+from RoomDict.benchmarks import (
+    WORKLOAD_MAPPING,
+    expected_latency,
+    miss_ratio_curves,
+    recommend_kwargs,
+    write_trace,
+)
+from RoomDict.benchmarks.__main__ import main
+from RoomDict.benchmarks.mrc import lru_curve, simulated_curve
+
+from RoomDict.test.utils import assert_equal
+
+SIZES = [1, 10, 50, 100, 500]
+
+
+def zipf_keys(num_ops=5000, num_keys=1000):
+    return [key for _, key in WORKLOAD_MAPPING["zipf"](num_ops, num_keys)]
+
+
+def test_lru_curve():
+    keys = zipf_keys()
+
+    # Stack distances give what simulating LRUCache at every size gives.
+    curve = lru_curve(keys, sample_rate=1)
+    simulated = simulated_curve(keys, "lru", SIZES, sample_rate=1)
+    for size in SIZES:
+        assert_equal(
+            pytest.approx(simulated.miss_ratio(size)), curve.miss_ratio(size)
+        )
+
+    assert_equal(1.0, curve.miss_ratio(0))
+    assert_equal(pytest.approx(len(set(keys)) / len(keys)), curve.miss_ratio(10 ** 6))
+
+
+def test_sampled_curves():
+    keys = zipf_keys(50000, 5000)
+
+    exact = miss_ratio_curves(keys, ["lru", "s3fifo"], SIZES, sample_rate=1)
+    sampled = miss_ratio_curves(keys, ["lru", "s3fifo"], SIZES, sample_rate=0.2)
+    for cache_policy in ["lru", "s3fifo"]:
+        for size in [100, 500]:
+            assert exact[cache_policy].miss_ratio(size) == pytest.approx(
+                sampled[cache_policy].miss_ratio(size), abs=0.05
+            )
+
+
+def test_recommend_kwargs():
+    # Looping over 100 keys only hits once they all fit.
+    keys = [key for _, key in WORKLOAD_MAPPING["scan_loop"](5000, 100)]
+    curves = miss_ratio_curves(keys, ["lru", "none"])
+
+    assert_equal(1.0, curves["lru"].miss_ratio(99))
+    assert_equal(pytest.approx(100 / 5000), curves["lru"].miss_ratio(100))
+    assert_equal(
+        0.98 * 1e-3 + 0.02 * 1e-2,
+        pytest.approx(
+            expected_latency(curves, ["lru", "none"], [99, None], [1e-7, 1e-3], 1e-2)
+        ),
+    )
+
+    kwargs = recommend_kwargs(
+        curves, ["lru", "none"], [1e-7, 1e-3], [1000, None], sizes=SIZES + [100]
+    )
+    assert_equal([{"max_size": 100}, {}], kwargs)
+
+    # Nothing is gained from a second tier once the first holds the loop.
+    kwargs = recommend_kwargs(
+        curves,
+        ["lru", "lru", "none"],
+        [1e-7, 1e-5, 1e-3],
+        [500, 500, None],
+        sizes=SIZES + [100],
+    )
+    assert_equal([{"max_size": 100}, {"max_size": 1}, {}], kwargs)
+
+
+def test_main(tmp_path, capsys):
+    path = str(tmp_path / "trace")
+    write_trace(path, WORKLOAD_MAPPING["scan_loop"](5000, 100))
+
+    arguments = ["mrc", path, "--cache-policies", "lru,none"]
+    assert_equal(0, main(arguments))
+    assert capsys.readouterr().out.startswith("lru ")
+
+    arguments += ["--latencies", "1e-7,1e-3", "--max-sizes", "100,none"]
+    assert_equal(0, main(arguments))
+    assert capsys.readouterr().out.endswith('[{"max_size": 100}, {}]\n')
@@ -1,3 +1,10 @@
+import os
+import random
+import sys
+import threading
+
+import pytest
+
 from RoomDict.RoomDict import RoomDict
 
 from RoomDict.test.utils import assert_equal
@@ -50,3 +57,825 @@ def test_put_and_get_with_eviction():
             else:
                 expected_eviction = (key.format(i - 5), value.format(i - 5))
                 assert_equal(expected_eviction, evicted)
+
+
+@pytest.mark.parametrize("thread_safe", [False, True])
+def test_lowest_tier_evictions(thread_safe):
+    key = "TEST{}"
+
+    with RoomDict(
+        ["lru", "lru"],
+        ["none", "none"],
+        ["memory", "memory"],
+        [{"max_size": 2}, {"max_size": 2}],
+        thread_safe=thread_safe,
+    ) as cache:
+        for i in range(4):
+            assert_equal(None, cache.__setitem__(key.format(i), i))
+
+        # Records evicted from the lowest tier are returned in both modes.
+        assert_equal((key.format(0), 0), cache.__setitem__(key.format(4), 4))
+        assert_equal(
+            [(key.format(1), 1), (key.format(2), 2)],
+            cache.set_many([(key.format(i), i) for i in range(5, 7)]),
+        )
+
+
+def test_batch_operations():
+    key, value = ("TEST{}", "TSET{}")
+    cache_policies = ["lru", "none"]
+    cache_kwargs = [{"max_size": 5}]
+    membership_tests = ["none", "bloom"]
+    membership_test_kwargs = [{}, {"max_size": 20, "error_rate": 0.01}]
+    storage_backends = ["memory", "memory"]
+
+    records = [(key.format(i), value.format(i)) for i in range(10)]
+    keys = [record_key for record_key, _ in records]
+
+    with RoomDict(
+        cache_policies,
+        membership_tests,
+        storage_backends,
+        cache_kwargs,
+        membership_test_kwargs,
+    ) as cache:
+        evicted = cache.set_many(records)
+        assert_equal([], evicted)
+
+        # The first records were evicted into the second tier.
+        assert_equal(5, len(cache.caches[0]))
+        assert_equal([True] * 5, cache.caches[1].contains_many(keys[:5]))
+
+        assert_equal(dict(records), cache.get_many(keys + ["BAD_KEY"]))
+        assert_equal([True] * 10 + [False], cache.contains_many(keys + ["BAD_KEY"]))
+
+        cache.delete_many(keys[:5] + ["BAD_KEY"])
+        assert_equal([False] * 5 + [True] * 5, cache.contains_many(keys))
+        assert_equal(dict(records[5:]), cache.get_many(keys))
+
+
+def test_write_behind():
+    key, value = ("TEST{}", "TSET{}")
+    cache_policies = ["lru", "none"]
+    cache_kwargs = [{"max_size": 2}]
+    membership_tests = ["none", "none"]
+    storage_backends = ["memory", "arbitrary"]
+    storage_kwargs = [{}, {"delay": 0.001}]
+
+    with RoomDict(
+        cache_policies,
+        membership_tests,
+        storage_backends,
+        cache_kwargs,
+        storage_backends_kwargs=storage_kwargs,
+        write_behind=True,
+        write_behind_kwargs={"max_size": 4, "batch_size": 2},
+    ) as cache:
+        for i in range(20):
+            evicted = cache.__setitem__(key.format(i), value.format(i))
+            assert_equal(None, evicted)
+
+        # Evicted records are readable whether or not they were written yet.
+        for i in range(20):
+            assert key.format(i) in cache
+
+        assert cache.flush(timeout=10)
+        assert_equal(0, len(cache.demotion_buffer))
+
+        for i in range(20):
+            assert_equal(value.format(i), cache[key.format(i)])
+
+        del cache[key.format(0)]
+        assert key.format(0) not in cache
+
+        lower_storage = cache.storage_backends[1]
+        cache.set_many((key.format(i), value.format(i)) for i in range(20, 30))
+
+    assert_equal(0, len(cache.demotion_buffer))
+    assert_equal(False, lower_storage.valid)
+
+
+def test_max_bytes_cascade():
+    key = "TEST{}"
+    cache_policies = ["lru", "none"]
+    cache_kwargs = [{"max_bytes": 40, "sizer": len}]
+    membership_tests = ["none", "none"]
+    storage_backends = ["memory", "memory"]
+
+    with RoomDict(
+        cache_policies, membership_tests, storage_backends, cache_kwargs
+    ) as cache:
+        for i in range(4):
+            cache[key.format(i)] = "x" * 10
+
+        # Every record evicted by the large value reaches the second tier.
+        cache["large"] = "x" * 35
+        assert_equal(1, len(cache.caches[0]))
+        for i in range(4):
+            assert_equal("x" * 10, cache.caches[1].get(key.format(i)))
+        assert_equal("x" * 35, cache["large"])
+
+
+def test_max_bytes_evictions():
+    key = "TEST{}"
+
+    with RoomDict(
+        ["lru"], ["none"], ["memory"], [{"max_bytes": 40, "sizer": len}]
+    ) as cache:
+        for i in range(4):
+            assert_equal(None, cache.set(key.format(i), "x" * 10))
+
+        # __setitem__ returns a single record, set_many every evicted one.
+        assert_equal((key.format(0), "x" * 10), cache.__setitem__("large", "x" * 25))
+        assert_equal(
+            [(key.format(3), "x" * 10), ("large", "x" * 25)],
+            cache.set_many([("larger", "x" * 35)]),
+        )
+
+
+def test_ttl():
+    key, value = ("TEST{}", "TSET{}")
+    now = [0.0]
+    cache_policies = ["lru", "none"]
+    cache_kwargs = [{"max_size": 2}]
+    membership_tests = ["none", "none"]
+    storage_backends = ["memory", "memory"]
+
+    with RoomDict(
+        cache_policies,
+        membership_tests,
+        storage_backends,
+        cache_kwargs,
+        ttls=[None, 5],
+        ttl_kwargs={"resolution": 1, "clock": lambda: now[0]},
+    ) as cache:
+        cache.set(key.format(0), value.format(0), ttl=10)
+        cache.set(key.format(1), value.format(1), ttl=1)
+        cache[key.format(2)] = value.format(2)
+
+        # Demoted to the second tier, which caps its ttl at 5 seconds.
+        assert_equal(5, cache.timer_wheel.deadline(key.format(0)))
+
+        now[0] = 2
+        assert key.format(1) not in cache
+        assert_equal(None, cache[key.format(1)])
+        assert_equal(value.format(0), cache[key.format(0)])
+
+        # Expired records are reclaimed instead of demoted.
+        now[0] = 6
+        cache[key.format(3)] = value.format(3)
+        cache[key.format(4)] = value.format(4)
+        assert_equal(False, key.format(0) in cache.caches[1])
+        assert_equal(
+            {key.format(i): value.format(i) for i in range(2, 5)},
+            cache.get_many(key.format(i) for i in range(5)),
+        )
+
+        # Records without a ttl only expire once demoted to the second tier.
+        now[0] = 1000
+        cache[key.format(5)] = value.format(5)
+        assert_equal(None, cache.timer_wheel.deadline(key.format(5)))
+        assert_equal(value.format(5), cache[key.format(5)])
+        assert_equal(
+            [False] * 4 + [True], cache.contains_many(key.format(i) for i in range(5))
+        )
+
+
+@pytest.mark.parametrize(
+    "cache_policy", ["lru", "array_lru", "clock", "arc", "2q", "s3fifo"]
+)
+@pytest.mark.parametrize("storage_backend", ["disk", "lsm", "bitcask", "sqlite"])
+def test_warm_restart(tmp_path, cache_policy, storage_backend):
+    key, value = ("TEST{}", "TSET{}")
+    num_records = 100
+    snapshot_path = str(tmp_path / "snapshot")
+
+    def make_cache():
+        return RoomDict(
+            [cache_policy, "lru", "none"],
+            ["none", "counting_bloom", "numpy_bloom"],
+            ["memory", "compressed_memory", storage_backend],
+            [{"max_size": 10}, {"max_size": 20}],
+            [
+                {},
+                {"max_size": 100, "error_rate": 0.01},
+                {
+                    "max_size": 100,
+                    "error_rate": 0.01,
+                    "path": str(tmp_path / "bloom.npy"),
+                },
+            ],
+            [{}, {}, {"directory": str(tmp_path / "cold"), "persistent": True}],
+            snapshot_path=snapshot_path,
+        )
+
+    with make_cache() as cache:
+        for i in range(num_records):
+            cache.set(key.format(i), value.format(i), ttl=None if i % 2 else 1000)
+        for i in range(0, num_records, 7):
+            cache[key.format(i)]
+
+        tiers = [list(tier) for tier in cache.caches[:2]]
+
+    assert os.path.exists(snapshot_path)
+
+    with make_cache() as cache:
+        assert not os.path.exists(snapshot_path)
+
+        # Restored with the same contents and order in every tier.
+        assert_equal(tiers, [list(tier) for tier in cache.caches[:2]])
+        for i in range(num_records):
+            assert_equal(value.format(i), cache[key.format(i)])
+        assert cache.timer_wheel.deadline(key.format(0)) is not None
+        assert_equal(None, cache.timer_wheel.deadline(key.format(1)))
+
+
+def test_warm_restart_other_tiers(tmp_path):
+    snapshot_path = str(tmp_path / "snapshot")
+
+    with RoomDict(
+        ["lru"], ["none"], ["memory"], [{"max_size": 10}], snapshot_path=snapshot_path
+    ) as cache:
+        cache["TEST"] = "TSET"
+
+    # A snapshot is not restored into tiers of another size.
+    with pytest.raises(AssertionError):
+        with RoomDict(
+            ["lru"],
+            ["none"],
+            ["memory"],
+            [{"max_size": 20}],
+            snapshot_path=snapshot_path,
+        ):
+            pass
+
+
+def test_persistent_cold_tier(tmp_path):
+    key, value = ("TEST{}", "TSET{}")
+
+    def make_cache():
+        return RoomDict(
+            ["none"],
+            ["counting_bloom"],
+            ["sqlite"],
+            membership_tests_kwargs=[{"max_size": 100, "error_rate": 0.01}],
+            storage_backends_kwargs=[{"directory": str(tmp_path), "persistent": True}],
+        )
+
+    with make_cache() as cache:
+        for i in range(10):
+            cache[key.format(i)] = value.format(i)
+
+    # Without a snapshot the membership test is rebuilt from the storage.
+    with make_cache() as cache:
+        for i in range(10):
+            assert_equal(value.format(i), cache[key.format(i)])
+
+
+@pytest.mark.parametrize(
+    "promotion_policy, promotion_policy_kwargs, promoted_on",
+    [
+        ("always", {}, 1),
+        ("nth_access", {"n": 3}, 3),
+        ("probabilistic", {"probability": 1}, 1),
+        ("never", {}, None),
+    ],
+)
+def test_promotion_policy(promotion_policy, promotion_policy_kwargs, promoted_on):
+    key, value = ("TEST{}", "TSET{}")
+
+    with RoomDict(
+        ["lru", "none"],
+        ["none", "none"],
+        ["memory", "memory"],
+        [{"max_size": 2}],
+        promotion_policy=promotion_policy,
+        promotion_policy_kwargs=promotion_policy_kwargs,
+    ) as cache:
+        for i in range(5):
+            cache[key.format(i)] = value.format(i)
+
+        for access in range(1, 5):
+            assert_equal(value.format(0), cache[key.format(0)])
+            assert_equal(
+                {key.format(1): value.format(1)}, cache.get_many([key.format(1)])
+            )
+
+            is_promoted = promoted_on is not None and access >= promoted_on
+            for i in range(2):
+                assert_equal(is_promoted, key.format(i) in cache.caches[0])
+                assert_equal(not is_promoted, key.format(i) in cache.caches[1])
+
+
+def test_inclusive():
+    key, value = ("TEST{}", "TSET{}")
+
+    with RoomDict(
+        ["lru", "lru", "none"],
+        ["none", "none", "none"],
+        ["memory", "memory", "memory"],
+        [{"max_size": 2}, {"max_size": 2}],
+        inclusive=True,
+    ) as cache:
+        for i in range(6):
+            cache[key.format(i)] = value.format(i)
+
+        # A promoted record stays in its tier.
+        assert_equal(value.format(2), cache[key.format(2)])
+        assert key.format(2) in cache.caches[0]
+        assert key.format(2) in cache.caches[1]
+
+        # Evicting the copy does not write it again.
+        assert_equal(value.format(5), cache[key.format(5)])
+        tiers = (list(cache.caches[1]), dict(cache.storage_backends[2].kv_store))
+        cache[key.format(6)] = value.format(6)
+        assert key.format(2) not in cache.caches[0]
+        assert_equal(
+            tiers, (list(cache.caches[1]), dict(cache.storage_backends[2].kv_store))
+        )
+
+        # Sets replace every copy.
+        cache[key.format(2)] = value.format(8)
+        assert key.format(2) not in cache.caches[1]
+        assert_equal(value.format(8), cache[key.format(2)])
+
+
+def test_stats():
+    key, value = ("TEST{}", "TSET{}")
+    exported = []
+
+    with RoomDict(
+        ["lru", "lru", "none"],
+        ["none", "none", "none"],
+        ["memory", "memory", "memory"],
+        [{"max_size": 2}, {"max_size": 2}],
+        collect_stats=True,
+        stats_kwargs={"exporter": exported.append},
+    ) as cache:
+        for i in range(6):
+            cache[key.format(i)] = value.format(i)
+
+        # A hit in each of the first and last tier, then a miss everywhere.
+        assert_equal(value.format(5), cache[key.format(5)])
+        assert_equal(value.format(0), cache[key.format(0)])
+        assert_equal(None, cache["missing"])
+        assert_equal(
+            {key.format(0): value.format(0), key.format(3): value.format(3)},
+            cache.get_many([key.format(0), key.format(3)]),
+        )
+
+        stats = cache.stats()
+        assert_equal(
+            [
+                {
+                    "hits": 2,
+                    "misses": 3,
+                    "puts": 8,
+                    "evictions": 6,
+                    "promotions": 0,
+                    "filter_true_positives": 2,
+                    "filter_false_positives": 3,
+                },
+                {
+                    "hits": 1,
+                    "misses": 2,
+                    "puts": 6,
+                    "evictions": 3,
+                    "promotions": 1,
+                    "filter_true_positives": 1,
+                    "filter_false_positives": 2,
+                },
+                {
+                    "hits": 1,
+                    "misses": 1,
+                    "puts": 3,
+                    "evictions": 0,
+                    "promotions": 1,
+                    "filter_true_positives": 1,
+                    "filter_false_positives": 1,
+                },
+            ],
+            stats["tiers"],
+        )
+        assert_equal(["get", "get_many", "set"], list(stats["latencies"]))
+        assert_equal(3, stats["latencies"]["get"]["count"])
+        assert_equal(6, stats["latencies"]["set"]["count"])
+        latency = stats["latencies"]["get"]
+        assert 0 <= latency["min"] <= latency["p50"] <= latency["p99"] <= latency["max"]
+
+    assert_equal(1, len(exported))
+    assert_equal(stats["tiers"], exported[0]["tiers"])
+
+
+def test_stats_disabled():
+    with RoomDict(
+        ["lru", "none"], ["none", "none"], ["memory", "memory"], [{"max_size": 2}]
+    ) as cache:
+        cache["TEST"] = "TSET"
+        assert cache.metrics is None
+        with pytest.raises(AssertionError):
+            cache.stats()
+
+
+def test_adaptive_sizes_grow():
+    key, value = ("TEST{}", "TSET{}")
+
+    with RoomDict(
+        ["lru", "none"],
+        ["none", "none"],
+        ["memory", "memory"],
+        [{"max_size": 4}],
+        adaptive_sizes=True,
+        adaptive_sizes_kwargs={"limits": [(1, 16)], "interval": 10, "step": 0.25},
+    ) as cache:
+        # Looping over more keys than fit misses every key just evicted.
+        for _ in range(20):
+            for i in range(10):
+                if cache[key.format(i)] is None:
+                    cache[key.format(i)] = value.format(i)
+
+        assert cache.caches[0].max_size >= 9
+
+        # Once large enough, the tier rarely shrinks below the loop again.
+        num_hits = cache.stats()["tiers"][0]["hits"]
+        for _ in range(20):
+            for i in range(10):
+                cache[key.format(i)]
+        assert cache.stats()["tiers"][0]["hits"] - num_hits >= 180
+
+
+def test_adaptive_sizes_shrink():
+    key, value = ("TEST{}", "TSET{}")
+
+    with RoomDict(
+        ["lru", "none"],
+        ["none", "none"],
+        ["memory", "memory"],
+        [{"max_size": 10}],
+        adaptive_sizes=True,
+        adaptive_sizes_kwargs={"limits": [(2, 10)], "interval": 10},
+    ) as cache:
+        for i in range(10):
+            cache[key.format(i)] = value.format(i)
+
+        # Two hot keys never miss, so the surplus is demoted, not dropped.
+        for _ in range(100):
+            assert_equal(value.format(0), cache[key.format(0)])
+            assert_equal(value.format(1), cache[key.format(1)])
+
+        assert_equal(2, cache.caches[0].max_size)
+        assert_equal(2, len(cache.caches[0]))
+        assert_equal(8, len(cache.storage_backends[1]))
+        assert_equal(
+            {key.format(i): value.format(i) for i in range(10)},
+            cache.get_many([key.format(i) for i in range(10)]),
+        )
+
+
+def test_adaptive_sizes_memory_limit():
+    key, value = ("TEST{}", "TSET{}")
+    rss = [0]
+
+    with RoomDict(
+        ["lru", "lru", "none"],
+        ["none", "none", "none"],
+        ["memory", "disk", "memory"],
+        [{"max_size": 8}, {"max_size": 8}],
+        adaptive_sizes=True,
+        adaptive_sizes_kwargs={
+            "limits": [(1, 16), (1, 16)],
+            "interval": 10,
+            "step": 0.25,
+            "memory_limit": 100,
+            "rss": lambda: rss[0],
+        },
+    ) as cache:
+        for i in range(12):
+            cache[key.format(i)] = value.format(i)
+
+        # Over the memory limit, the memory tier shrinks despite thrashing,
+        # while the disk tier grows to hold what it lets go.
+        rss[0] = 200
+        for _ in range(10):
+            for i in range(12):
+                if cache[key.format(i)] is None:
+                    cache[key.format(i)] = value.format(i)
+
+        assert_equal(1, cache.caches[0].max_size)
+        assert_equal(11, len(cache.caches[1]))
+        assert_equal(
+            {key.format(i): value.format(i) for i in range(12)},
+            cache.get_many([key.format(i) for i in range(12)]),
+        )
+
+
+@pytest.mark.parametrize("inclusive", [False, True])
+def test_items(tmp_path, inclusive):
+    key, value = ("TEST{}", "TSET{}")
+
+    with RoomDict(
+        ["lru", "lru", "none"],
+        ["none", "bloom", "none"],
+        ["memory", "memory", "disk"],
+        [{"max_size": 3}, {"max_size": 3}],
+        membership_tests_kwargs=[{}, {"max_size": 100, "error_rate": 0.01}],
+        storage_backends_kwargs=[{}, {}, {"directory": str(tmp_path)}],
+        inclusive=inclusive,
+        ttls=[None, None, 60],
+    ) as cache:
+        for i in range(10):
+            cache[key.format(i)] = value.format(i)
+        cache[key.format(0)]
+        cache.set(key.format(10), value.format(10), ttl=-1)
+
+        expected = {key.format(i): value.format(i) for i in range(10)}
+        # len reclaims the expired record, so it is not counted.
+        assert_equal(10, len(cache))
+        hot_keys = list(cache.caches[0].iter_keys())
+
+        # Streaming never promotes, so the tiers are left as they were.
+        assert_equal(expected, dict(cache.items(chunk_size=2)))
+        assert_equal(sorted(expected), sorted(cache))
+        assert_equal(10, len(list(cache.keys(chunk_size=4))))
+        assert_equal(sorted(expected.values()), sorted(cache.values()))
+        assert_equal(hot_keys, list(cache.caches[0].iter_keys()))
+
+
+@pytest.mark.parametrize("inclusive", [False, True])
+def test_range_and_prefix(tmp_path, inclusive):
+    value = "TSET{}"
+    keys = [
+        "{}/object{}".format(tenant, i) for tenant in ["a", "b", "c"] for i in range(4)
+    ]
+
+    with RoomDict(
+        ["lru", "arc", "none"],
+        ["none", "none", "none"],
+        ["memory", "memory", "disk"],
+        [{"max_size": 2}, {"max_size": 4}],
+        storage_backends_kwargs=[{}, {}, {"directory": str(tmp_path)}],
+        inclusive=inclusive,
+        sorted_keys=True,
+    ) as cache:
+        for i, key in enumerate(reversed(keys)):
+            cache[key] = value.format(i)
+        expected = dict(cache.items())
+
+        # Reads promote records, moving their keys between indexes.
+        cache["a/object0"]
+        cache["c/object3"]
+        del cache["b/object1"]
+        del expected["b/object1"]
+
+        assert_equal(
+            [(key, expected[key]) for key in sorted(expected)], list(cache.range())
+        )
+        assert_equal(
+            [(key, expected[key]) for key in ["b/object0", "b/object2", "b/object3"]],
+            list(cache.prefix("b/", chunk_size=2)),
+        )
+        assert_equal(
+            ["a/object3", "b/object0"],
+            [key for key, _ in cache.range("a/object3", "b/object2")],
+        )
+        assert_equal([], list(cache.prefix("d/")))
+
+
+def test_range_and_prefix_after_promotion_and_delete():
+    with RoomDict(
+        ["lru", "none"],
+        ["none", "none"],
+        ["memory", "memory"],
+        [{"max_size": 2}],
+        sorted_keys=True,
+    ) as cache:
+        for key in ["a/1", "a/2", "a/3", "b/1"]:
+            cache[key] = key
+
+        # The lower tier's membership test cannot remove keys, yet its index
+        # must lose the keys that are promoted, deleted or overwritten.
+        cache["a/1"]
+        cache.delete_many(["a/2"])
+        cache.set_many([("a/3", "a/3!")])
+
+        lower_tier = cache.caches[1]
+        assert_equal(
+            sorted(lower_tier.iter_keys()), list(lower_tier.key_index.irange())
+        )
+        assert_equal(
+            [("a/1", "a/1"), ("a/3", "a/3!"), ("b/1", "b/1")], list(cache.range())
+        )
+        assert_equal(["a/1", "a/3"], [key for key, _ in cache.prefix("a/")])
+
+
+@pytest.mark.parametrize("inclusive", [False, True])
+@pytest.mark.parametrize("write_behind", [False, True])
+def test_len(inclusive, write_behind):
+    key, value = ("TEST{}", "TSET{}")
+    rng = random.Random(0)
+
+    with RoomDict(
+        ["lru", "lru", "lru"],
+        ["none", "none", "none"],
+        ["memory", "memory", "memory"],
+        [{"max_size": 3}, {"max_size": 5}, {"max_size": 8}],
+        write_behind=write_behind,
+        inclusive=inclusive,
+    ) as cache:
+        # Sets overwrite, gets promote, and the lowest tier evicts for good.
+        for _ in range(500):
+            i = rng.randrange(20)
+            operation = rng.random()
+            if operation < 0.4:
+                cache[key.format(i)] = value.format(i)
+            elif operation < 0.8:
+                cache[key.format(i)]
+            elif operation < 0.9:
+                del cache[key.format(i)]
+            else:
+                cache.set_many(
+                    (key.format(j), value.format(j)) for j in range(i, i + 3)
+                )
+
+            assert_equal(sum(1 for _ in cache.keys()), len(cache))
+
+        cache.delete_many(key.format(i) for i in range(20))
+        assert_equal(0, len(cache))
+
+
+def test_len_with_ttl():
+    key, value = ("TEST{}", "TSET{}")
+    now = [0.0]
+
+    with RoomDict(
+        ["lru", "none"],
+        ["none", "none"],
+        ["memory", "memory"],
+        [{"max_size": 2}],
+        ttl_kwargs={"resolution": 1, "clock": lambda: now[0]},
+    ) as cache:
+        for i in range(4):
+            cache.set(key.format(i), value.format(i), ttl=1)
+        cache[key.format(4)] = value.format(4)
+        assert_equal(5, len(cache))
+
+        # Expired records leave when reclaimed, demoted or read.
+        now[0] = 2
+        cache[key.format(5)] = value.format(5)
+        assert_equal(2, len(cache))
+
+
+def test_len_with_untouched_expired_records():
+    key, value = ("TEST{}", "TSET{}")
+    now = [0.0]
+
+    with RoomDict(
+        ["lru", "none"],
+        ["none", "none"],
+        ["memory", "memory"],
+        [{"max_size": 4}],
+        ttl_kwargs={"resolution": 1, "sweep_limit": 2, "clock": lambda: now[0]},
+    ) as cache:
+        for i in range(10):
+            cache.set(key.format(i), value.format(i), ttl=0.5 if i < 5 else 3)
+        assert_equal(10, len(cache))
+
+        # Expired within the current tick, so their deadlines have not fired.
+        now[0] = 0.6
+        assert_equal(5, len(cache))
+        assert_equal(sorted(cache.keys()), [key.format(i) for i in range(5, 10)])
+
+        now[0] = 5
+        assert_equal(0, len(cache))
+        assert_equal([], list(cache.keys()))
+
+
+def test_len_after_restart(tmp_path):
+    key, value = ("TEST{}", "TSET{}")
+
+    def make_cache():
+        return RoomDict(
+            ["lru", "none"],
+            ["none", "none"],
+            ["memory", "disk"],
+            [{"max_size": 2}],
+            storage_backends_kwargs=[
+                {},
+                {"directory": str(tmp_path), "persistent": True},
+            ],
+            snapshot_path=str(tmp_path / "snapshot.pkl"),
+            approximate_len=True,
+        )
+
+    with make_cache() as cache:
+        cache.set_many((key.format(i), value.format(i)) for i in range(10))
+
+    with make_cache() as cache:
+        assert_equal(10, len(cache))
+        assert_equal(10, cache.approx_len())
+
+
+def test_approx_len():
+    key, value = ("TEST{}", "TSET{}")
+
+    with RoomDict(
+        ["lru", "none"],
+        ["none", "none"],
+        ["memory", "memory"],
+        [{"max_size": 100}],
+        approximate_len=True,
+        approximate_len_kwargs={"precision": 12, "rebuild_ratio": 0.2},
+    ) as cache:
+        cache.set_many((key.format(i), value.format(i)) for i in range(5000))
+        cache.set_many((key.format(i), value.format(i)) for i in range(1000))
+        assert abs(cache.approx_len() - 5000) <= 250
+
+        # The sketch is rebuilt once enough keys are removed.
+        cache.delete_many(key.format(i) for i in range(4000))
+        assert_equal(1000, len(cache))
+        assert abs(cache.approx_len() - 1000) <= 50
+
+        cache[key.format(0)] = value.format(0)
+        assert abs(cache.approx_len() - 1001) <= 50
+
+
+def test_approx_len_new_keys_keep_sketches():
+    key, value = ("TEST{}", "TSET{}")
+
+    with RoomDict(
+        ["lru", "none"],
+        ["none", "none"],
+        ["memory", "memory"],
+        [{"max_size": 100}],
+        approximate_len=True,
+    ) as cache:
+        sketch = cache.caches[1].sketch
+        for i in range(50):
+            cache.set_many(
+                (key.format(j), value.format(j)) for j in range(100 * i, 100 * (i + 1))
+            )
+
+        # Sets delete their keys from the lower tiers first, which removes
+        # nothing for new keys, so the sketch is never rebuilt.
+        assert_equal(0, cache.caches[1].num_forgotten)
+        assert cache.caches[1].sketch is sketch
+        assert abs(cache.approx_len() - 5000) <= 250
+
+
+def test_concurrent_approx_len():
+    key = "TEST{}"
+    errors = []
+
+    with RoomDict(
+        ["lru", "lru", "none"],
+        ["none", "none", "none"],
+        ["memory", "memory", "memory"],
+        [{"max_size": 100}, {"max_size": 1000}],
+        thread_safe=True,
+        approximate_len=True,
+    ) as cache:
+
+        # Deletes rebuild the sketches while other threads read and write.
+        def work(thread):
+            rng = random.Random(thread)
+            try:
+                for i in range(3000):
+                    test_key = key.format(rng.randrange(3000))
+                    operation = rng.random()
+                    if operation < 0.5:
+                        cache[test_key] = i
+                    elif operation < 0.8:
+                        cache[test_key]
+                    else:
+                        del cache[test_key]
+            except BaseException as e:
+                errors.append(e)
+
+        # Threads switch often, so they interleave with the rebuilds.
+        switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-5)
+        threads = [threading.Thread(target=work, args=(i,)) for i in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        sys.setswitchinterval(switch_interval)
+
+        assert_equal([], errors)
+
+        # Sketches overestimate by up to rebuild_ratio until rebuilt.
+        num_keys = len(cache)
+        assert_equal(num_keys, len(list(cache.keys())))
+        assert abs(cache.approx_len() - num_keys) <= 0.15 * num_keys
+
+
+def test_approx_len_needs_approximate_len():
+    with RoomDict(["lru"], ["none"], ["memory"], [{"max_size": 2}]) as cache:
+        with pytest.raises(AssertionError):
+            cache.approx_len()
+
+
+def test_range_needs_sorted_keys():
+    with RoomDict(["lru"], ["none"], ["memory"], [{"max_size": 2}]) as cache:
+        with pytest.raises(AssertionError):
+            list(cache.range())
@@ -0,0 +1,132 @@
+import os
+
+import pytest
+
+from RoomDict import RoomDict
+from RoomDict.storage_backends import SQLiteStorage
+
+from RoomDict.test.utils import assert_equal
+
+TEST_RECORDS = [("test{}".format(i), i) for i in range(10)]
+
+
+@pytest.fixture
+def sqlite_storage(tmp_path):
+    storage_backend = SQLiteStorage(directory=str(tmp_path / "sqlite"))
+    storage_backend.open()
+
+    yield storage_backend
+
+    storage_backend.close()
+
+
+def test_put_get_and_delete(sqlite_storage):
+    for key, value in TEST_RECORDS:
+        sqlite_storage[key] = value
+
+    for key, value in TEST_RECORDS:
+        assert key in sqlite_storage
+        assert_equal(value, sqlite_storage[key])
+
+    for key, _ in TEST_RECORDS:
+        del sqlite_storage[key]
+        assert key not in sqlite_storage
+
+    with pytest.raises(KeyError):
+        del sqlite_storage["BAD_KEY"]
+
+
+def test_exact_len(sqlite_storage):
+    for key, value in TEST_RECORDS:
+        sqlite_storage[key] = value
+        sqlite_storage[key] = value
+    assert_equal(len(TEST_RECORDS), len(sqlite_storage))
+
+    sqlite_storage.set_many(TEST_RECORDS)
+    sqlite_storage.delete_many(["test0", "test1", "BAD_KEY"])
+    assert_equal(len(TEST_RECORDS) - 2, len(sqlite_storage))
+    assert_equal(len(TEST_RECORDS) - 2, len(list(sqlite_storage)))
+
+
+def test_batch_operations(sqlite_storage):
+    records = [("test{}".format(i), i) for i in range(1200)]
+    keys = [key for key, _ in records]
+
+    sqlite_storage.set_many(records)
+    assert_equal(dict(records), sqlite_storage.get_many(keys + ["BAD_KEY"]))
+    assert_equal(
+        [True] * len(keys) + [False], sqlite_storage.contains_many(keys + ["BAD_KEY"])
+    )
+
+    sqlite_storage.delete_many(keys[::2])
+    assert_equal(dict(records[1::2]), sqlite_storage.get_many(keys))
+
+
+def test_sync_every(tmp_path):
+    storage_backend = SQLiteStorage(
+        directory=str(tmp_path / "sqlite"), sync_every=3, sync_interval=None
+    )
+    storage_backend.open()
+
+    for i, (key, value) in enumerate(TEST_RECORDS):
+        storage_backend[key] = value
+        assert_equal((i + 1) % 3, storage_backend.unsynced_writes)
+        assert_equal(
+            (i + 1) % 3 != 0, storage_backend.kv_store.in_transaction
+        )
+
+    storage_backend.close()
+
+
+def test_wal_mode(sqlite_storage):
+    journal_mode = sqlite_storage.kv_store.execute("PRAGMA journal_mode").fetchone()
+    assert_equal("wal", journal_mode[0])
+
+
+def test_close_removes_files(tmp_path):
+    directory = str(tmp_path / "sqlite")
+    storage_backend = SQLiteStorage(directory=directory)
+    storage_backend.open()
+
+    for key, value in TEST_RECORDS:
+        storage_backend[key] = value
+
+    storage_backend.close()
+
+    assert not os.path.exists(directory)
+
+
+def test_close_keeps_other_files(tmp_path):
+    directory = tmp_path / "sqlite"
+    directory.mkdir()
+    storage_backend = SQLiteStorage(directory=str(directory))
+    storage_backend.open()
+
+    # Files that only share the database's name are not the database's.
+    other_path = storage_backend.path + ".backup"
+    with open(other_path, "w") as other_file:
+        other_file.write("kept")
+
+    storage_backend[TEST_RECORDS[0][0]] = TEST_RECORDS[0][1]
+    storage_backend.close()
+
+    assert_equal([os.path.basename(other_path)], os.listdir(directory))
+
+
+def test_cold_tier(tmp_path):
+    key, value = ("TEST{}", "TSET{}")
+
+    with RoomDict(
+        ["lru", "none"],
+        ["none", "none"],
+        ["memory", "sqlite"],
+        [{"max_size": 10}],
+        storage_backends_kwargs=[{}, {"directory": str(tmp_path / "sqlite")}],
+        write_behind=True,
+    ) as cache:
+        cache.set_many((key.format(i), value.format(i)) for i in range(100))
+        assert cache.flush(timeout=10)
+
+        assert_equal(90, len(cache.storage_backends[1]))
+        for i in range(100):
+            assert_equal(value.format(i), cache[key.format(i)])
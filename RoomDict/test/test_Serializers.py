@@ -0,0 +1,89 @@
+import json
+
+import numpy as np
+import pytest
+
+from RoomDict import RoomDict
+from RoomDict.storage_backends import BitcaskStorage, DiskStorage, SQLiteStorage
+from RoomDict.storage_backends.serializers import (
+    SERIALIZER_MAPPING,
+    CodecSerializer,
+)
+
+from RoomDict.test.utils import assert_equal
+
+TEST_VALUES = [0, -1, 2.5, "test", b"test", None, [1, "2"], {"a": (1, 2)}]
+
+
+@pytest.mark.parametrize("name", SERIALIZER_MAPPING)
+def test_round_trip(name):
+    serializer = SERIALIZER_MAPPING[name]()
+
+    for value in TEST_VALUES:
+        assert_equal(value, serializer.loads(serializer.dumps(value)))
+        assert_equal(value, serializer.loads(memoryview(serializer.dumps(value))))
+
+
+def test_pickle5_buffers():
+    serializer = SERIALIZER_MAPPING["pickle5"]()
+    value = {"a": np.arange(100, dtype=np.float64), "b": np.arange(3), "c": "test"}
+
+    data = serializer.dumps(value)
+    loaded = serializer.loads(data)
+
+    assert_equal(value.keys(), loaded.keys())
+    for key in ["a", "b"]:
+        assert np.array_equal(value[key], loaded[key])
+        # Views of the data rather than copies.
+        assert not loaded[key].flags.writeable
+        assert not loaded[key].flags.owndata
+    assert_equal("test", loaded["c"])
+
+
+@pytest.mark.parametrize(
+    "storage_class", [BitcaskStorage, DiskStorage, SQLiteStorage]
+)
+@pytest.mark.parametrize("serializer", ["pickle", "pickle5", "marshal", "codec"])
+def test_storage_serializer(tmp_path, storage_class, serializer):
+    if serializer == "codec":
+        serializer = CodecSerializer(
+            lambda value: json.dumps(value).encode(),
+            lambda data: json.loads(bytes(data)),
+        )
+
+    storage_backend = storage_class(directory=str(tmp_path), serializer=serializer)
+    storage_backend.open()
+
+    records = [("test{}".format(i), [i, "test{}".format(i)]) for i in range(10)]
+    storage_backend.set_many(records[:5])
+    for key, value in records[5:]:
+        storage_backend[key] = value
+
+    for key, value in records:
+        assert_equal(value, storage_backend[key])
+    assert_equal(dict(records), storage_backend.get_many(dict(records)))
+
+    storage_backend.close()
+
+
+def test_bitcask_zero_copy(tmp_path):
+    value = np.arange(1000, dtype=np.int64)
+
+    with RoomDict(
+        ["lru", "none"],
+        ["none", "none"],
+        ["memory", "bitcask"],
+        [{"max_size": 1}],
+        storage_backends_kwargs=[
+            {},
+            {"directory": str(tmp_path), "serializer": "pickle5"},
+        ],
+    ) as cache:
+        cache["test0"] = value
+        cache["test1"] = value
+
+        loaded = cache.storage_backends[1]["test0"]
+        assert np.array_equal(value, loaded)
+        # A view of the mmap of the data file.
+        assert not loaded.flags.writeable
+        assert not loaded.flags.owndata
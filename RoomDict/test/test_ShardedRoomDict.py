@@ -0,0 +1,184 @@
+import threading
+
+import pytest
+
+from RoomDict.ShardedRoomDict import ShardedRoomDict
+
+from RoomDict.test.utils import assert_equal
+
+KEY, VALUE = ("TEST{}_{}", "TSET{}_{}")
+NUM_THREADS = 8
+NUM_KEYS = 100
+
+
+@pytest.fixture(params=[False, True])
+def sharded_room_dict(request, tmp_path):
+    room_dict = ShardedRoomDict(
+        4,
+        ["lru", "lru", "none"],
+        ["none", "none", "none"],
+        ["memory", "arbitrary", "disk"],
+        [{"max_size": 8}, {"max_size": 16}],
+        storage_backends_kwargs=[{}, {"delay": 0}, {"directory": str(tmp_path)}],
+        write_behind=request.param,
+    )
+
+    with room_dict:
+        yield room_dict
+
+
+def run_threads(target):
+    errors = []
+
+    def wrapped(thread):
+        try:
+            target(thread)
+        except BaseException as e:
+            errors.append(e)
+
+    threads = [
+        threading.Thread(target=wrapped, args=(thread,))
+        for thread in range(NUM_THREADS)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    if errors:
+        raise errors[0]
+
+
+def test_concurrent_set_and_get(sharded_room_dict):
+    def work(thread):
+        for i in range(NUM_KEYS):
+            sharded_room_dict[KEY.format(thread, i)] = VALUE.format(thread, i)
+
+            # Re-read an older key so records move between tiers.
+            j = i // 2
+            actual_value = sharded_room_dict[KEY.format(thread, j)]
+            assert_equal(VALUE.format(thread, j), actual_value)
+
+    run_threads(work)
+    sharded_room_dict.flush()
+
+    for thread in range(NUM_THREADS):
+        for i in range(NUM_KEYS):
+            assert_equal(
+                VALUE.format(thread, i), sharded_room_dict[KEY.format(thread, i)]
+            )
+
+
+def test_concurrent_shared_keys(sharded_room_dict):
+    keys = [KEY.format("shared", i) for i in range(NUM_KEYS)]
+
+    def work(thread):
+        for i, key in enumerate(keys):
+            if (i + thread) % 3 == 0:
+                sharded_room_dict[key] = thread
+            elif (i + thread) % 3 == 1:
+                value = sharded_room_dict[key]
+                assert value is None or 0 <= value < NUM_THREADS
+            else:
+                del sharded_room_dict[key]
+
+    run_threads(work)
+
+    # Every key exists at most once across the tiers of its shard.
+    for key in keys:
+        if key in sharded_room_dict:
+            shard = sharded_room_dict._shard(key)
+            copies = sum(key in cache for cache in shard.caches)
+            assert_equal(1, copies)
+
+
+def test_batch_operations(sharded_room_dict):
+    records = [(KEY.format("batch", i), VALUE.format("batch", i)) for i in range(50)]
+    keys = [key for key, _ in records]
+
+    sharded_room_dict.set_many(records)
+    assert_equal(dict(records), sharded_room_dict.get_many(keys))
+
+    sharded_room_dict.delete_many(keys[:25])
+    assert_equal([False] * 25 + [True] * 25, sharded_room_dict.contains_many(keys))
+
+
+def test_items(sharded_room_dict):
+    records = [(KEY.format("items", i), VALUE.format("items", i)) for i in range(50)]
+    sharded_room_dict.set_many(records)
+
+    assert_equal(dict(records), dict(sharded_room_dict.items()))
+    assert_equal(sorted(key for key, _ in records), sorted(sharded_room_dict))
+
+
+def test_len(sharded_room_dict):
+    def work(thread):
+        for i in range(NUM_KEYS):
+            sharded_room_dict[KEY.format(thread, i)] = VALUE.format(thread, i)
+            sharded_room_dict[KEY.format(thread, i // 2)] = VALUE.format(thread, i)
+            sharded_room_dict[KEY.format(thread, i // 3)]
+        sharded_room_dict.delete_many(KEY.format(thread, i) for i in range(0, 100, 4))
+
+    run_threads(work)
+
+    assert_equal(NUM_THREADS * NUM_KEYS * 3 // 4, len(sharded_room_dict))
+
+
+def test_approx_len():
+    with ShardedRoomDict(
+        4,
+        ["lru", "none"],
+        ["none", "none"],
+        ["memory", "memory"],
+        [{"max_size": 8}],
+        approximate_len=True,
+    ) as sharded_room_dict:
+        sharded_room_dict.set_many(
+            (KEY.format("approx", i), VALUE.format("approx", i)) for i in range(2000)
+        )
+
+        assert abs(sharded_room_dict.approx_len() - 2000) <= 100
+
+
+def test_stats():
+    with ShardedRoomDict(
+        4,
+        ["lru", "none"],
+        ["none", "none"],
+        ["memory", "memory"],
+        [{"max_size": 8}],
+        collect_stats=True,
+    ) as sharded_room_dict:
+
+        def work(thread):
+            for i in range(NUM_KEYS):
+                sharded_room_dict[KEY.format(thread, i)] = VALUE.format(thread, i)
+            for i in range(NUM_KEYS):
+                sharded_room_dict[KEY.format(thread, i)]
+
+        run_threads(work)
+
+        stats = sharded_room_dict.stats()
+        num_gets = NUM_THREADS * NUM_KEYS
+        assert_equal(num_gets, stats["latencies"]["get"]["count"])
+        assert_equal(num_gets, stats["latencies"]["set"]["count"])
+        assert_equal(num_gets, stats["tiers"][0]["hits"] + stats["tiers"][1]["hits"])
+        assert_equal(stats["tiers"][0]["misses"], stats["tiers"][1]["hits"])
+
+
+def test_prefix():
+    with ShardedRoomDict(
+        4,
+        ["lru", "none"],
+        ["none", "none"],
+        ["memory", "memory"],
+        [{"max_size": 5}],
+        sorted_keys=True,
+    ) as cache:
+        records = [
+            ("{}/{:02d}".format(tenant, i), i) for tenant in "ab" for i in range(20)
+        ]
+        cache.set_many(records)
+
+        assert_equal(records[20:], list(cache.prefix("b/")))
+        assert_equal(records[5:25], list(cache.range("a/05", "b/05")))
@@ -0,0 +1,37 @@
+import random
+
+from RoomDict.SortedKeys import SortedKeys
+
+from RoomDict.test.utils import assert_equal
+
+
+def test_matches_sorted_set():
+    rng = random.Random(0)
+    sorted_keys = SortedKeys(load=4)
+    expected = set()
+
+    for _ in range(2000):
+        key = "key{}".format(rng.randrange(200))
+        if rng.random() < 0.6:
+            sorted_keys.add(key)
+            expected.add(key)
+        else:
+            sorted_keys.discard(key)
+            expected.discard(key)
+
+        assert_equal(len(expected), len(sorted_keys))
+
+    assert_equal(sorted(expected), list(sorted_keys))
+    for key in ["key0", "key50", "key199", "missing"]:
+        assert_equal(key in expected, key in sorted_keys)
+
+
+def test_irange():
+    sorted_keys = SortedKeys(load=2)
+    sorted_keys.update("key{:02d}".format(i) for i in range(0, 20, 2))
+
+    assert_equal(["key04", "key06"], list(sorted_keys.irange("key03", "key08")))
+    assert_equal(["key16", "key18"], list(sorted_keys.irange("key16")))
+    assert_equal(["key00", "key02"], list(sorted_keys.irange(hi="key03")))
+    assert_equal([], list(sorted_keys.irange("key19")))
+    assert_equal([], list(SortedKeys().irange("key")))
@@ -0,0 +1,91 @@
+import math
+import random
+import threading
+
+import pytest
+
+from RoomDict.Stats import Histogram, Stats
+
+from RoomDict.test.utils import assert_equal
+
+
+@pytest.mark.parametrize("significant_bits", [1, 3, 7])
+def test_histogram_precision(significant_bits):
+    histogram = Histogram(significant_bits)
+
+    rng = random.Random(0)
+    values = sorted(int(rng.lognormvariate(10, 3)) for _ in range(10000))
+    for value in values:
+        histogram.record(value)
+
+    assert_equal(len(values), histogram.count)
+    assert_equal(values[0], histogram.min)
+    assert_equal(values[-1], histogram.max)
+    for percentile in [1, 50, 90, 99, 99.9, 100]:
+        expected = values[max(1, math.ceil(len(values) * percentile / 100)) - 1]
+        actual = histogram.percentile(percentile)
+        assert expected <= actual <= expected * (1 + 2 ** -significant_bits)
+
+
+def test_histogram_merge():
+    histogram, other = Histogram(), Histogram()
+    for value in range(100):
+        histogram.record(value)
+    for value in range(10 ** 6, 10 ** 6 + 100):
+        other.record(value)
+
+    histogram.merge(other)
+
+    assert_equal(200, histogram.count)
+    assert_equal(0, histogram.min)
+    assert_equal(10 ** 6 + 99, histogram.max)
+    assert_equal(99, histogram.percentile(50))
+    assert histogram.percentile(51) >= 10 ** 6
+    assert_equal(None, Histogram().percentile(50))
+
+
+def test_threads():
+    ticks = iter(range(10 ** 6))
+    stats = Stats(2, clock=lambda: next(ticks))
+
+    def record():
+        for _ in range(1000):
+            stats.count(1, "hits")
+            stats.record("get", stats.now())
+
+    threads = [threading.Thread(target=record) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    snapshot = stats.snapshot()
+    assert_equal(4000, snapshot["tiers"][1]["hits"])
+    assert_equal(0, snapshot["tiers"][0]["hits"])
+    assert_equal(4000, snapshot["latencies"]["get"]["count"])
+
+    stats.reset()
+    assert_equal({}, stats.snapshot()["latencies"])
+
+
+def test_exporter():
+    now = [0]
+    exported = []
+    stats = Stats(
+        1, exporter=exported.append, export_interval=1, clock=lambda: now[0]
+    )
+
+    stats.record("get", 0)
+    assert_equal([], exported)
+
+    now[0] = int(1e9)
+    stats.record("get", 0)
+    assert_equal(1, len(exported))
+    assert_equal(2, exported[0]["latencies"]["get"]["count"])
+    assert_equal(1.0, exported[0]["latencies"]["get"]["max"])
+
+    now[0] = int(1.5e9)
+    stats.record("get", 0)
+    stats.export()
+    assert_equal(2, len(exported))
+    assert_equal(3, exported[1]["latencies"]["get"]["count"])
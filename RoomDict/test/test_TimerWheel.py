@@ -0,0 +1,111 @@
+import random
+
+from RoomDict.TimerWheel import TimerWheel
+
+from RoomDict.test.utils import assert_equal
+
+
+def make_wheel(now):
+    return TimerWheel(resolution=1, num_slots=4, num_levels=3, clock=lambda: now[0])
+
+
+def test_fires_in_order():
+    now = [0.0]
+    wheel = make_wheel(now)
+    for i, deadline in enumerate([1, 3, 5, 20, 70, 500]):
+        wheel.schedule("key{}".format(i), deadline)
+
+    fired = []
+    for tick in range(600):
+        now[0] = tick
+        for key in wheel.advance():
+            fired.append((key, tick))
+
+    assert_equal(
+        [("key0", 1), ("key1", 3), ("key2", 5), ("key3", 20), ("key4", 70)],
+        fired[:5],
+    )
+    # Beyond the last level, deadlines are refiled until they come into reach.
+    assert_equal(("key5", 500), fired[5])
+
+
+def test_skips_idle_ticks():
+    now = [0.0]
+    wheel = make_wheel(now)
+    wheel.schedule("soon", 2)
+    wheel.schedule("later", 60)
+    wheel.schedule("never", 10**9)
+
+    num_cascades = [0]
+    cascade = wheel._cascade
+
+    def counted_cascade():
+        num_cascades[0] += 1
+        cascade()
+
+    wheel._cascade = counted_cascade
+
+    now[0] = 10**6
+    fired = []
+    while True:
+        keys = wheel.advance()
+        if not keys:
+            break
+        fired.extend(keys)
+
+    assert_equal(["soon", "later"], sorted(fired, reverse=True))
+    assert_equal(10**6, wheel.current_tick)
+    # Only ticks that reach a filed slot are stepped through.
+    assert num_cascades[0] < 1000
+
+
+def test_matches_deadlines():
+    rng = random.Random(0)
+    now = [0.0]
+    wheel = make_wheel(now)
+    deadlines = {"key{}".format(i): rng.uniform(0, 400) for i in range(100)}
+    for key, deadline in deadlines.items():
+        wheel.schedule(key, deadline)
+
+    # Jumps of every size take every path through advance.
+    fired = set()
+    while now[0] < 450:
+        now[0] += rng.choice([0.5, 3, 30, 90])
+        while True:
+            keys = wheel.advance()
+            if not keys:
+                break
+            fired.update(keys)
+
+        # Deadlines never fire early, and at most one tick late.
+        assert all(deadlines[key] <= now[0] for key in fired)
+        assert_equal(
+            {key for key, deadline in deadlines.items() if deadline <= now[0] - 1},
+            {key for key in fired if deadlines[key] <= now[0] - 1},
+        )
+
+    assert_equal(set(deadlines), fired)
+
+
+def test_due():
+    rng = random.Random(0)
+    now = [0.0]
+    wheel = make_wheel(now)
+    deadlines = {}
+    for i in range(200):
+        key = "key{}".format(i)
+        deadlines[key] = rng.uniform(0, 300)
+        wheel.schedule(key, deadlines[key])
+
+    # Fired and due keys are exactly those whose deadline has passed.
+    fired = set()
+    while now[0] < 310:
+        now[0] += rng.uniform(0, 3)
+        while True:
+            keys = wheel.advance()
+            if not keys:
+                break
+            fired.update(keys)
+
+        expired = {key for key, deadline in deadlines.items() if deadline <= now[0]}
+        assert_equal(expired, fired | set(wheel.due()))
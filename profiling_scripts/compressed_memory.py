@@ -0,0 +1,80 @@
+import os
+import pickle
+import random
+import time
+
+import numpy as np
+
+from RoomDict.storage_backends import CompressedMemoryStorage, MemoryStorage
+
+NUM_RECORDS = int(1e4)
+COMPRESSORS = [None, "zlib", "lzma", "bz2"]
+
+rng = random.Random(0)
+words = ["cache", "tier", "memory", "disk", "value", "key", "record", "miss"]
+
+# Representative values, from ones that do not compress to ones that do well.
+VALUES = {
+    "int": lambda i: i,
+    "random_bytes": lambda i: os.urandom(512),
+    "text": lambda i: " ".join(rng.choice(words) for _ in range(200)),
+    "record": lambda i: {
+        "id": i,
+        "name": "user{}".format(i),
+        "tags": [rng.choice(words) for _ in range(10)],
+        "scores": [rng.random() for _ in range(10)],
+    },
+    "array": lambda i: np.arange(i, i + 1024, dtype=np.int64) % 100,
+}
+
+
+def profile(storage_backend, records):
+    storage_backend.open()
+
+    start = time.time()
+    for key, value in records:
+        storage_backend[key] = value
+    put_time = time.time() - start
+
+    start = time.time()
+    for key, _ in records:
+        storage_backend[key]
+    get_time = time.time() - start
+
+    if isinstance(storage_backend, CompressedMemoryStorage):
+        stored_bytes = storage_backend.stored_bytes()
+    else:
+        stored_bytes = None
+
+    storage_backend.close()
+
+    return stored_bytes, put_time, get_time
+
+
+for name, make_value in VALUES.items():
+    records = [("key{}".format(i), make_value(i)) for i in range(NUM_RECORDS)]
+    pickled_bytes = sum(
+        len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+        for _, value in records
+    )
+
+    _, put_time, get_time = profile(MemoryStorage(), records)
+    print(
+        "{} memory PUTS_PER_SEC={:.0f} GETS_PER_SEC={:.0f}".format(
+            name, NUM_RECORDS / put_time, NUM_RECORDS / get_time
+        )
+    )
+
+    for compressor in COMPRESSORS:
+        stored_bytes, put_time, get_time = profile(
+            CompressedMemoryStorage(compressor=compressor), records
+        )
+        print(
+            "{} compressed_memory[{}] RATIO={:.2f} PUTS_PER_SEC={:.0f} GETS_PER_SEC={:.0f}".format(  # noqa: E501
+                name,
+                compressor,
+                pickled_bytes / stored_bytes,
+                NUM_RECORDS / put_time,
+                NUM_RECORDS / get_time,
+            )
+        )
@@ -0,0 +1,41 @@
+import gc
+import time
+import tracemalloc
+
+from RoomDict.RoomDict import CACHE_POLICY_MAPPING
+from RoomDict.membership_tests import NaiveMembership
+from RoomDict.storage_backends import MemoryStorage
+
+DATA_SIZE = int(1e6)
+CACHE_POLICIES = ["lru", "array_lru", "clock"]
+
+keys = [str(i) for i in range(DATA_SIZE)]
+
+for cache_policy in CACHE_POLICIES:
+    gc.collect()
+    tracemalloc.start()
+
+    storage_backend = MemoryStorage()
+    storage_backend.open()
+    cache = CACHE_POLICY_MAPPING[cache_policy](
+        NaiveMembership(), storage_backend, DATA_SIZE
+    )
+    for key in keys:
+        cache.put(key, None)
+
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    start = time.time()
+    for key in keys:
+        cache.get(key)
+    end = time.time()
+
+    print(
+        "{} ENTRIES={} BYTES_PER_ENTRY={:.1f} GET_TIME={:.3f}".format(
+            cache_policy, DATA_SIZE, memory / DATA_SIZE, end - start
+        )
+    )
+
+    storage_backend.close()
+    del cache
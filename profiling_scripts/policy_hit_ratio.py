@@ -0,0 +1,58 @@
+import scipy.stats as stats
+
+from RoomDict.RoomDict import CACHE_POLICY_MAPPING
+from RoomDict.membership_tests import NaiveMembership
+from RoomDict.storage_backends import MemoryStorage
+
+DATA_SIZE = int(1e5)
+CACHE_SIZES = [int(x * DATA_SIZE) for x in [0.001, 0.01, 0.1]]
+CACHE_POLICIES = ["lru", "arc", "2q", "s3fifo"]
+
+
+def hit_ratio(cache_policy, cache_size, data):
+    storage_backend = MemoryStorage()
+    storage_backend.open()
+    cache = CACHE_POLICY_MAPPING[cache_policy](
+        NaiveMembership(), storage_backend, cache_size
+    )
+
+    hits = 0
+    for key in data:
+        if cache.get(key) is None:
+            cache.put(key, key)
+        else:
+            hits += 1
+
+    storage_backend.close()
+
+    return hits / len(data)
+
+
+def profile_data(data, name):
+    data = [str(int(key)) for key in data]
+    for cache_size in CACHE_SIZES:
+        ratios = [
+            "{}={:.4f}".format(cache_policy, hit_ratio(cache_policy, cache_size, data))
+            for cache_policy in CACHE_POLICIES
+        ]
+        print("{} CACHE_SIZE={} {}".format(name, cache_size, " ".join(ratios)))
+
+
+# Profile zipf distribution.
+zipf_scales = [1.001, 1.01, 1.05, 1.1, 1.2]
+for scale in zipf_scales:
+    zipf_data = stats.zipf.rvs(scale, size=DATA_SIZE, random_state=0)
+    profile_data(zipf_data, "zipf_{}".format(scale))
+
+# Profile zipf distribution interrupted by one-off scans.
+scale = 1.2
+scan_data = list(stats.zipf.rvs(scale, size=DATA_SIZE, random_state=0))
+for i, start in enumerate(range(0, DATA_SIZE, DATA_SIZE // 10)):
+    scan = range(-(i + 1) * DATA_SIZE, -(i + 1) * DATA_SIZE + DATA_SIZE // 20)
+    scan_data[start:start] = scan
+profile_data(scan_data, "zipf_{}_scan".format(scale))
+
+# Profile uniform distribution.
+scale = DATA_SIZE
+uniform_data = stats.uniform.rvs(0, scale, size=DATA_SIZE, random_state=0)
+profile_data(uniform_data, "uniform")